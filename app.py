@@ -1,33 +1,92 @@
-import asyncio
-import hashlib
-import threading
-
-from flask import Flask, jsonify, render_template, request
-
-from food_co2_estimator.main import async_estimator
+import json
+
+from flask import (
+    Flask,
+    Response,
+    jsonify,
+    render_template,
+    request,
+    stream_with_context,
+)
+
+from food_co2_estimator.jobs.queue import (
+    COMPLETED_EVENT,
+    JobStatus,
+    QueueFullError,
+    get_job_queue,
+    hash_input,
+)
+from food_co2_estimator.jobs.variables import JOB_RETRY_AFTER_SECONDS
+from food_co2_estimator.language.detector import Languages
+from food_co2_estimator.main import get_cached_result
+from food_co2_estimator.metrics.registry import render_metrics
+from food_co2_estimator.pydantic_models.estimation_result import EstimationResult
+from food_co2_estimator.utils import OutputFormat, render_output
+from food_co2_estimator.utils.output_generator import MEDIA_TYPES, TRANSLATIONS
 
 app = Flask(__name__)
 
-results = {}  # Temporary storage for results
-
-
-def hash_input(input_data):
-    """Generate a short hash from input data."""
-    return hashlib.md5(input_data.encode()).hexdigest()
 
-
-def run_in_thread(func, input_data):
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    hashed_input = hash_input(input_data)
-    try:
-        result = loop.run_until_complete(func(input_data, verbose=True))
-        results[hashed_input] = result
-    except Exception as exc_info:
-        print(str(exc_info))
-        results[hashed_input] = "Something went wrong. :-( Please try again."
-    finally:
-        loop.close()
+def queue_full_response():
+    return (
+        jsonify(status="Busy", retry_after=JOB_RETRY_AFTER_SECONDS),
+        429,
+        {"Retry-After": str(JOB_RETRY_AFTER_SECONDS)},
+    )
+
+
+def format_event(event) -> str:
+    return f"event: {event['event']}\ndata: {json.dumps(event)}\n\n"
+
+
+def render_completed_event(event):
+    """Completed events of finished jobs hold the result as JSON, shown as text."""
+    if event.get("status") != JobStatus.Completed.value:
+        return event
+    result = EstimationResult.model_validate_json(event["result"])
+    return {**event, "result": render_output(result)}
+
+
+def get_output_format() -> OutputFormat:
+    """The format preferred in the Accept header, JSON if any format will do."""
+    formats = {
+        media_type: output_format for output_format, media_type in MEDIA_TYPES.items()
+    }
+    media_type = request.accept_mimetypes.best_match(
+        [MEDIA_TYPES[OutputFormat.Json], *formats],
+        default=MEDIA_TYPES[OutputFormat.Json],
+    )
+    return formats[media_type]
+
+
+def get_output_language() -> Languages | None:
+    """The language preferred in the Accept-Language header, if it is supported."""
+    language = request.accept_languages.best_match(
+        [language.value for language in TRANSLATIONS]
+    )
+    return None if language is None else Languages(language)
+
+
+def negotiated_response(status: str, result: EstimationResult | str) -> Response:
+    """
+    Respond with a result, or the message of a failed job, in the format and
+    language the client prefers.
+    """
+    output_format = get_output_format()
+    if output_format == OutputFormat.Json:
+        if isinstance(result, str):
+            response = jsonify(status=status, message=result)
+        else:
+            response = jsonify(status=status, result=result.model_dump(mode="json"))
+    elif isinstance(result, str):
+        response = Response(result, mimetype=MEDIA_TYPES[OutputFormat.Text])
+    else:
+        response = Response(
+            render_output(result, output_format, get_output_language()),
+            mimetype=MEDIA_TYPES[output_format],
+        )
+    response.vary.update(["Accept", "Accept-Language"])
+    return response
 
 
 @app.route("/")
@@ -41,9 +100,26 @@ async def calculate():
     if not input_data:
         return jsonify(status="No input provided"), 400
 
-    threading.Thread(target=run_in_thread, args=(async_estimator, input_data)).start()
-
     hashed_input = hash_input(input_data)
+    cached_result = get_cached_result(input_data)
+    if cached_result is not None:
+        # The result is looked up in the cache when it is requested by its hash
+        get_job_queue().remember(hashed_input, input_data)
+        return (
+            jsonify(
+                status="Completed",
+                input_data=input_data,
+                hashed_input=hashed_input,
+                result=render_output(cached_result),
+            ),
+            200,
+        )
+
+    try:
+        get_job_queue().submit(hashed_input, input_data)
+    except QueueFullError:
+        return queue_full_response()
+
     return (
         jsonify(status="Processing", input_data=input_data, hashed_input=hashed_input),
         202,
@@ -52,12 +128,79 @@ async def calculate():
 
 @app.route("/results/<hashed_input>")
 async def get_results(hashed_input):
-    result = results.get(hashed_input, None)
-    if result:
-        return jsonify(status="Completed", result=result), 200
-    else:
+    """
+    The result of a job as JSON, text or HTML depending on the Accept header.
+    Text and HTML are in the language of the recipe, unless Accept-Language
+    prefers English or Danish. Results no longer held by the job queue are
+    read from the result cache, and unknown hashes are answered with 404.
+    """
+    job_queue = get_job_queue()
+    job = job_queue.get(hashed_input)
+    if job is None:
+        # Results answered by the cache, or of purged jobs, are in the cache
+        input_data = job_queue.get_input(hashed_input)
+        cached_result = None if input_data is None else get_cached_result(input_data)
+        if cached_result is None:
+            return jsonify(status="Not found", input_data=hashed_input), 404
+        return negotiated_response("Completed", cached_result), 200
+    if not job.is_finished:
         return jsonify(status="Processing", input_data=hashed_input), 202
+    if job.status == JobStatus.Failed:
+        return negotiated_response("Failed", job.result or ""), 200
+    result = EstimationResult.model_validate_json(job.result or "")
+    return negotiated_response("Completed", result), 200
+
+
+@app.route("/stream")
+def stream():
+    """
+    Stream the progress of an estimation as server-sent events, ending with a
+    'completed' event holding the result.
+    """
+    input_data = request.args.get("input_data")
+    if not input_data:
+        return jsonify(status="No input provided"), 400
+
+    cached_result = get_cached_result(input_data)
+    if cached_result is not None:
+        events = [
+            format_event({"event": "completed", "result": render_output(cached_result)})
+        ]
+        return Response(events, mimetype="text/event-stream")
+
+    hashed_input = hash_input(input_data)
+    job_queue = get_job_queue()
+    try:
+        job_queue.submit(hashed_input, input_data)
+    except QueueFullError:
+        return queue_full_response()
+
+    def generate():
+        for event in job_queue.follow(hashed_input):
+            # A comment line keeps proxies from closing an idle connection
+            if event is None:
+                yield ": keep-alive\n\n"
+            elif event["event"] == COMPLETED_EVENT:
+                yield format_event(render_completed_event(event))
+            else:
+                yield format_event(event)
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.route("/metrics")
+def metrics():
+    """Metrics of the web and job worker processes in Prometheus text format."""
+    return Response(render_metrics(), mimetype="text/plain; version=0.0.4")
 
 
 if __name__ == "__main__":
-    app.run(debug=True, port=8000)
+    from food_co2_estimator.jobs.worker import WorkerSupervisor
+
+    # The reloader would start a second set of workers
+    WorkerSupervisor().start()
+    app.run(debug=True, port=8000, use_reloader=False)
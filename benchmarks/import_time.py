@@ -0,0 +1,89 @@
+"""
+Import time of the modules loaded when the web server and workers start.
+
+    python -m benchmarks.import_time
+
+Each module is imported in a fresh interpreter with `-X importtime`, a few
+times, and the median is compared with the budget. The heaviest packages
+are listed, and the check fails when a module takes longer than the budget
+or loads a dependency that should only be imported by the stage using it.
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+from collections import Counter
+
+DEFAULT_MODULES = ["app", "food_co2_estimator.main", "food_co2_estimator.jobs.worker"]
+DEFAULT_BUDGET_SECONDS = 1.0
+# Dependencies of the pipeline stages, imported on first use or by the warm-up
+DEFERRED_PACKAGES = [
+    "bs4",
+    "deep_translator",
+    "langchain",
+    "langchain_chroma",
+    "langchain_community",
+    "langchain_core",
+    "langchain_openai",
+    "langdetect",
+    "markdownify",
+    "openai",
+    "translate",
+]
+
+
+def measure_import(module: str) -> tuple[float, Counter[str]]:
+    """Seconds to import the module, and microseconds spent per package."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Unable to import {module}:\n{completed.stderr}")
+
+    total_microseconds = 0
+    packages: Counter[str] = Counter()
+    for line in completed.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_time, cumulative, name = line.removeprefix("import time:").split("|")
+        packages[name.strip().split(".")[0]] += int(self_time)
+        if name.strip() == module:
+            total_microseconds = int(cumulative)
+    return total_microseconds / 1e6, packages
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Import time of the modules loaded when the web server and workers start."
+    )
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("--budget", type=float, default=DEFAULT_BUDGET_SECONDS)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=5)
+    args = parser.parse_args()
+
+    failed = False
+    for module in args.modules:
+        measurements = [measure_import(module) for _ in range(args.repeat)]
+        seconds = statistics.median(seconds for seconds, _ in measurements)
+        packages = measurements[-1][1]
+        deferred = sorted(set(packages) & set(DEFERRED_PACKAGES))
+
+        over_budget = seconds > args.budget
+        failed = failed or over_budget or bool(deferred)
+        status = "over budget" if over_budget else "ok"
+        print(f"{module}: {seconds:.3f} s ({status}, budget {args.budget:.3f} s)")
+        for package, microseconds in packages.most_common(args.top):
+            print(f"  {package:<30} {microseconds / 1e6:.3f} s")
+        if deferred:
+            print(f"  Loads stage dependencies at import: {', '.join(deferred)}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Benchmark of the full pipeline on a corpus of recipe URLs, offline.
+
+Record the external interactions of a corpus once, with network and API keys:
+
+    python -m benchmarks.pipeline record urls.txt
+
+Then replay it as often as needed, with the recorded latencies:
+
+    python -m benchmarks.pipeline replay urls.txt --concurrency 8 --repeat 3
+
+The report has p50 and p95 latencies per stage and end to end, and the
+throughput. Caches start empty in a temporary directory on every run.
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import tempfile
+import time
+
+import numpy as np
+
+DEFAULT_FIXTURES_PATH = "benchmarks/fixtures/pipeline.json"
+
+
+def percentiles(values: list[float]) -> str:
+    if not values:
+        return f"{'-':>9} {'-':>9}"
+    p50, p95 = np.percentile(values, [50, 95])
+    return f"{p50:9.3f} {p95:9.3f}"
+
+
+def print_report(
+    stage_timings: list[dict[str, float]],
+    durations: list[float],
+    failures: int,
+    wall_seconds: float,
+    concurrency: int,
+) -> None:
+    stages = list(dict.fromkeys(name for timings in stage_timings for name in timings))
+    print(f"\n{'':<20} {'p50 (s)':>9} {'p95 (s)':>9}")
+    for stage in stages:
+        values = [timings[stage] for timings in stage_timings if stage in timings]
+        print(f"{stage:<20} {percentiles(values)}")
+    print(f"{'end to end':<20} {percentiles(durations)}")
+    print(
+        f"\n{len(durations)} estimations ({failures} failed) in {wall_seconds:.2f} s "
+        f"at concurrency {concurrency}: "
+        f"{len(durations) / wall_seconds:.2f} recipes/s"
+    )
+
+
+async def run_corpus(
+    urls: list[str], concurrency: int, repeat: int
+) -> tuple[list[dict[str, float]], list[float], int, float]:
+    import food_co2_estimator.main as main_module
+    from food_co2_estimator.bulk import estimate_many
+    from food_co2_estimator.chains.registry import close_chain_registry
+    from food_co2_estimator.url.fetcher import close_page_fetcher
+    from food_co2_estimator.utils.stage_scheduler import StageScheduler
+
+    stage_timings: list[dict[str, float]] = []
+
+    class TimedStageScheduler(StageScheduler):
+        async def run(self):
+            try:
+                return await super().run()
+            finally:
+                stage_timings.append(dict(self.timings))
+
+    main_module.StageScheduler = TimedStageScheduler
+
+    durations: list[float] = []
+    failures = 0
+    start = time.perf_counter()
+    try:
+        # Rounds run one after the other, so repeats of a URL are not coalesced
+        for _ in range(repeat):
+            async for result in estimate_many(
+                urls,
+                concurrency=concurrency,
+                per_host_concurrency=concurrency,
+                host_delay_seconds=0,
+            ):
+                durations.append(result.seconds)
+                failures += result.status != "completed"
+    finally:
+        await close_page_fetcher()
+        await close_chain_registry()
+    return stage_timings, durations, failures, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark of the full pipeline on a corpus of recipe URLs, offline."
+    )
+    parser.add_argument("mode", choices=["record", "replay"])
+    parser.add_argument("input", help="Text file with a URL per line, or JSONL")
+    parser.add_argument("--fixtures", default=DEFAULT_FIXTURES_PATH)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument(
+        "--latency-scale",
+        type=float,
+        default=1.0,
+        help="Factor on the recorded latencies when replaying, 0 for none",
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    # Caches are configured from the environment when the package is imported
+    cache_dir = tempfile.mkdtemp(prefix="pipeline-benchmark-")
+    os.environ["CACHE_DIR"] = cache_dir
+    os.environ["RESULT_CACHE_ENABLED"] = "false"
+
+    from benchmarks.replay import FixtureStore, install
+    from food_co2_estimator.bulk import read_urls
+
+    live = args.mode == "record"
+    store = FixtureStore(args.fixtures, latency_scale=args.latency_scale)
+    install(store, live=live)
+
+    urls = read_urls(args.input)
+    print(f"{args.mode.capitalize()}ing {len(urls)} recipes, caches in {cache_dir}")
+    stage_timings, durations, failures, wall_seconds = asyncio.run(
+        run_corpus(urls, args.concurrency, 1 if live else args.repeat)
+    )
+    print_report(stage_timings, durations, failures, wall_seconds, args.concurrency)
+
+    if live:
+        store.save()
+        print(f"\nRecorded {store.summary()} to {args.fixtures}")
+    elif store.missing:
+        print(
+            f"\nMissing fixtures: {dict(store.missing)}. "
+            "Record the corpus again after changing prompts or inputs."
+        )
+
+
+if __name__ == "__main__":
+    main()
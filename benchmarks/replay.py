@@ -0,0 +1,228 @@
+"""
+Record and replay of everything the pipeline fetches from outside: recipe
+pages, structured LLM outputs, embeddings, translations and search results.
+
+While recording, the real clients are wrapped and each response is stored in
+a fixture file with the time it took. While replaying, the clients are
+replaced by stand-ins answering from the fixtures after sleeping for the
+recorded time, so runs need no network or API keys but keep realistic
+latencies.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable
+from typing import Any
+
+import langchain_openai
+from langchain_core.embeddings import Embeddings
+from langchain_core.runnables import Runnable, RunnableLambda
+from pydantic import BaseModel
+
+import food_co2_estimator.retrievers.search_retriever as search_retriever_module
+import food_co2_estimator.url.url2markdown as url2markdown_module
+import food_co2_estimator.utils.openai_model as openai_model_module
+from food_co2_estimator.language.detector import Languages
+from food_co2_estimator.language.providers import TranslationProviderManager
+
+PAGES = "pages"
+LLM = "llm"
+EMBEDDINGS = "embeddings"
+TRANSLATIONS = "translations"
+SEARCHES = "searches"
+
+
+class MissingFixtureError(KeyError):
+    """Raised when an interaction was not recorded."""
+
+
+def hash_key(*parts: str) -> str:
+    return hashlib.sha256("|".join(parts).encode()).hexdigest()
+
+
+class FixtureStore:
+    """
+    Recorded responses by kind and key, with the seconds each one took.
+    Replayed responses are delayed by their recorded time times
+    `latency_scale`, so 0 replays without any delay.
+    """
+
+    def __init__(self, path: str, latency_scale: float = 1.0):
+        self.path = path
+        self.latency_scale = latency_scale
+        self.fixtures: dict[str, dict[str, dict[str, Any]]] = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as file:
+                self.fixtures = json.load(file)
+        self.missing: Counter[str] = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, kind: str, key: str, value: Any, seconds: float) -> None:
+        with self._lock:
+            self.fixtures.setdefault(kind, {})[key] = {
+                "value": value,
+                "seconds": seconds,
+            }
+
+    def lookup(self, kind: str, key: str) -> tuple[Any, float]:
+        fixture = self.fixtures.get(kind, {}).get(key)
+        if fixture is None:
+            with self._lock:
+                self.missing[kind] += 1
+            raise MissingFixtureError(f"No recorded {kind} for {key[:80]}")
+        return fixture["value"], fixture["seconds"] * self.latency_scale
+
+    def replay(self, kind: str, key: str) -> Any:
+        value, delay = self.lookup(kind, key)
+        time.sleep(delay)
+        return value
+
+    async def areplay(self, kind: str, key: str) -> Any:
+        value, delay = self.lookup(kind, key)
+        await asyncio.sleep(delay)
+        return value
+
+    def save(self) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as file:
+            json.dump(self.fixtures, file, ensure_ascii=False)
+
+    def summary(self) -> str:
+        return ", ".join(
+            f"{kind}={len(fixtures)}" for kind, fixtures in self.fixtures.items()
+        )
+
+
+class RecordedChatModel:
+    """Stand-in for ChatOpenAI that records or replays structured outputs."""
+
+    def __init__(self, store: FixtureStore, live: bool, client: type, **kwargs):
+        self.store = store
+        self.live = live
+        self.client = client
+        self.kwargs = kwargs
+
+    def with_structured_output(self, schema: type[BaseModel]) -> Runnable:
+        llm = (
+            self.client(**self.kwargs).with_structured_output(schema)
+            if self.live
+            else None
+        )
+
+        async def invoke(prompt) -> BaseModel:
+            key = hash_key(schema.__name__, prompt.to_string())
+            if not self.live:
+                return schema.model_validate(await self.store.areplay(LLM, key))
+            start = time.perf_counter()
+            output = await llm.ainvoke(prompt)  # type: ignore
+            self.store.record(
+                LLM, key, output.model_dump(mode="json"), time.perf_counter() - start
+            )
+            return output
+
+        return RunnableLambda(invoke)
+
+
+class RecordedEmbeddings(Embeddings):
+    """Stand-in for OpenAIEmbeddings that records or replays embeddings."""
+
+    def __init__(self, store: FixtureStore, live: bool, client: type, **kwargs):
+        self.store = store
+        self.live = live
+        self.model = kwargs.get("model", "")
+        if live:
+            self.embeddings = client(**kwargs)
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        keys = [hash_key(self.model, text) for text in texts]
+        if not self.live:
+            lookups = [self.store.lookup(EMBEDDINGS, key) for key in keys]
+            # The texts were embedded in one request, so the delays are shared
+            time.sleep(sum(delay for _, delay in lookups))
+            return [embedding for embedding, _ in lookups]
+
+        start = time.perf_counter()
+        embeddings = self.embeddings.embed_documents(texts)
+        seconds = (time.perf_counter() - start) / max(len(texts), 1)
+        for key, embedding in zip(keys, embeddings):
+            self.store.record(EMBEDDINGS, key, embedding, seconds)
+        return embeddings
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.embed_documents([text])[0]
+
+
+class RecordedSearch:
+    """Stand-in for GoogleSerperAPIWrapper that records or replays searches."""
+
+    def __init__(self, store: FixtureStore, live: bool, client: type, **kwargs):
+        self.store = store
+        self.live = live
+        self.kwargs = kwargs
+        if live:
+            self.search = client(**kwargs)
+
+    async def arun(self, query: str) -> str:
+        key = hash_key(json.dumps(self.kwargs, sort_keys=True), query)
+        if not self.live:
+            return await self.store.areplay(SEARCHES, key)
+        start = time.perf_counter()
+        result = await self.search.arun(query)
+        self.store.record(SEARCHES, key, result, time.perf_counter() - start)
+        return result
+
+
+def install(store: FixtureStore, live: bool) -> None:
+    """
+    Route the pipeline's external interactions through the store. With `live`
+    the real clients are called and recorded, otherwise the store answers.
+    Must be called before the vector store is opened.
+    """
+    fetch_page_content = url2markdown_module.fetch_page_content
+    translate = TranslationProviderManager.translate
+
+    async def fetch(url: str) -> str:
+        if not live:
+            return await store.areplay(PAGES, url)
+        start = time.perf_counter()
+        text = await fetch_page_content(url)
+        store.record(PAGES, url, text, time.perf_counter() - start)
+        return text
+
+    # Same signature as the method it replaces
+    def translate_text(
+        self: TranslationProviderManager,
+        text: str,
+        from_lang: Languages,
+        to_lang: Languages = Languages.English,
+        is_valid: Callable[[str], bool] = lambda translation: True,
+    ) -> str:
+        key = hash_key(from_lang.value, text)
+        if not live:
+            return store.replay(TRANSLATIONS, key)
+        start = time.perf_counter()
+        translation = translate(self, text, from_lang, to_lang, is_valid)
+        store.record(TRANSLATIONS, key, translation, time.perf_counter() - start)
+        return translation
+
+    def stand_in(cls, client: type):
+        # The real client is passed on, as its module name is replaced
+        return lambda **kwargs: cls(store, live, client, **kwargs)
+
+    url2markdown_module.fetch_page_content = fetch
+    TranslationProviderManager.translate = translate_text
+    openai_model_module.ChatOpenAI = stand_in(
+        RecordedChatModel, openai_model_module.ChatOpenAI
+    )
+    # The vector store imports its embeddings client when it is opened
+    langchain_openai.OpenAIEmbeddings = stand_in(
+        RecordedEmbeddings, langchain_openai.OpenAIEmbeddings
+    )
+    search_retriever_module.GoogleSerperAPIWrapper = stand_in(
+        RecordedSearch, search_retriever_module.GoogleSerperAPIWrapper
+    )
@@ -0,0 +1,91 @@
+"""
+Micro-benchmark of the emission retriever backends.
+
+Queries are embeddings already stored in the catalogue with a little noise
+added, so no embedding requests are sent. Run from the repository root:
+
+    python -m benchmarks.retriever_backends --queries 20 --repeat 50
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from food_co2_estimator.data.vector_store import get_vector_store
+from food_co2_estimator.retrievers.numpy_retriever import NumpyEmissionIndex
+
+
+def timed(func, repeat: int) -> tuple[float, object]:
+    result = None
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return (time.perf_counter() - start) / repeat, result
+
+
+def chroma_search(vector_store, queries: np.ndarray, k: int):
+    return [
+        vector_store.similarity_search_by_vector(query.tolist(), k=k)
+        for query in queries
+    ]
+
+
+def overlap(expected, actual) -> float:
+    matches = sum(
+        len({doc.id for doc in a} & {doc.id for doc in b})
+        for a, b in zip(expected, actual)
+    )
+    return matches / sum(len(documents) for documents in expected)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Micro-benchmark of the emission retriever backends."
+    )
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--noise", type=float, default=0.01)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    vector_store = get_vector_store()
+    data = vector_store.get(include=["embeddings"])
+    print(f"Chroma open:          {time.perf_counter() - start:8.4f} s")
+
+    indexes = {}
+    for quantize in (False, True):
+        start = time.perf_counter()
+        indexes[quantize] = NumpyEmissionIndex.from_vector_store(
+            vector_store, quantize=quantize
+        )
+        print(
+            f"Numpy load ({'int8' if quantize else 'f32 '}):    "
+            f"{time.perf_counter() - start:8.4f} s"
+        )
+
+    rng = np.random.default_rng(args.seed)
+    embeddings = np.asarray(data["embeddings"], dtype=np.float32)
+    rows = rng.choice(len(embeddings), size=args.queries, replace=False)
+    queries = embeddings[rows] + rng.normal(
+        scale=args.noise, size=(args.queries, embeddings.shape[1])
+    ).astype(np.float32)
+
+    print(f"\n{args.queries} queries, k={args.k}, mean of {args.repeat} runs")
+    chroma_time, expected = timed(
+        lambda: chroma_search(vector_store, queries, args.k), args.repeat
+    )
+    print(f"chroma:      {chroma_time * 1000:8.3f} ms")
+    for quantize, index in indexes.items():
+        numpy_time, actual = timed(lambda: index.search(queries, k=args.k), args.repeat)
+        print(
+            f"numpy {'int8' if quantize else 'f32 '}:  {numpy_time * 1000:8.3f} ms  "
+            f"({chroma_time / numpy_time:.0f}x, "
+            f"overlap with chroma {overlap(expected, actual):.1%})"
+        )
+
+
+if __name__ == "__main__":
+    main()
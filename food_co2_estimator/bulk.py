@@ -0,0 +1,256 @@
+"""
+Estimate the emissions of many recipes, e.g. to score a list of recipe URLs.
+
+    python -m food_co2_estimator.bulk urls.txt --output results.jsonl
+
+The input is a text file with a URL per line, or a JSONL file with a "url"
+field per line. Results, with the weight, emission factor and source of each
+ingredient, are appended to the output as JSONL as soon as each recipe is
+done, so an interrupted run continues where it stopped when it is started
+again with the same output file.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import time
+from collections.abc import AsyncIterator, Iterable
+from dataclasses import asdict, dataclass
+from typing import Any
+from urllib.parse import urlsplit
+
+from food_co2_estimator.chains.registry import close_chain_registry
+from food_co2_estimator.jobs.variables import WARM_UP_ON_START
+from food_co2_estimator.main import NEGLIGEBLE_THRESHOLD, async_estimate_result
+from food_co2_estimator.url.fetcher import close_page_fetcher
+from food_co2_estimator.utils.stage_scheduler import StageError
+from food_co2_estimator.warmup import warm_up_pipeline
+
+DEFAULT_CONCURRENCY = 4
+DEFAULT_PER_HOST_CONCURRENCY = 1
+# Minimum time between starting two recipes from the same site
+DEFAULT_HOST_DELAY_SECONDS = 1.0
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BulkResult:
+    url: str
+    status: str
+    result: dict[str, Any] | None = None
+    error: str | None = None
+    seconds: float = 0.0
+
+
+class HostLimiter:
+    """Limits concurrent recipes per site and spaces out their starts."""
+
+    def __init__(self, concurrency: int, delay_seconds: float):
+        self.concurrency = concurrency
+        self.delay_seconds = delay_seconds
+        self._semaphores: dict[str, asyncio.Semaphore] = {}
+        self._next_start: dict[str, float] = {}
+
+    async def acquire(self, url: str) -> None:
+        host = urlsplit(url).netloc.lower()
+        semaphore = self._semaphores.setdefault(
+            host, asyncio.Semaphore(self.concurrency)
+        )
+        await semaphore.acquire()
+
+        now = time.monotonic()
+        start = max(now, self._next_start.get(host, now))
+        self._next_start[host] = start + self.delay_seconds
+        try:
+            await asyncio.sleep(start - now)
+        except BaseException:
+            semaphore.release()
+            raise
+
+    def release(self, url: str) -> None:
+        self._semaphores[urlsplit(url).netloc.lower()].release()
+
+
+async def estimate_one(
+    url: str,
+    semaphore: asyncio.Semaphore,
+    host_limiter: HostLimiter,
+    negligeble_threshold: float,
+    verbose: bool,
+) -> BulkResult:
+    # The site is waited for before taking a global slot, so recipes waiting for
+    # a busy site do not keep recipes from other sites from starting
+    await host_limiter.acquire(url)
+    try:
+        async with semaphore:
+            start_time = time.perf_counter()
+            try:
+                result = await async_estimate_result(
+                    url=url, verbose=verbose, negligeble_threshold=negligeble_threshold
+                )
+                return BulkResult(
+                    url=url,
+                    status="completed",
+                    result=result.model_dump(mode="json"),
+                    seconds=time.perf_counter() - start_time,
+                )
+            except StageError as e:
+                # Recipes that cannot be estimated are failures, not results
+                return BulkResult(
+                    url=url,
+                    status="failed",
+                    error=e.message,
+                    seconds=time.perf_counter() - start_time,
+                )
+            except Exception as e:
+                logger.exception("URL=%s: Estimation failed", url)
+                return BulkResult(
+                    url=url,
+                    status="failed",
+                    error=str(e),
+                    seconds=time.perf_counter() - start_time,
+                )
+    finally:
+        host_limiter.release(url)
+
+
+async def estimate_many(
+    urls: Iterable[str],
+    concurrency: int = DEFAULT_CONCURRENCY,
+    per_host_concurrency: int = DEFAULT_PER_HOST_CONCURRENCY,
+    host_delay_seconds: float = DEFAULT_HOST_DELAY_SECONDS,
+    negligeble_threshold: float = NEGLIGEBLE_THRESHOLD,
+    verbose: bool = False,
+) -> AsyncIterator[BulkResult]:
+    """
+    Estimate the emissions of the recipes at the given URLs, at most
+    `concurrency` at a time and `per_host_concurrency` per site. Results are
+    yielded in the order the estimations finish.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    host_limiter = HostLimiter(per_host_concurrency, host_delay_seconds)
+    tasks = [
+        asyncio.create_task(
+            estimate_one(url, semaphore, host_limiter, negligeble_threshold, verbose)
+        )
+        for url in dict.fromkeys(urls)
+    ]
+    try:
+        for task in asyncio.as_completed(tasks):
+            yield await task
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def read_urls(path: str) -> list[str]:
+    urls = []
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            urls.append(json.loads(line)["url"] if line.startswith("{") else line)
+    return urls
+
+
+def read_completed_urls(path: str) -> set[str]:
+    """Return the URLs with a completed result in an earlier output file."""
+    completed = set()
+    try:
+        with open(path, encoding="utf-8") as file:
+            for line in file:
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError:
+                    # The last line of an interrupted run may be cut off
+                    continue
+                if row.get("status") == "completed":
+                    completed.add(row["url"])
+    except FileNotFoundError:
+        pass
+    return completed
+
+
+def truncate_partial_line(path: str) -> None:
+    """Cut off a last line left unfinished by an interrupted run."""
+    try:
+        with open(path, "rb+") as file:
+            content = file.read()
+            if content and not content.endswith(b"\n"):
+                file.truncate(content.rfind(b"\n") + 1)
+    except FileNotFoundError:
+        pass
+
+
+async def run_bulk(args: argparse.Namespace) -> None:
+    urls = read_urls(args.input)
+    completed = set() if args.restart else read_completed_urls(args.output)
+    remaining = [url for url in urls if url not in completed]
+    logger.info(
+        "Estimating %s recipes, %s already done in %s",
+        len(remaining),
+        len(urls) - len(remaining),
+        args.output,
+    )
+
+    if WARM_UP_ON_START:
+        await warm_up_pipeline()
+    mode = "w" if args.restart else "a"
+    if not args.restart:
+        # Results are appended after the last complete line
+        truncate_partial_line(args.output)
+    try:
+        with open(args.output, mode, encoding="utf-8") as output:
+            results = estimate_many(
+                remaining,
+                concurrency=args.concurrency,
+                per_host_concurrency=args.per_host_concurrency,
+                host_delay_seconds=args.host_delay,
+                verbose=args.verbose,
+            )
+            number = 0
+            async for result in results:
+                number += 1
+                output.write(json.dumps(asdict(result), ensure_ascii=False) + "\n")
+                output.flush()
+                logger.info(
+                    "%s/%s: %s %s", number, len(remaining), result.status, result.url
+                )
+    finally:
+        await close_page_fetcher()
+        await close_chain_registry()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Estimate the CO2 emission of many recipe URLs."
+    )
+    parser.add_argument("input", help="Text file with a URL per line, or JSONL")
+    parser.add_argument("-o", "--output", required=True, help="JSONL result file")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument(
+        "--per-host-concurrency", type=int, default=DEFAULT_PER_HOST_CONCURRENCY
+    )
+    parser.add_argument(
+        "--host-delay",
+        type=float,
+        default=DEFAULT_HOST_DELAY_SECONDS,
+        help="Seconds between starting two recipes from the same site",
+    )
+    parser.add_argument(
+        "--restart",
+        action="store_true",
+        help="Overwrite the output instead of resuming from it",
+    )
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(run_bulk(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import logging
+import re
+from array import array
+
+from langchain_core.embeddings import Embeddings
+
+from food_co2_estimator.cache.sqlite_cache import SQLiteCache
+from food_co2_estimator.cache.variables import (
+    EMBEDDING_CACHE_MAX_ENTRIES,
+    EMBEDDING_CACHE_PATH,
+)
+
+logger = logging.getLogger(__name__)
+
+_embedding_cache: SQLiteCache | None = None
+
+
+def get_embedding_cache() -> SQLiteCache:
+    global _embedding_cache
+    if _embedding_cache is None:
+        _embedding_cache = SQLiteCache(
+            path=EMBEDDING_CACHE_PATH,
+            table="embeddings",
+            max_entries=EMBEDDING_CACHE_MAX_ENTRIES,
+        )
+    return _embedding_cache
+
+
+def normalize_text(text: str) -> str:
+    return re.sub(r"\s+", " ", text).strip().lower()
+
+
+def get_embedding_cache_key(model: str, text: str) -> str:
+    return f"{model}|{text}"
+
+
+def encode_embedding(embedding: list[float]) -> bytes:
+    # OpenAI returns float32 vectors, so storing them as float32 is lossless
+    return array("f", embedding).tobytes()
+
+
+def decode_embedding(value: bytes) -> list[float]:
+    return array("f", value).tolist()
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Wraps an embedding model with a persistent cache keyed by model and
+    normalized text. Only texts not seen before are sent to the model, in a
+    single batch.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        model: str,
+        cache: SQLiteCache | None = None,
+    ):
+        self.embeddings = embeddings
+        self.model = model
+        self.cache = get_embedding_cache() if cache is None else cache
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        normalized_texts = [normalize_text(text) for text in texts]
+        keys = [get_embedding_cache_key(self.model, text) for text in normalized_texts]
+        cached_entries = self.cache.get_many(keys)
+        embeddings = {
+            key: decode_embedding(entry.value) for key, entry in cached_entries.items()
+        }
+
+        missing = {
+            key: text
+            for key, text in zip(keys, normalized_texts)
+            if key not in embeddings
+        }
+        if missing:
+            new_embeddings = self.embeddings.embed_documents(list(missing.values()))
+            embeddings.update(zip(missing.keys(), new_embeddings))
+            self.cache.set_many(
+                {
+                    key: encode_embedding(embedding)
+                    for key, embedding in zip(missing.keys(), new_embeddings)
+                }
+            )
+
+        logger.debug(
+            "Embedding cache: %s hits, %s misses (total hits=%s, misses=%s)",
+            len(cached_entries),
+            len(missing),
+            self.cache.stats.hits,
+            self.cache.stats.misses,
+        )
+        return [embeddings[key] for key in keys]
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.embed_documents([text])[0]
@@ -0,0 +1,78 @@
+import hashlib
+import json
+import logging
+from typing import Any
+
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.load import dumps, loads
+from langchain_core.messages import AIMessage
+
+from food_co2_estimator.cache.sqlite_cache import SQLiteCache
+from food_co2_estimator.cache.variables import (
+    LLM_CACHE_MAX_ENTRIES,
+    LLM_CACHE_PATH,
+    LLM_CACHE_TTL_SECONDS,
+)
+from food_co2_estimator.metrics.pipeline import LLM_CACHE_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+_llm_cache: SQLiteCache | None = None
+
+
+def get_llm_response_cache() -> SQLiteCache:
+    global _llm_cache
+    if _llm_cache is None:
+        _llm_cache = SQLiteCache(
+            path=LLM_CACHE_PATH,
+            table="llm_responses",
+            ttl_seconds=LLM_CACHE_TTL_SECONDS,
+            max_entries=LLM_CACHE_MAX_ENTRIES,
+        )
+    return _llm_cache
+
+
+def get_llm_cache_key(prompt: str, llm_string: str) -> str:
+    # The llm string holds the model, its parameters and the tool of the
+    # structured output schema, and the prompt holds the serialized messages
+    return hashlib.sha256(f"{llm_string}|{prompt}".encode()).hexdigest()
+
+
+def strip_usage(generation: Any) -> Any:
+    """Drop the token usage, so cache hits are not counted as spent tokens."""
+    message = getattr(generation, "message", None)
+    if isinstance(message, AIMessage) and message.usage_metadata is not None:
+        generation = generation.model_copy(
+            update={"message": message.model_copy(update={"usage_metadata": None})}
+        )
+    return generation
+
+
+class LLMResponseCache(BaseCache):
+    """
+    LangChain cache of LLM responses in the shared SQLite LLM cache. Chains
+    get a cache each, so hits and misses are counted per chain.
+    """
+
+    def __init__(self, chain: str, cache: SQLiteCache | None = None):
+        self.chain = chain
+        self.cache = get_llm_response_cache() if cache is None else cache
+
+    def lookup(self, prompt: str, llm_string: str) -> RETURN_VAL_TYPE | None:
+        entry = self.cache.get(get_llm_cache_key(prompt, llm_string))
+        if entry is None:
+            LLM_CACHE_REQUESTS.inc(chain=self.chain, result="miss")
+            return None
+
+        LLM_CACHE_REQUESTS.inc(chain=self.chain, result="hit")
+        logger.info("LLM cache hit for chain %s", self.chain)
+        return [loads(generation) for generation in json.loads(entry.value)]
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        value = json.dumps(
+            [dumps(strip_usage(generation)) for generation in return_val]
+        )
+        self.cache.set(get_llm_cache_key(prompt, llm_string), value)
+
+    def clear(self, **kwargs: Any) -> None:
+        self.cache.clear()
@@ -0,0 +1,81 @@
+import hashlib
+import json
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from food_co2_estimator.cache.sqlite_cache import SQLiteCache
+from food_co2_estimator.cache.variables import (
+    RESULT_CACHE_MAX_ENTRIES,
+    RESULT_CACHE_PATH,
+    RESULT_CACHE_STALE_SECONDS,
+    RESULT_CACHE_TTL_SECONDS,
+    TRACKING_QUERY_PARAMS,
+    TRACKING_QUERY_PREFIXES,
+)
+from food_co2_estimator.chains.variables import get_model_name_from_env
+from food_co2_estimator.data.vector_store.variables import (
+    EMBEDDING_MODEL,
+    EMISSION_DB_VERSION,
+)
+
+DEFAULT_PORTS = {"http": ":80", "https": ":443"}
+# Changed when the format of cached results changes, so old entries are missed
+RESULT_FORMAT_VERSION = 3
+
+_result_cache: SQLiteCache | None = None
+
+
+def get_result_cache() -> SQLiteCache:
+    global _result_cache
+    if _result_cache is None:
+        _result_cache = SQLiteCache(
+            path=RESULT_CACHE_PATH,
+            table="results",
+            ttl_seconds=RESULT_CACHE_TTL_SECONDS,
+            stale_seconds=RESULT_CACHE_STALE_SECONDS,
+            max_entries=RESULT_CACHE_MAX_ENTRIES,
+        )
+    return _result_cache
+
+
+def is_tracking_param(name: str) -> bool:
+    name = name.lower()
+    return name in TRACKING_QUERY_PARAMS or any(
+        name.startswith(prefix) for prefix in TRACKING_QUERY_PREFIXES
+    )
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Normalize a recipe URL so trivially different links share a cache entry:
+    lowercase scheme and host, drop default ports, fragments, trailing slashes
+    and tracking parameters, and sort the remaining query parameters.
+    Input that is not a http(s) URL is only stripped of whitespace.
+    """
+    url = url.strip()
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    if scheme not in DEFAULT_PORTS or not parts.netloc:
+        return url
+
+    netloc = parts.netloc.lower().removesuffix(DEFAULT_PORTS[scheme])
+    path = parts.path.rstrip("/") or "/"
+    query = urlencode(
+        sorted(
+            (name, value)
+            for name, value in parse_qsl(parts.query, keep_blank_values=True)
+            if not is_tracking_param(name)
+        )
+    )
+    return urlunsplit((scheme, netloc, path, query, ""))
+
+
+def get_result_cache_key(url: str, negligeble_threshold: float) -> str:
+    key_parts = {
+        "url": canonicalize_url(url),
+        "model": get_model_name_from_env(),
+        "embedding_model": EMBEDDING_MODEL,
+        "emission_db_version": EMISSION_DB_VERSION,
+        "negligeble_threshold": negligeble_threshold,
+        "result_format_version": RESULT_FORMAT_VERSION,
+    }
+    return hashlib.sha256(json.dumps(key_parts, sort_keys=True).encode()).hexdigest()
@@ -0,0 +1,199 @@
+import os
+import re
+import sqlite3
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any
+
+from food_co2_estimator.metrics.pipeline import CACHE_REQUESTS
+
+TABLE_NAME_REGEX = r"^[A-Za-z_][A-Za-z0-9_]*$"
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+@dataclass
+class CacheEntry:
+    value: Any
+    created_at: float
+    ttl_seconds: float | None = None
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.created_at
+
+    @property
+    def is_stale(self) -> bool:
+        return self.ttl_seconds is not None and self.age > self.ttl_seconds
+
+
+class SQLiteCache:
+    """
+    Persistent key-value cache stored in a SQLite file, so it survives restarts
+    and is shared by every process pointing at the same file.
+
+    Entries older than `ttl_seconds` are returned as stale until they are older
+    than `ttl_seconds + stale_seconds`, after which they are deleted. When
+    `max_entries` is set the least recently used entries are evicted.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        table: str = "cache",
+        ttl_seconds: float | None = None,
+        stale_seconds: float = 0,
+        max_entries: int | None = None,
+    ):
+        if not re.match(TABLE_NAME_REGEX, table):
+            raise ValueError(f"Invalid cache table name: {table}")
+        self.path = path
+        self.table = table
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        self.max_entries = max_entries
+        self.stats = CacheStats()
+        self._initialized = False
+
+    def _connect(self) -> sqlite3.Connection:
+        # A connection per operation keeps the cache safe across threads and forks
+        if not self._initialized:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        if not self._initialized:
+            self._create_table(conn)
+        return conn
+
+    def _create_table(self, conn: sqlite3.Connection) -> None:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {self.table} ("
+            "key TEXT PRIMARY KEY, value, created_at REAL, accessed_at REAL)"
+        )
+        conn.execute(
+            f"CREATE INDEX IF NOT EXISTS {self.table}_accessed_at "
+            f"ON {self.table} (accessed_at)"
+        )
+        conn.commit()
+        self._initialized = True
+
+    @property
+    def max_age_seconds(self) -> float | None:
+        if self.ttl_seconds is None:
+            return None
+        return self.ttl_seconds + self.stale_seconds
+
+    def get(self, key: str) -> CacheEntry | None:
+        now = time.time()
+        with self._connection() as conn:
+            row = conn.execute(
+                f"SELECT value, created_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self._record_lookups(hits=0, misses=1)
+                return None
+
+            value, created_at = row
+            max_age = self.max_age_seconds
+            if max_age is not None and now - created_at > max_age:
+                conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                self._record_lookups(hits=0, misses=1)
+                return None
+
+            conn.execute(
+                f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+        self._record_lookups(hits=1, misses=0)
+        return CacheEntry(
+            value=value, created_at=created_at, ttl_seconds=self.ttl_seconds
+        )
+
+    def get_many(self, keys: list[str]) -> dict[str, CacheEntry]:
+        """Look up several keys in one transaction. Missing keys are left out."""
+        now = time.time()
+        max_age = self.max_age_seconds
+        entries = {}
+        with self._connection() as conn:
+            for key in set(keys):
+                row = conn.execute(
+                    f"SELECT value, created_at FROM {self.table} WHERE key = ?",
+                    (key,),
+                ).fetchone()
+                if row is None or (max_age is not None and now - row[1] > max_age):
+                    continue
+                entries[key] = CacheEntry(
+                    value=row[0], created_at=row[1], ttl_seconds=self.ttl_seconds
+                )
+            conn.executemany(
+                f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?",
+                [(now, key) for key in entries],
+            )
+        self._record_lookups(hits=len(entries), misses=len(set(keys)) - len(entries))
+        return entries
+
+    def _record_lookups(self, hits: int, misses: int) -> None:
+        self.stats.hits += hits
+        self.stats.misses += misses
+        if hits:
+            CACHE_REQUESTS.inc(hits, cache=self.table, result="hit")
+        if misses:
+            CACHE_REQUESTS.inc(misses, cache=self.table, result="miss")
+
+    def set(self, key: str, value: Any) -> None:
+        self.set_many({key: value})
+
+    def set_many(self, items: dict[str, Any]) -> None:
+        now = time.time()
+        with self._connection() as conn:
+            conn.executemany(
+                f"INSERT OR REPLACE INTO {self.table} "
+                "(key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                [(key, value, now, now) for key, value in items.items()],
+            )
+            self._evict(conn, now)
+
+    def delete(self, key: str) -> None:
+        with self._connection() as conn:
+            conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        with self._connection() as conn:
+            conn.execute(f"DELETE FROM {self.table}")
+
+    def __len__(self) -> int:
+        with self._connection() as conn:
+            return conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        max_age = self.max_age_seconds
+        if max_age is not None:
+            conn.execute(
+                f"DELETE FROM {self.table} WHERE created_at < ?", (now - max_age,)
+            )
+        if self.max_entries is not None:
+            conn.execute(
+                f"DELETE FROM {self.table} WHERE key IN ("
+                f"SELECT key FROM {self.table} ORDER BY accessed_at DESC "
+                "LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    @contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        conn = self._connect()
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
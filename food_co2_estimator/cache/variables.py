@@ -0,0 +1,35 @@
+import os
+
+CACHE_DIR = os.getenv("CACHE_DIR", f"{os.getcwd()}/.cache")
+
+RESULT_CACHE_ENABLED = os.getenv("RESULT_CACHE_ENABLED", "true").lower() == "true"
+RESULT_CACHE_PATH = f"{CACHE_DIR}/results.db"
+RESULT_CACHE_TTL_SECONDS = int(os.getenv("RESULT_CACHE_TTL_SECONDS", 7 * 24 * 3600))
+RESULT_CACHE_STALE_SECONDS = int(
+    os.getenv("RESULT_CACHE_STALE_SECONDS", 30 * 24 * 3600)
+)
+RESULT_CACHE_MAX_ENTRIES = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", 10_000))
+
+EMBEDDING_CACHE_PATH = f"{CACHE_DIR}/embeddings.db"
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", 100_000))
+
+# Query parameters that never change the content of a recipe page
+TRACKING_QUERY_PARAMS = ["fbclid", "gclid", "mc_cid", "mc_eid", "ref"]
+TRACKING_QUERY_PREFIXES = ["utm_"]
+
+# Fetched recipe pages, revalidated with ETag / Last-Modified on every fetch
+PAGE_CACHE_PATH = f"{CACHE_DIR}/pages.db"
+PAGE_CACHE_MAX_ENTRIES = int(os.getenv("PAGE_CACHE_MAX_ENTRIES", 1_000))
+
+# Structured LLM outputs, keyed by model, prompt messages and output schema.
+# Off by default, as cached answers are not updated when the model changes.
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "false").lower() == "true"
+LLM_CACHE_PATH = f"{CACHE_DIR}/llm.db"
+LLM_CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", 30 * 24 * 3600))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", 50_000))
+
+# Translations of single ingredients, keyed by language pair and normalized text
+TRANSLATION_MEMORY_PATH = f"{CACHE_DIR}/translations.db"
+TRANSLATION_MEMORY_MAX_ENTRIES = int(
+    os.getenv("TRANSLATION_MEMORY_MAX_ENTRIES", 100_000)
+)
@@ -1,5 +1,7 @@
-from langchain_core.runnables import RunnablePassthrough, RunnableSerializable
+import httpx
+from langchain_core.runnables import RunnableLambda, RunnableSerializable
 
+from food_co2_estimator.ingredients.ids import format_ingredients, get_ingredient_names
 from food_co2_estimator.prompt_templates.rag_co2_estimator import (
     RAG_CO2_EMISSION_PROMPT,
 )
@@ -8,14 +10,20 @@ from food_co2_estimator.retrievers.emission_retriever import batch_emission_retr
 from food_co2_estimator.utils.openai_model import get_model
 
 
-def rag_co2_emission_chain(verbose: bool) -> RunnableSerializable:
+def rag_co2_emission_chain(
+    http_async_client: httpx.AsyncClient | None = None,
+) -> RunnableSerializable:
     llm = get_model(
         pydantic_model=CO2Emissions,
-        verbose=verbose,
+        http_async_client=http_async_client,
+        chain_name="rag_co2_estimator",
     )
 
     return (
-        {"context": batch_emission_retriever, "ingredients": RunnablePassthrough()}
+        {
+            "context": RunnableLambda(get_ingredient_names) | batch_emission_retriever,
+            "ingredients": format_ingredients,
+        }
         | RAG_CO2_EMISSION_PROMPT
         | llm
     )
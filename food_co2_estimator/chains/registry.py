@@ -0,0 +1,138 @@
+import asyncio
+import logging
+import weakref
+from enum import Enum
+from typing import TYPE_CHECKING
+
+from food_co2_estimator.chains.variables import (
+    OPENAI_CONNECT_TIMEOUT_SECONDS,
+    OPENAI_KEEPALIVE_EXPIRY_SECONDS,
+    OPENAI_MAX_CONNECTIONS,
+    OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+    OPENAI_TIMEOUT_SECONDS,
+)
+
+if TYPE_CHECKING:
+    import httpx
+    from langchain_core.runnables import Runnable, RunnableConfig
+
+logger = logging.getLogger(__name__)
+
+# One registry per event loop, as the HTTP client of its chains belongs to the loop
+_registries: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, "ChainRegistry"] = (
+    weakref.WeakKeyDictionary()
+)
+
+
+class Chains(Enum):
+    RecipeExtractor = "recipe_extractor"
+    WeightEstimator = "weight_estimator"
+    RagCO2Estimator = "rag_co2_estimator"
+    SearchCO2Estimator = "search_co2_estimator"
+    Translator = "translator"
+
+
+def build_chain(chain: Chains, http_client: "httpx.AsyncClient") -> "Runnable":
+    # The chain modules load langchain, the OpenAI client and the retrievers,
+    # so they are imported when their chain is built rather than at startup
+    if chain == Chains.RecipeExtractor:
+        from food_co2_estimator.chains.recipe_extractor import (
+            get_recipe_extractor_chain,
+        )
+
+        return get_recipe_extractor_chain(http_client)
+    if chain == Chains.WeightEstimator:
+        from food_co2_estimator.chains.weight_estimator import (
+            get_weight_estimator_chain,
+        )
+
+        return get_weight_estimator_chain(http_client)
+    if chain == Chains.RagCO2Estimator:
+        from food_co2_estimator.chains.rag_co2_estimator import rag_co2_emission_chain
+
+        return rag_co2_emission_chain(http_client)
+    if chain == Chains.SearchCO2Estimator:
+        from food_co2_estimator.chains.search_co2_estimator import (
+            get_search_co2_emission_chain,
+        )
+
+        return get_search_co2_emission_chain(http_client)
+
+    from food_co2_estimator.chains.translator import get_translation_chain
+
+    return get_translation_chain()
+
+
+def create_openai_http_client() -> "httpx.AsyncClient":
+    import httpx
+
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(
+            OPENAI_TIMEOUT_SECONDS, connect=OPENAI_CONNECT_TIMEOUT_SECONDS
+        ),
+        limits=httpx.Limits(
+            max_connections=OPENAI_MAX_CONNECTIONS,
+            max_keepalive_connections=OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=OPENAI_KEEPALIVE_EXPIRY_SECONDS,
+        ),
+    )
+
+
+class ChainRegistry:
+    """
+    Builds each chain once and shares it between requests. All OpenAI models
+    of the chains send their requests through one pooled keep-alive client.
+    """
+
+    def __init__(self, http_client: "httpx.AsyncClient | None" = None):
+        self.http_client = (
+            create_openai_http_client() if http_client is None else http_client
+        )
+        self._chains: dict[Chains, "Runnable"] = {}
+
+    def get(self, chain: Chains) -> "Runnable":
+        if chain not in self._chains:
+            logger.info("Building chain %s", chain.value)
+            self._chains[chain] = build_chain(chain, self.http_client)
+        return self._chains[chain]
+
+    def build_all(self) -> None:
+        for chain in Chains:
+            self.get(chain)
+
+    async def aclose(self) -> None:
+        await self.http_client.aclose()
+
+
+def get_chain_registry() -> ChainRegistry:
+    loop = asyncio.get_running_loop()
+    registry = _registries.get(loop)
+    if registry is None:
+        registry = ChainRegistry()
+        _registries[loop] = registry
+    return registry
+
+
+def get_chain(chain: Chains) -> "Runnable":
+    return get_chain_registry().get(chain)
+
+
+async def warm_up_chains() -> None:
+    """Build all chains of the running event loop before the first request."""
+    get_chain_registry().build_all()
+
+
+async def close_chain_registry() -> None:
+    """Close the registry of the running event loop, e.g. before the loop ends."""
+    registry = _registries.pop(asyncio.get_running_loop(), None)
+    if registry is not None:
+        await registry.aclose()
+
+
+def get_run_config(verbose: bool) -> "RunnableConfig":
+    """Config for a call of a shared chain, printing its steps if verbose."""
+    if not verbose:
+        return {}
+    from langchain_core.callbacks import StdOutCallbackHandler
+
+    return {"callbacks": [StdOutCallbackHandler()]}
@@ -1,5 +1,7 @@
-from langchain_core.runnables import RunnablePassthrough
+import httpx
+from langchain_core.runnables import RunnableLambda
 
+from food_co2_estimator.ingredients.ids import format_ingredients, get_ingredient_names
 from food_co2_estimator.prompt_templates.search_co2_estimator import (
     SEARCH_CO2_EMISSION_PROMPT,
 )
@@ -8,16 +10,20 @@ from food_co2_estimator.retrievers.search_retriever import batch_co2_search_retr
 from food_co2_estimator.utils.openai_model import get_model
 
 
-def get_search_co2_emission_chain(verbose: bool):
+def get_search_co2_emission_chain(
+    http_async_client: httpx.AsyncClient | None = None,
+):
     llm = get_model(
         pydantic_model=CO2SearchResults,
-        verbose=verbose,
+        http_async_client=http_async_client,
+        chain_name="search_co2_estimator",
     )
 
     return (
         {
-            "search_results": batch_co2_search_retriever,
-            "ingredients": RunnablePassthrough(),
+            "search_results": RunnableLambda(get_ingredient_names)
+            | batch_co2_search_retriever,
+            "ingredients": format_ingredients,
         }
         | SEARCH_CO2_EMISSION_PROMPT
         | llm
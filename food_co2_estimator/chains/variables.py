@@ -0,0 +1,20 @@
+import os
+
+DEFAULT_MODEL = "gpt-4o-mini"
+
+
+def get_model_name_from_env() -> str:
+    return os.getenv("GPT_MODEL", DEFAULT_MODEL)
+
+
+# Limits of the HTTP client shared by the OpenAI models of an event loop
+OPENAI_MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", 20))
+OPENAI_MAX_KEEPALIVE_CONNECTIONS = int(
+    os.getenv("OPENAI_MAX_KEEPALIVE_CONNECTIONS", 10)
+)
+OPENAI_KEEPALIVE_EXPIRY_SECONDS = 30
+OPENAI_CONNECT_TIMEOUT_SECONDS = 5
+OPENAI_TIMEOUT_SECONDS = float(os.getenv("OPENAI_TIMEOUT_SECONDS", 120))
+
+# Times ingredients missing from an LLM answer are requested again on their own
+MISSING_INGREDIENT_RETRIES = int(os.getenv("MISSING_INGREDIENT_RETRIES", 1))
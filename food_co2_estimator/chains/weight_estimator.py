@@ -1,5 +1,6 @@
 from typing import Any
 
+import httpx
 from langchain.schema.runnable import RunnableSerializable
 
 from food_co2_estimator.prompt_templates.weight_estimator import WEIGHT_EST_PROMPT
@@ -8,8 +9,12 @@ from food_co2_estimator.utils.openai_model import get_model
 
 
 def get_weight_estimator_chain(
-    verbose: bool = False,
+    http_async_client: httpx.AsyncClient | None = None,
 ) -> RunnableSerializable[Any, Any]:
-    llm = get_model(pydantic_model=WeightEstimates, verbose=verbose)
+    llm = get_model(
+        pydantic_model=WeightEstimates,
+        http_async_client=http_async_client,
+        chain_name="weight_estimator",
+    )
     chain = WEIGHT_EST_PROMPT | llm
     return chain
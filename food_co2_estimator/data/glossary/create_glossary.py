@@ -0,0 +1,319 @@
+"""
+Build the Danish to English glossary used to translate ingredients offline.
+Food names are taken from the emission database, which pairs the Danish
+`Navn` with the English `Name`, and completed with common recipe words.
+Run from the repository root:
+
+    python food_co2_estimator/data/glossary/create_glossary.py
+"""
+
+import csv
+import json
+import re
+from collections import Counter, defaultdict
+
+from food_co2_estimator.data.glossary.variables import (
+    EMISSIONS_CSV_PATH,
+    GLOSSARY_PATH,
+)
+
+# Words in recipes that are not food names in the emission database, and
+# database names that are ambiguous or read badly in a recipe
+COMMON_TERMS = {
+    # Units
+    "g": "g",
+    "gram": "grams",
+    "kg": "kg",
+    "kilo": "kg",
+    "mg": "mg",
+    "l": "l",
+    "liter": "liters",
+    "dl": "dl",
+    "cl": "cl",
+    "ml": "ml",
+    "spsk": "tbsp",
+    "spiseske": "tablespoon",
+    "spiseskefuld": "tablespoon",
+    "tsk": "tsp",
+    "teske": "teaspoon",
+    "knsp": "pinch",
+    "knivspids": "pinch",
+    "stk": "pcs",
+    "fed": "cloves",
+    "bundt": "bunch",
+    "bdt": "bunch",
+    "dåse": "can",
+    "ds": "can",
+    "pakke": "package",
+    "pk": "package",
+    "pose": "bag",
+    "glas": "jar",
+    "håndfuld": "handful",
+    "skive": "slice",
+    "skiver": "slices",
+    "kop": "cup",
+    "stilk": "stalk",
+    "stilke": "stalks",
+    "kvist": "sprig",
+    "kviste": "sprigs",
+    "blade": "leaves",
+    "blad": "leaf",
+    "plade": "sheet",
+    "plader": "sheets",
+    "terning": "cube",
+    "terninger": "cubes",
+    "tern": "dice",
+    "strimler": "strips",
+    "både": "wedges",
+    # Preparation and state
+    "hakket": "chopped",
+    "hakkede": "chopped",
+    "finthakket": "finely chopped",
+    "finthakkede": "finely chopped",
+    "grofthakket": "coarsely chopped",
+    "revet": "grated",
+    "revne": "grated",
+    "fintrevet": "finely grated",
+    "skåret": "cut",
+    "skårne": "cut",
+    "snittet": "sliced",
+    "presset": "pressed",
+    "knust": "crushed",
+    "knuste": "crushed",
+    "kogt": "boiled",
+    "kogte": "boiled",
+    "stegt": "fried",
+    "stegte": "fried",
+    "bagt": "baked",
+    "ristet": "toasted",
+    "ristede": "toasted",
+    "røget": "smoked",
+    "smeltet": "melted",
+    "blødt": "softened",
+    "udblødt": "soaked",
+    "skyllet": "rinsed",
+    "skrællet": "peeled",
+    "skrællede": "peeled",
+    "flået": "peeled",
+    "flåede": "peeled",
+    "udstenet": "pitted",
+    "udstenede": "pitted",
+    "frisk": "fresh",
+    "friske": "fresh",
+    "frosne": "frozen",
+    "frossen": "frozen",
+    "frosset": "frozen",
+    "tørret": "dried",
+    "tørrede": "dried",
+    "tør": "dry",
+    "tørt": "dry",
+    "malet": "ground",
+    "stødt": "ground",
+    "hel": "whole",
+    "hele": "whole",
+    "halve": "halves",
+    "halveret": "halved",
+    "kold": "cold",
+    "koldt": "cold",
+    "varm": "warm",
+    "varmt": "warm",
+    "lunken": "lukewarm",
+    "moden": "ripe",
+    "modne": "ripe",
+    "økologisk": "organic",
+    "økologiske": "organic",
+    "fin": "fine",
+    "fint": "finely",
+    "groft": "coarsely",
+    "tynde": "thin",
+    "tynd": "thin",
+    "tykke": "thick",
+    # Sizes and colours
+    "stor": "large",
+    "store": "large",
+    "stort": "large",
+    "lille": "small",
+    "små": "small",
+    "mellemstor": "medium",
+    "mellemstore": "medium",
+    "rød": "red",
+    "røde": "red",
+    "rødt": "red",
+    "hvid": "white",
+    "hvide": "white",
+    "hvidt": "white",
+    "grøn": "green",
+    "grønne": "green",
+    "grønt": "green",
+    "gul": "yellow",
+    "gule": "yellow",
+    "sort": "black",
+    "sorte": "black",
+    "brun": "brown",
+    "brune": "brown",
+    "mørk": "dark",
+    "mørke": "dark",
+    "lys": "light",
+    "lyse": "light",
+    "sød": "sweet",
+    "søde": "sweet",
+    "stærk": "hot",
+    "stærke": "hot",
+    "mager": "lean",
+    "magert": "lean",
+    # Function words
+    "og": "and",
+    "eller": "or",
+    "til": "for",
+    "af": "of",
+    "med": "with",
+    "uden": "without",
+    "i": "in",
+    "på": "on",
+    "fra": "from",
+    "evt": "optional",
+    "eventuelt": "optional",
+    "ca": "approx.",
+    "cirka": "approx.",
+    "lidt": "a little",
+    "en": "a",
+    "et": "a",
+    "efter": "to",
+    "smag": "taste",
+    "servering": "serving",
+    "pynt": "garnish",
+    "stegning": "frying",
+    "dressing": "dressing",
+    "fyld": "filling",
+    # Foods missing from the database or named differently in recipes
+    "agurk": "cucumber",
+    "musling": "mussel",
+    "kikærter": "chickpeas",
+    "løg": "onion",
+    "rødløg": "red onion",
+    "skalotteløg": "shallots",
+    "reje": "shrimp",
+    "jordbær": "strawberry",
+    "blåbær": "blueberry",
+    "majs": "corn",
+    "rugbrød": "rye bread",
+    "mineralvand": "mineral water",
+    "sauce": "sauce",
+    "peber": "pepper",
+    "peberfrugt": "bell pepper",
+    "chili": "chili",
+    "chilier": "chilies",
+    "hvidløg": "garlic",
+    "kylling": "chicken",
+    "bryst": "breast",
+    "bryster": "breasts",
+    "lår": "thigh",
+    "fars": "mince",
+    "hakket oksekød": "minced beef",
+    "oksefars": "minced beef",
+    "grisefars": "minced pork",
+    "svinekød": "pork",
+    "kartofler": "potatoes",
+    "gulerødder": "carrots",
+    "mælk": "milk",
+    "sødmælk": "whole milk",
+    "letmælk": "semi-skimmed milk",
+    "minimælk": "skimmed milk",
+    "fløde": "cream",
+    "piskefløde": "whipping cream",
+    "madlavningsfløde": "cooking cream",
+    "creme fraiche": "creme fraiche",
+    "ost": "cheese",
+    "parmesan": "parmesan",
+    "mozzarella": "mozzarella",
+    "feta": "feta",
+    "yoghurt": "yogurt",
+    "sukker": "sugar",
+    "rørsukker": "cane sugar",
+    "flormelis": "icing sugar",
+    "mel": "flour",
+    "olie": "oil",
+    "rapsolie": "rapeseed oil",
+    "citron": "lemon",
+    "citronsaft": "lemon juice",
+    "lime": "lime",
+    "appelsin": "orange",
+    "ris": "rice",
+    "nudler": "noodles",
+    "spaghetti": "spaghetti",
+    "gær": "yeast",
+    "bagepulver": "baking powder",
+    "kanel": "cinnamon",
+    "spidskommen": "cumin",
+    "paprika": "paprika",
+    "karry": "curry",
+    "timian": "thyme",
+    "rosmarin": "rosemary",
+    "basilikum": "basil",
+    "oregano": "oregano",
+    "koriander": "coriander",
+    "laurbærblade": "bay leaves",
+    "muskatnød": "nutmeg",
+    "tomatpuré": "tomato paste",
+    "hakkede tomater": "chopped tomatoes",
+    "kokosmælk": "coconut milk",
+    "sennep": "mustard",
+    "ketchup": "ketchup",
+    "bønner": "beans",
+    "linser": "lentils",
+    "nødder": "nuts",
+    "mandler": "almonds",
+    "bouillonterning": "stock cube",
+    "grøntsagsbouillon": "vegetable stock",
+    "hønsebouillon": "chicken stock",
+    "oksebouillon": "beef stock",
+    "vand": "water",
+    "vin": "wine",
+    "hvidvin": "white wine",
+    "rødvin": "red wine",
+    "tortillas": "tortillas",
+    "brød": "bread",
+    "pizzadej": "pizza dough",
+    "butterdej": "puff pastry",
+    "smør": "butter",
+}
+
+
+# Terms of up to three words, as longer names never match an ingredient line
+TERM_PATTERN = re.compile(r"[^\W\d_]+(?: [^\W\d_]+){0,2}")
+
+
+def get_head(name: str) -> str:
+    """The food of a database name, e.g. 'Oksekød' in 'Oksekød, culotte, rå'."""
+    return name.split(",")[0].strip().lower()
+
+
+def build_database_terms(path: str) -> dict[str, str]:
+    translations: dict[str, Counter[str]] = defaultdict(Counter)
+    with open(path, encoding="utf-8") as file:
+        for row in csv.DictReader(file):
+            translations[get_head(row["Navn"])][get_head(row["Name"])] += 1
+
+    terms = {}
+    for danish, english in translations.items():
+        (first, first_count), *rest = english.most_common()
+        # Names that translate to several foods equally often are left out
+        if rest and rest[0][1] == first_count:
+            continue
+        if not TERM_PATTERN.fullmatch(danish):
+            continue
+        terms[danish] = first
+    return terms
+
+
+def build_glossary() -> dict[str, str]:
+    terms = build_database_terms(EMISSIONS_CSV_PATH)
+    terms.update(COMMON_TERMS)
+    return dict(sorted(terms.items()))
+
+
+if __name__ == "__main__":
+    glossary = build_glossary()
+    with open(GLOSSARY_PATH, "w", encoding="utf-8") as file:
+        json.dump(glossary, file, ensure_ascii=False, indent=2)
+    print(f"Wrote {len(glossary)} terms to {GLOSSARY_PATH}")
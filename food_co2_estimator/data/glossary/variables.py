@@ -0,0 +1,4 @@
+import os
+
+EMISSIONS_CSV_PATH = f"{os.getcwd()}/food_co2_estimator/data/sql/dk_co2_emissions.csv"
+GLOSSARY_PATH = f"{os.getcwd()}/food_co2_estimator/data/glossary/da_en_glossary.json"
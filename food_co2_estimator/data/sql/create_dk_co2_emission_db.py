@@ -1,13 +1,15 @@
-import os
 import sqlite3
 
 import pandas as pd
 
-df = pd.read_excel(
-    f"{os.getcwd()}/food_co2_estimator/data/Results_FINAL_20210201v4.xlsx",
-    sheet_name="Ra_500food",
+from food_co2_estimator.data.sql.variables import (
+    EMISSION_DB_PATH,
+    EMISSION_TABLE_NAME,
+    RESULTS_EXCEL_PATH,
 )
 
+df = pd.read_excel(RESULTS_EXCEL_PATH, sheet_name="Ra_500food")
+
 # Rename columns to database friendly names
 df = df.rename(
     columns={
@@ -20,11 +22,11 @@ df = df.rename(
 df["Total_kg_CO2_eq_kg"] = df["Total_kg_CO2_eq_kg"].round(2)
 df = df.loc[~df["Name"].str.contains("|".join(["Pizza", "Lasagne"]))]  # remove pizza
 
-conn = sqlite3.connect(f"{os.getcwd()}/food_co2_estimator/data/dk_co2_emission.db")
+conn = sqlite3.connect(EMISSION_DB_PATH)
 
 FIELDS = ["Name", "Navn", "Unit", "Total_kg_CO2_eq_kg", "Energy"]
 # create database from df file
-df[FIELDS].to_sql("dk_co2_emission", conn, if_exists="replace", index=False)
+df[FIELDS].to_sql(EMISSION_TABLE_NAME, conn, if_exists="replace", index=False)
 
 # Test that it works by extracting the first row
 c = conn.cursor()
@@ -0,0 +1,7 @@
+import os
+
+EMISSION_DB_PATH = f"{os.getcwd()}/food_co2_estimator/data/sql/dk_co2_emission.db"
+EMISSION_TABLE_NAME = "dk_co2_emission"
+RESULTS_EXCEL_PATH = (
+    f"{os.getcwd()}/food_co2_estimator/data/sql/Results_FINAL_20210201v4.xlsx"
+)
@@ -1,5 +1,7 @@
-from langchain_chroma import Chroma
-from langchain_openai import OpenAIEmbeddings
+import logging
+import os
+import threading
+from typing import TYPE_CHECKING
 
 from food_co2_estimator.data.vector_store.variables import (
     EMBEDDING_MODEL,
@@ -7,11 +9,72 @@ from food_co2_estimator.data.vector_store.variables import (
     VECTOR_DB_PERSIST_DIR,
 )
 
+if TYPE_CHECKING:
+    from langchain_chroma import Chroma
 
-def get_vector_store() -> Chroma:
-    embeddings = OpenAIEmbeddings(model=EMBEDDING_MODEL)
+logger = logging.getLogger(__name__)
+
+# Process-wide vector store, opened lazily on first use
+_vector_store: "Chroma | None" = None
+_vector_store_lock = threading.Lock()
+
+
+def open_vector_store() -> "Chroma":
+    # Imported here, as importing the variables of this package, e.g. for the
+    # result cache key, must not load chroma and the OpenAI client
+    import langchain_openai
+    from langchain_chroma import Chroma
+
+    from food_co2_estimator.cache.embedding_cache import CachedEmbeddings
+
+    embeddings = CachedEmbeddings(
+        langchain_openai.OpenAIEmbeddings(model=EMBEDDING_MODEL), model=EMBEDDING_MODEL
+    )
     return Chroma(
         collection_name=VECTOR_DB_COLLECTION_NAME,
         embedding_function=embeddings,
         persist_directory=VECTOR_DB_PERSIST_DIR,
     )
+
+
+def get_vector_store() -> "Chroma":
+    """
+    Return the vector store shared by all requests in this process. The
+    collection and the embedding HTTP client are opened once and kept warm.
+    """
+    global _vector_store
+    if _vector_store is None:
+        with _vector_store_lock:
+            if _vector_store is None:
+                logger.info("Opening vector store %s", VECTOR_DB_COLLECTION_NAME)
+                _vector_store = open_vector_store()
+    return _vector_store
+
+
+def close_vector_store() -> None:
+    """Release the shared vector store. It is reopened on next use."""
+    global _vector_store
+    with _vector_store_lock:
+        if _vector_store is None:
+            return
+        # Stops the chroma system so the persisted files are released
+        _vector_store._client.clear_system_cache()
+        _vector_store = None
+        logger.info("Closed vector store %s", VECTOR_DB_COLLECTION_NAME)
+
+
+def reload_vector_store() -> "Chroma":
+    """Reopen the shared vector store, e.g. after the collection is rebuilt."""
+    close_vector_store()
+    return get_vector_store()
+
+
+def _reset_after_fork() -> None:
+    # A forked worker must not reuse the parent's file handles, HTTP connections
+    # or lock, so it opens its own vector store on first use.
+    global _vector_store, _vector_store_lock
+    _vector_store = None
+    _vector_store_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
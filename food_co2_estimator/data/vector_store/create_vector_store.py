@@ -8,7 +8,6 @@ from tqdm import tqdm  # Import tqdm for the progress bar
 
 from food_co2_estimator.data.vector_store import get_vector_store
 from food_co2_estimator.data.vector_store.variables import EXCEL_FILE_DIR
-from food_co2_estimator.language.translator import MyTranslator
 
 # Read Excel files
 df_dk = pd.read_excel(EXCEL_FILE_DIR, sheet_name="DK")
@@ -18,10 +17,9 @@ df_gb = pd.read_excel(EXCEL_FILE_DIR, sheet_name="GB")
 emission_records_dk: List[Dict[Any, Any]] = df_dk.to_dict(orient="records")
 emission_records_gb: List[Dict[Any, Any]] = df_gb.to_dict(orient="records")
 
-# Initialize vector store and translator
+# Initialize vector store
 vector_store = get_vector_store()
 vector_store.reset_collection()
-translator = MyTranslator.default()
 
 documents = []
 uuids = []
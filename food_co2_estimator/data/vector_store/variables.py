@@ -1,6 +1,19 @@
 import os
 
 EMBEDDING_MODEL = "text-embedding-3-large"
+EMISSION_DB_VERSION = "DBv2"
 VECTOR_DB_COLLECTION_NAME = "vector_co2_db"
+# Columns of the DK sheet stored as the metadata of each food
+DANISH_NAME_COLUMN = "Navn"
+EMISSION_COLUMN = "Total kg CO2e/kg"
+# Emission factors are rounded to this many decimals wherever they are used
+EMISSION_DECIMALS = 1
 VECTOR_DB_PERSIST_DIR = f"{os.getcwd()}/food_co2_estimator/data/vector_store/store"
-EXCEL_FILE_DIR = f"{os.getcwd()}/food_co2_estimator/data/vector_store/DBv2.xlsx"
+EXCEL_FILE_DIR = (
+    f"{os.getcwd()}/food_co2_estimator/data/vector_store/{EMISSION_DB_VERSION}.xlsx"
+)
+# "chroma" queries the HNSW index, "numpy" keeps all embeddings in one matrix
+EMISSION_RETRIEVER_BACKEND = os.getenv("EMISSION_RETRIEVER_BACKEND", "chroma")
+EMISSION_INDEX_QUANTIZE = (
+    os.getenv("EMISSION_INDEX_QUANTIZE", "false").lower() == "true"
+)
@@ -0,0 +1,90 @@
+import logging
+from collections.abc import Awaitable, Callable
+
+from food_co2_estimator.chains.variables import MISSING_INGREDIENT_RETRIES
+from food_co2_estimator.pydantic_models.recipe_extractor import IngredientResult
+
+logger = logging.getLogger(__name__)
+
+
+def format_ingredients(ingredients: dict[int, str]) -> str:
+    """One ingredient per line, after its id, e.g. '[3] 2 dl cream'."""
+    return "\n".join(
+        f"[{ingredient_id}] {ingredient}"
+        for ingredient_id, ingredient in ingredients.items()
+    )
+
+
+def get_ingredient_names(ingredients: dict[int, str]) -> list[str]:
+    return list(ingredients.values())
+
+
+def get_requested_results(
+    ingredients: dict[int, str], results: list[IngredientResult]
+) -> dict[int, IngredientResult]:
+    """
+    The first result for each requested ingredient by id. Results without an
+    id are given the first unanswered id of their ingredient name, and results
+    for other ids are dropped.
+    """
+    requested_results: dict[int, IngredientResult] = {}
+    for result in results:
+        if result.ingredient_id in ingredients:
+            requested_results.setdefault(result.ingredient_id, result)
+
+    for result in results:
+        if result.ingredient_id is not None:
+            continue
+        ingredient_id = next(
+            (
+                ingredient_id
+                for ingredient_id, ingredient in ingredients.items()
+                if ingredient == result.ingredient
+                and ingredient_id not in requested_results
+            ),
+            None,
+        )
+        if ingredient_id is not None:
+            requested_results[ingredient_id] = result.model_copy(
+                update={"ingredient_id": ingredient_id}
+            )
+    return requested_results
+
+
+async def request_by_id(
+    request: Callable[[dict[int, str]], Awaitable[list[IngredientResult]]],
+    ingredients: dict[int, str],
+    retries: int = MISSING_INGREDIENT_RETRIES,
+) -> list[IngredientResult]:
+    """
+    Requests results for the ingredients, and requests the ingredients missing
+    from the answer again on their own, up to `retries` times.
+    """
+    results: list[IngredientResult] = []
+    missing_ingredients = ingredients
+    for attempt in range(retries + 1):
+        if attempt > 0:
+            logger.info(
+                "Requesting %s ingredients missing from the answer again",
+                len(missing_ingredients),
+            )
+        requested_results = get_requested_results(
+            missing_ingredients, await request(missing_ingredients)
+        )
+        results.extend(requested_results.values())
+        missing_ingredients = {
+            ingredient_id: ingredient
+            for ingredient_id, ingredient in missing_ingredients.items()
+            if ingredient_id not in requested_results
+        }
+        if not missing_ingredients:
+            break
+
+    if missing_ingredients:
+        logger.warning(
+            "No answer for %s of %s ingredients: %s",
+            len(missing_ingredients),
+            len(ingredients),
+            get_ingredient_names(missing_ingredients),
+        )
+    return results
@@ -0,0 +1,206 @@
+import re
+from dataclasses import dataclass
+from typing import List
+
+from food_co2_estimator.ingredients.variables import (
+    INGREDIENT_UNITS,
+    NUMBER_WORDS,
+    UNICODE_FRACTIONS,
+)
+
+NUMBER_PATTERN = r"\d+(?:[.,]\d+)?"
+FRACTIONS_PATTERN = "[" + "".join(UNICODE_FRACTIONS) + "]"
+QUANTITY_PATTERNS = [
+    r"\d+\s+\d+/\d+",  # Mixed fractions (e.g., 1 1/2)
+    r"\d+/\d+",  # Fractions (e.g., 1/2)
+    NUMBER_PATTERN + r"\s*[-–]\s*" + NUMBER_PATTERN,  # Ranges (e.g., 3-4, 1,5-2)
+    r"\d*\s*" + FRACTIONS_PATTERN,  # Unicode fractions (e.g., ½, 1½)
+    NUMBER_PATTERN,  # Whole and decimal numbers (e.g., 2, 0.5, 0,5)
+    r"\b(?:" + "|".join(NUMBER_WORDS) + r")\b",  # Number words (e.g., one, two)
+]
+
+# "1.000" and "1,000" are a thousand with a thousands separator, but one with a
+# decimal separator. Which one is meant depends on the language of the recipe.
+AMBIGUOUS_NUMBER_REGEX = re.compile(r"(?<![\d.,])[1-9]\d{0,2}(?:[.,]\d{3})+(?!\d)")
+
+INGREDIENT_REGEX = re.compile(
+    r"^\s*"
+    r"(?P<quantity>" + "|".join(QUANTITY_PATTERNS) + r")\s*"
+    r"(?:(?P<unit>" + "|".join(re.escape(unit) for unit in INGREDIENT_UNITS) + r")"
+    r"\.?(?=[\s,;:()]|$))?"  # Units as whole words, optional period
+    r"\s*(?:of\b\s*)?"  # Optional 'of' after units
+    r"(?P<name>.*)$",
+    re.IGNORECASE,
+)
+
+
+@dataclass
+class ParsedIngredient:
+    text: str
+    quantity: float | None
+    unit: str | None
+    name: str
+
+
+def parse_quantity(quantity: str) -> float | None:
+    """
+    Converts a quantity string matched by QUANTITY_PATTERNS to a number.
+    Ranges are converted to their midpoint. Returns None for quantities that
+    can be read with a thousands or a decimal separator, e.g. "1.000".
+    """
+    if AMBIGUOUS_NUMBER_REGEX.search(quantity):
+        return None
+    quantity = quantity.strip().lower().replace(",", ".")
+    if quantity in NUMBER_WORDS:
+        return float(NUMBER_WORDS.index(quantity) + 1)
+
+    range_parts = re.split(r"\s*[-–]\s*", quantity)
+    if len(range_parts) == 2:
+        low, high = (parse_quantity(part) for part in range_parts)
+        if low is None or high is None:
+            return None
+        return (low + high) / 2
+
+    total = 0.0
+    for part in re.findall(r"\d+/\d+|\d*\.?\d+|" + FRACTIONS_PATTERN, quantity):
+        if part in UNICODE_FRACTIONS:
+            total += UNICODE_FRACTIONS[part]
+        elif "/" in part:
+            numerator, denominator = part.split("/")
+            if float(denominator) == 0:
+                return None
+            total += float(numerator) / float(denominator)
+        else:
+            total += float(part)
+    return total
+
+
+def parse_ingredient(ingredient: str) -> ParsedIngredient:
+    """
+    Splits an ingredient string into a leading quantity, an optional unit and
+    the remaining name, e.g. "2 dl cream" -> (2.0, "dl", "cream").
+    Quantity and unit are None if the string does not start with a quantity.
+    """
+    match = INGREDIENT_REGEX.match(ingredient)
+    if match is None:
+        return ParsedIngredient(
+            text=ingredient, quantity=None, unit=None, name=ingredient.strip()
+        )
+
+    unit = match.group("unit")
+    return ParsedIngredient(
+        text=ingredient,
+        quantity=parse_quantity(match.group("quantity")),
+        unit=unit.lower() if unit else None,
+        name=match.group("name").strip(),
+    )
+
+
+def get_clean_regex():
+    """
+    Removes quantities, units, and the word 'of' from the beginning of an ingredient string.
+
+    Returns:
+        Pattern object: Compiled regular expression pattern.
+    """
+
+    # Escape any units that might have regex special characters
+    escaped_units = [re.escape(unit) for unit in INGREDIENT_UNITS]
+
+    # Join the units with '|' to create the units part of the regex
+    units_pattern = r"(?:" + "|".join(escaped_units) + r")\.?"
+
+    # Define the regex pattern
+    pattern = r"""
+        ^\s*                                      # Leading whitespace
+        (?:                                       # Non-capturing group to match quantities and units
+            (?:                                   # Non-capturing group for quantity with optional unit
+                (?:
+                    \d+(?:[\/\-]\d+)?             # Numbers with optional fraction or range
+                    | \d*\.\d+                    # Decimal numbers
+                    | \b(?:one|two|three|four|five|six|seven|eight|nine|ten|eleven|twelve)\b  # Number words
+                )
+                \s*                               # Optional whitespace
+                (?:{units})?                      # Optional units
+                \s*                               # Optional whitespace
+            )
+        )+                                        # One or more quantities with optional units
+        (?:of\b\s*)?                              # Optional 'of' followed by optional whitespace
+    """.format(units=units_pattern)
+
+    # Compile the regex pattern with verbose and ignore case flags
+    regex = re.compile(pattern, re.IGNORECASE | re.VERBOSE)
+
+    return regex
+
+
+def remove_quantities(ingredient: str) -> str:
+    """
+    Removes quantities (numbers, fractions, decimals, number words) from the beginning of an ingredient string.
+
+    Args:
+        ingredient (str): The ingredient string to process.
+
+    Returns:
+        str: The ingredient string without leading quantities.
+    """
+    # Create a regex pattern to match quantities
+    quantity_pattern = re.compile(
+        r"^\s*"  # Start of string and optional whitespace
+        r"(?:"  # Non-capturing group for quantities
+        r"\d+(?:[\/\-]\d+)?"  # Whole number with optional fraction or range (e.g., 1, 1/2, 3-4)
+        r"|\d*\.\d+"  # Decimal number (e.g., 0.5, .75)
+        r"|\b(?:" + "|".join(NUMBER_WORDS) + r")\b"  # Number words (e.g., one, two)
+        r")\s*",  # Optional whitespace after quantity
+        re.IGNORECASE,
+    )
+    # Remove the quantity from the ingredient string
+    return quantity_pattern.sub("", ingredient, count=1).strip()
+
+
+def remove_units(ingredient: str) -> str:
+    """
+    Removes units from the beginning of an ingredient string.
+
+    Args:
+        ingredient (str): The ingredient string to process.
+
+    Returns:
+        str: The ingredient string without leading units.
+    """
+    # Escape units for regex and join them into a pattern
+    escaped_units = [re.escape(unit) for unit in INGREDIENT_UNITS]
+    units_pattern_str = (
+        r"\b(?:" + "|".join(escaped_units) + r")\b\.?"
+    )  # Units as whole words, optional period
+
+    # Create a regex pattern to match units with optional 'of' following them
+    units_pattern = re.compile(
+        r"^\s*"  # Start of string and optional whitespace
+        r"(?:" + units_pattern_str + r")"  # Units
+        r"(?:\s+of)?"  # Optional 'of' after units
+        r"\s*",  # Optional whitespace after units
+        re.IGNORECASE,
+    )
+    # Remove the units from the ingredient string
+    return units_pattern.sub("", ingredient, count=1).strip()
+
+
+def clean_ingredient_list(ingredients: List[str]) -> List[str]:
+    """
+    Removes quantities and units from the beginning of each ingredient string in the list.
+
+    Args:
+        ingredients (List[str]): The list of ingredient strings to process.
+
+    Returns:
+        List[str]: A new list with cleaned ingredient strings.
+    """
+    cleaned_ingredients = []
+    for ingredient in ingredients:
+        # Remove quantities
+        no_quantity = remove_quantities(ingredient)
+        # Remove units
+        no_unit = remove_units(no_quantity)
+        cleaned_ingredients.append(no_unit)
+    return cleaned_ingredients
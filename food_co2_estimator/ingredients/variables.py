@@ -0,0 +1,160 @@
+# List of number words to recognize spelled-out quantities
+NUMBER_WORDS = [
+    "one",
+    "two",
+    "three",
+    "four",
+    "five",
+    "six",
+    "seven",
+    "eight",
+    "nine",
+    "ten",
+    "eleven",
+    "twelve",
+]
+
+# List of units, sorted by length in decreasing order to match longer units first
+INGREDIENT_UNITS = sorted(
+    [
+        # Weight Units
+        "kilograms",
+        "milligrams",
+        "kilogram",
+        "milligram",
+        "pounds",
+        "ounces",
+        "grams",
+        "pound",
+        "ounce",
+        "gram",
+        "kg",
+        "mg",
+        "g",
+        "oz",
+        "lb",
+        "lbs",
+        # Volume Units
+        "milliliters",
+        "deciliters",
+        "tablespoons",
+        "teaspoons",
+        "milliliter",
+        "deciliter",
+        "tablespoon",
+        "teaspoon",
+        "pints",
+        "quarts",
+        "gallons",
+        "liters",
+        "litre",
+        "liter",
+        "cups",
+        "pint",
+        "quart",
+        "gallon",
+        "cup",
+        "ml",
+        "l",
+        "dl",
+        "tbsps",
+        "tbsp",
+        "tsp",
+        "spsk",
+        "tsk",
+        "cl",
+        "ltr",
+        "ltrs",
+        # Miscellaneous Units
+        "packages",
+        "bunches",
+        "pinches",
+        "cloves",
+        "slices",
+        "bottles",
+        "pieces",
+        "sticks",
+        "bunch",
+        "pinch",
+        "clove",
+        "slice",
+        "bottle",
+        "piece",
+        "stick",
+        "package",
+        "pkg",
+        "pkgs",
+        "dozen",
+        "jar",
+        "can",
+        "cm",
+        "drop",
+        "drops",
+        "large",
+        ""
+        # Short Units
+        "t",
+        "c",
+    ],
+    key=len,
+    reverse=True,
+)  # Sort units by length in decreasing order
+
+UNICODE_FRACTIONS = {
+    "½": 0.5,
+    "¼": 0.25,
+    "¾": 0.75,
+    "⅓": 1 / 3,
+    "⅔": 2 / 3,
+}
+
+# Weight in kg per unit for units where the weight follows from the amount alone.
+# Only the metric volumes and spoons that EN_WEIGHT_RECALCULATIONS and the answer
+# example convert with the density of water are included. Cups, pints, quarts
+# and gallons are mostly used for dry or leafy goods, e.g. "2 cups spinach", so
+# they are left to the LLM.
+UNIT_WEIGHTS_IN_KG = {
+    # Weight Units
+    "kilograms": 1.0,
+    "kilogram": 1.0,
+    "kg": 1.0,
+    "grams": 0.001,
+    "gram": 0.001,
+    "g": 0.001,
+    "milligrams": 0.000001,
+    "milligram": 0.000001,
+    "mg": 0.000001,
+    "pounds": 0.4536,
+    "pound": 0.4536,
+    "lbs": 0.4536,
+    "lb": 0.4536,
+    "ounces": 0.02835,
+    "ounce": 0.02835,
+    "oz": 0.02835,
+    # Volume Units
+    "liters": 1.0,
+    "liter": 1.0,
+    "litre": 1.0,
+    "ltrs": 1.0,
+    "ltr": 1.0,
+    "l": 1.0,
+    "deciliters": 0.1,
+    "deciliter": 0.1,
+    "dl": 0.1,
+    "cl": 0.01,
+    "milliliters": 0.001,
+    "milliliter": 0.001,
+    "ml": 0.001,
+    "tablespoons": 0.015,
+    "tablespoon": 0.015,
+    "tbsps": 0.015,
+    "tbsp": 0.015,
+    "spsk": 0.015,
+    "teaspoons": 0.005,
+    "teaspoon": 0.005,
+    "tsp": 0.005,
+    "tsk": 0.005,
+    # Miscellaneous Units
+    "cloves": 0.004,
+    "clove": 0.004,
+}
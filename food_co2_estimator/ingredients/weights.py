@@ -0,0 +1,53 @@
+from food_co2_estimator.ingredients.parser import parse_ingredient
+from food_co2_estimator.ingredients.variables import UNIT_WEIGHTS_IN_KG
+from food_co2_estimator.pydantic_models.weight_estimator import WeightEstimate
+
+
+def format_number(number: float) -> str:
+    return f"{number:g}"
+
+
+def estimate_weight(
+    ingredient: str, ingredient_id: int | None = None
+) -> WeightEstimate | None:
+    """
+    Calculates the weight of an ingredient stated with a weight or volume unit,
+    e.g. "500 g minced beef" or "2 dl cream". Returns None for ingredients that
+    need an estimate, e.g. "1 large onion" or "a handful of basil".
+    """
+    parsed = parse_ingredient(ingredient)
+    if parsed.quantity is None or parsed.unit is None:
+        return None
+
+    kg_per_unit = UNIT_WEIGHTS_IN_KG.get(parsed.unit)
+    if kg_per_unit is None:
+        return None
+
+    weight_in_kg = round(parsed.quantity * kg_per_unit, 4)
+    return WeightEstimate(
+        ingredient_id=ingredient_id,
+        ingredient=ingredient,
+        weight_calculation=(
+            f"{format_number(parsed.quantity)} {parsed.unit} * "
+            f"{format_number(kg_per_unit)} kg = {format_number(weight_in_kg)} kg"
+        ),
+        weight_in_kg=weight_in_kg,
+    )
+
+
+def estimate_weights_locally(
+    ingredients: dict[int, str],
+) -> tuple[list[WeightEstimate], dict[int, str]]:
+    """
+    Returns the weight estimates that can be calculated without the LLM and the
+    ingredients by id that still need to be estimated by the LLM.
+    """
+    weight_estimates = []
+    remaining_ingredients = {}
+    for ingredient_id, ingredient in ingredients.items():
+        weight_estimate = estimate_weight(ingredient, ingredient_id)
+        if weight_estimate is None:
+            remaining_ingredients[ingredient_id] = ingredient
+        else:
+            weight_estimates.append(weight_estimate)
+    return weight_estimates, remaining_ingredients
@@ -0,0 +1,418 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any
+
+from food_co2_estimator.cache.result_cache import canonicalize_url
+from food_co2_estimator.jobs.variables import (
+    JOB_FAILED_MESSAGE,
+    JOB_FOLLOW_TIMEOUT_SECONDS,
+    JOB_INPUT_RETENTION_SECONDS,
+    JOB_KEEP_ALIVE_SECONDS,
+    JOB_LEASE_SECONDS,
+    JOB_MAX_ATTEMPTS,
+    JOB_POLL_INTERVAL_SECONDS,
+    JOB_QUEUE_MAX_SIZE,
+    JOB_QUEUE_PATH,
+    JOB_RETENTION_SECONDS,
+    JOB_TIMEOUT_MESSAGE,
+)
+
+COMPLETED_EVENT = "completed"
+
+logger = logging.getLogger(__name__)
+
+_job_queue: "JobQueue | None" = None
+
+
+class JobStatus(Enum):
+    Queued = "queued"
+    Running = "running"
+    Completed = "completed"
+    Failed = "failed"
+
+
+class QueueFullError(Exception):
+    """Raised when a job is submitted to a full queue."""
+
+
+@dataclass
+class Job:
+    id: str
+    input_data: str
+    status: JobStatus
+    result: str | None
+    attempts: int
+    created_at: float
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in (JobStatus.Completed, JobStatus.Failed)
+
+
+@dataclass
+class JobEvent:
+    sequence: int
+    data: dict[str, Any]
+
+
+JOB_COLUMNS = "id, input_data, status, result, attempts, created_at"
+
+
+def hash_input(input_data: str) -> str:
+    """
+    Generate a short hash from input data. Links to the same recipe share the
+    hash, so their submissions are coalesced into one job.
+    """
+    return hashlib.md5(canonicalize_url(input_data).encode()).hexdigest()
+
+
+def get_job_queue() -> "JobQueue":
+    global _job_queue
+    if _job_queue is None:
+        _job_queue = JobQueue(path=JOB_QUEUE_PATH)
+    return _job_queue
+
+
+class JobQueue:
+    """
+    Persistent job queue stored in a SQLite file shared by the web server and
+    the worker processes. Workers lease jobs for `lease_seconds` and renew the
+    lease while they run; a job with an expired lease is leased again until
+    it has been attempted `max_attempts` times.
+
+    Progress events of a job are stored next to it, so any process can stream
+    them. The last event of a job is always a 'completed' event with the status
+    and result of the job.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_size: int = JOB_QUEUE_MAX_SIZE,
+        lease_seconds: float = JOB_LEASE_SECONDS,
+        max_attempts: int = JOB_MAX_ATTEMPTS,
+        retention_seconds: float = JOB_RETENTION_SECONDS,
+        input_retention_seconds: float = JOB_INPUT_RETENTION_SECONDS,
+    ):
+        self.path = path
+        self.max_size = max_size
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retention_seconds = retention_seconds
+        self.input_retention_seconds = input_retention_seconds
+        self._initialized = False
+
+    def _connect(self) -> sqlite3.Connection:
+        # A connection per operation keeps the queue safe across threads and forks
+        if not self._initialized:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        # Transactions are started explicitly, so leases are taken atomically
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        if not self._initialized:
+            self._create_tables(conn)
+        return conn
+
+    def _create_tables(self, conn: sqlite3.Connection) -> None:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, input_data TEXT, status TEXT, result TEXT, "
+            "attempts INTEGER, created_at REAL, leased_until REAL, "
+            "worker_id TEXT, finished_at REAL)"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS jobs_status_created_at "
+            "ON jobs (status, created_at)"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS job_events ("
+            "sequence INTEGER PRIMARY KEY AUTOINCREMENT, job_id TEXT, data TEXT)"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS job_events_job_id "
+            "ON job_events (job_id, sequence)"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS job_inputs ("
+            "id TEXT PRIMARY KEY, input_data TEXT, created_at REAL)"
+        )
+        self._initialized = True
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        conn = self._connect()
+        try:
+            # Take the write lock up front, so concurrent leases never overlap
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        finally:
+            conn.close()
+
+    def submit(self, job_id: str, input_data: str) -> Job:
+        """
+        Queue a job, or return the job with the same id if it is not finished.
+        Raises QueueFullError when `max_size` jobs are queued or running.
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            job = self._get(conn, job_id)
+            if job is not None and not job.is_finished:
+                logger.info("Joining job %s in flight", job_id)
+                return job
+
+            size = conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status IN (?, ?)",
+                (JobStatus.Queued.value, JobStatus.Running.value),
+            ).fetchone()[0]
+            if size >= self.max_size:
+                raise QueueFullError(f"Job queue is full ({size} jobs)")
+
+            conn.execute("DELETE FROM job_events WHERE job_id = ?", (job_id,))
+            self._remember(conn, job_id, input_data, now)
+            conn.execute(
+                "INSERT OR REPLACE INTO jobs "
+                "(id, input_data, status, attempts, created_at) "
+                "VALUES (?, ?, ?, 0, ?)",
+                (job_id, input_data, JobStatus.Queued.value, now),
+            )
+            self._purge(conn, now)
+        return Job(job_id, input_data, JobStatus.Queued, None, 0, now)
+
+    def remember(self, job_id: str, input_data: str) -> None:
+        """Record the input of a job id, e.g. for a result answered by the cache."""
+        with self._transaction() as conn:
+            self._remember(conn, job_id, input_data, time.time())
+
+    def _remember(
+        self, conn: sqlite3.Connection, job_id: str, input_data: str, now: float
+    ) -> None:
+        conn.execute(
+            "INSERT OR REPLACE INTO job_inputs (id, input_data, created_at) "
+            "VALUES (?, ?, ?)",
+            (job_id, input_data, now),
+        )
+
+    def get_input(self, job_id: str) -> str | None:
+        """Return the input last submitted or remembered under the job id."""
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT input_data FROM job_inputs WHERE id = ?", (job_id,)
+            ).fetchone()
+        finally:
+            conn.close()
+        return None if row is None else row[0]
+
+    def lease(self, worker_id: str, limit: int) -> list[Job]:
+        """Lease up to `limit` queued jobs, or jobs whose lease has expired."""
+        now = time.time()
+        with self._transaction() as conn:
+            self._fail_abandoned(conn, now)
+            rows = conn.execute(
+                f"SELECT {JOB_COLUMNS} FROM jobs "
+                "WHERE status = ? OR (status = ? AND leased_until < ?) "
+                "ORDER BY created_at LIMIT ?",
+                (JobStatus.Queued.value, JobStatus.Running.value, now, limit),
+            ).fetchall()
+            conn.executemany(
+                "UPDATE jobs SET status = ?, attempts = attempts + 1, "
+                "leased_until = ?, worker_id = ? WHERE id = ?",
+                [
+                    (
+                        JobStatus.Running.value,
+                        now + self.lease_seconds,
+                        worker_id,
+                        row[0],
+                    )
+                    for row in rows
+                ],
+            )
+        return [
+            Job(
+                id=row[0],
+                input_data=row[1],
+                status=JobStatus.Running,
+                result=None,
+                attempts=row[4] + 1,
+                created_at=row[5],
+            )
+            for row in rows
+        ]
+
+    def renew(self, worker_id: str, job_ids: list[str]) -> None:
+        leased_until = time.time() + self.lease_seconds
+        with self._transaction() as conn:
+            conn.executemany(
+                "UPDATE jobs SET leased_until = ? "
+                "WHERE id = ? AND worker_id = ? AND status = ?",
+                [
+                    (leased_until, job_id, worker_id, JobStatus.Running.value)
+                    for job_id in job_ids
+                ],
+            )
+
+    def complete(self, job_id: str, result: str) -> None:
+        self._finish(job_id, JobStatus.Completed, result)
+
+    def fail(self, job_id: str, message: str = JOB_FAILED_MESSAGE) -> None:
+        self._finish(job_id, JobStatus.Failed, message)
+
+    def _finish(self, job_id: str, status: JobStatus, result: str) -> None:
+        with self._transaction() as conn:
+            self._finish_job(conn, job_id, status, result, time.time())
+
+    def _finish_job(
+        self,
+        conn: sqlite3.Connection,
+        job_id: str,
+        status: JobStatus,
+        result: str,
+        now: float,
+    ) -> None:
+        cursor = conn.execute(
+            "UPDATE jobs SET status = ?, result = ?, finished_at = ? "
+            "WHERE id = ? AND status = ?",
+            (status.value, result, now, job_id, JobStatus.Running.value),
+        )
+        # A job that was leased twice is only finished once
+        if cursor.rowcount == 0:
+            return
+        self._publish(
+            conn,
+            job_id,
+            {"event": COMPLETED_EVENT, "status": status.value, "result": result},
+        )
+
+    def _fail_abandoned(self, conn: sqlite3.Connection, now: float) -> None:
+        # Jobs that keep losing their worker, e.g. because they crash it
+        rows = conn.execute(
+            "SELECT id FROM jobs WHERE status = ? AND leased_until < ? "
+            "AND attempts >= ?",
+            (JobStatus.Running.value, now, self.max_attempts),
+        ).fetchall()
+        for (job_id,) in rows:
+            self._finish_job(conn, job_id, JobStatus.Failed, JOB_FAILED_MESSAGE, now)
+
+    def publish(self, job_id: str, event: dict[str, Any]) -> None:
+        with self._transaction() as conn:
+            self._publish(conn, job_id, event)
+
+    def _publish(
+        self, conn: sqlite3.Connection, job_id: str, event: dict[str, Any]
+    ) -> None:
+        conn.execute(
+            "INSERT INTO job_events (job_id, data) VALUES (?, ?)",
+            (job_id, json.dumps(event)),
+        )
+
+    def get(self, job_id: str) -> Job | None:
+        conn = self._connect()
+        try:
+            return self._get(conn, job_id)
+        finally:
+            conn.close()
+
+    def _get(self, conn: sqlite3.Connection, job_id: str) -> Job | None:
+        row = conn.execute(
+            f"SELECT {JOB_COLUMNS} FROM jobs WHERE id = ?", (job_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        return Job(
+            id=row[0],
+            input_data=row[1],
+            status=JobStatus(row[2]),
+            result=row[3],
+            attempts=row[4],
+            created_at=row[5],
+        )
+
+    def events(self, job_id: str, after: int = 0) -> list[JobEvent]:
+        """Return the events of a job published after sequence number `after`."""
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT sequence, data FROM job_events "
+                "WHERE job_id = ? AND sequence > ? ORDER BY sequence",
+                (job_id, after),
+            ).fetchall()
+        finally:
+            conn.close()
+        return [JobEvent(sequence, json.loads(data)) for sequence, data in rows]
+
+    def follow(
+        self,
+        job_id: str,
+        poll_interval: float = JOB_POLL_INTERVAL_SECONDS,
+        keep_alive_seconds: float = JOB_KEEP_ALIVE_SECONDS,
+        timeout: float = JOB_FOLLOW_TIMEOUT_SECONDS,
+    ) -> Iterator[dict[str, Any] | None]:
+        """
+        Yield the events of a job from the start until it completes. None is
+        yielded when nothing happened for `keep_alive_seconds`. If the job has
+        not completed after `timeout` seconds, e.g. because no worker is
+        running, a failed 'completed' event is yielded instead.
+        """
+        after = 0
+        idle_since = started_at = time.time()
+        while True:
+            if time.time() - started_at >= timeout:
+                yield {
+                    "event": COMPLETED_EVENT,
+                    "status": JobStatus.Failed.value,
+                    "result": JOB_TIMEOUT_MESSAGE,
+                }
+                return
+            events = self.events(job_id, after)
+            for event in events:
+                yield event.data
+                if event.data["event"] == COMPLETED_EVENT:
+                    return
+            if events:
+                after = events[-1].sequence
+                idle_since = time.time()
+            elif time.time() - idle_since >= keep_alive_seconds:
+                if self.get(job_id) is None:
+                    return
+                yield None
+                idle_since = time.time()
+            time.sleep(poll_interval)
+
+    def __len__(self) -> int:
+        """Number of queued and running jobs."""
+        conn = self._connect()
+        try:
+            return conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status IN (?, ?)",
+                (JobStatus.Queued.value, JobStatus.Running.value),
+            ).fetchone()[0]
+        finally:
+            conn.close()
+
+    def _purge(self, conn: sqlite3.Connection, now: float) -> None:
+        conn.execute(
+            "DELETE FROM job_events WHERE job_id IN ("
+            "SELECT id FROM jobs WHERE finished_at < ?)",
+            (now - self.retention_seconds,),
+        )
+        conn.execute(
+            "DELETE FROM jobs WHERE finished_at < ?",
+            (now - self.retention_seconds,),
+        )
+        conn.execute(
+            "DELETE FROM job_inputs WHERE created_at < ?",
+            (now - self.input_retention_seconds,),
+        )
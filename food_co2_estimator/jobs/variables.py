@@ -0,0 +1,36 @@
+import os
+
+from food_co2_estimator.cache.variables import (
+    CACHE_DIR,
+    RESULT_CACHE_STALE_SECONDS,
+    RESULT_CACHE_TTL_SECONDS,
+)
+
+JOB_QUEUE_PATH = os.getenv("JOB_QUEUE_PATH", f"{CACHE_DIR}/jobs.db")
+# Queued and running jobs accepted before new submissions are rejected
+JOB_QUEUE_MAX_SIZE = int(os.getenv("JOB_QUEUE_MAX_SIZE", 100))
+JOB_RETRY_AFTER_SECONDS = int(os.getenv("JOB_RETRY_AFTER_SECONDS", 30))
+# Finished jobs and their events are kept this long for late subscribers
+JOB_RETENTION_SECONDS = int(os.getenv("JOB_RETENTION_SECONDS", 3600))
+# The input of a job id is kept as long as its result may be cached, so the
+# result can be looked up in the cache after the job is purged
+JOB_INPUT_RETENTION_SECONDS = RESULT_CACHE_TTL_SECONDS + RESULT_CACHE_STALE_SECONDS
+
+# Worker processes started with the web server, and jobs run at once by each
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", 2))
+JOB_WORKER_CONCURRENCY = int(os.getenv("JOB_WORKER_CONCURRENCY", 8))
+# A job whose worker stops renewing its lease is picked up by another worker
+JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", 60))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", 2))
+# Streams of jobs that do not finish in time end with a failed event
+JOB_FOLLOW_TIMEOUT_SECONDS = int(os.getenv("JOB_FOLLOW_TIMEOUT_SECONDS", 900))
+# How often worker processes are checked, and restarted if they died
+JOB_SUPERVISOR_INTERVAL_SECONDS = 5
+JOB_POLL_INTERVAL_SECONDS = float(os.getenv("JOB_POLL_INTERVAL_SECONDS", 0.5))
+# Workers load the pipeline before taking jobs, rather than on the first job
+WARM_UP_ON_START = os.getenv("WARM_UP_ON_START", "true").lower() == "true"
+# Streams send a comment when idle, so proxies do not close the connection
+JOB_KEEP_ALIVE_SECONDS = 15
+
+JOB_FAILED_MESSAGE = "Something went wrong. :-( Please try again."
+JOB_TIMEOUT_MESSAGE = "The estimation is taking too long. :-( Please try again later."
@@ -0,0 +1,250 @@
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+from multiprocessing.process import BaseProcess
+
+from food_co2_estimator.chains.registry import close_chain_registry
+from food_co2_estimator.jobs.queue import Job, JobQueue, get_job_queue
+from food_co2_estimator.jobs.variables import (
+    JOB_LEASE_SECONDS,
+    JOB_POLL_INTERVAL_SECONDS,
+    JOB_SUPERVISOR_INTERVAL_SECONDS,
+    JOB_WORKER_CONCURRENCY,
+    JOB_WORKERS,
+    WARM_UP_ON_START,
+)
+from food_co2_estimator.metrics.registry import clear_dumped_metrics, dump_metrics
+from food_co2_estimator.url.fetcher import close_page_fetcher
+from food_co2_estimator.utils.stage_scheduler import StageError
+from food_co2_estimator.warmup import warm_up_pipeline
+
+logger = logging.getLogger(__name__)
+
+
+class JobWorker:
+    """
+    Runs queued jobs on one long-lived event loop, at most `concurrency` at a
+    time, so the OpenAI and HTTP clients of the process are shared by all of
+    them. Leases of running jobs are renewed until they finish.
+    """
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        worker_id: str,
+        concurrency: int = JOB_WORKER_CONCURRENCY,
+        poll_interval: float = JOB_POLL_INTERVAL_SECONDS,
+    ):
+        self.queue = queue
+        self.worker_id = worker_id
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.running: dict[str, asyncio.Task] = {}
+        self.stopping = asyncio.Event()
+
+    async def run(self) -> None:
+        if WARM_UP_ON_START:
+            await warm_up_pipeline()
+        logger.info(
+            "Worker %s started with concurrency %s", self.worker_id, self.concurrency
+        )
+        renew_task = asyncio.create_task(self.renew_leases())
+        try:
+            while not self.stopping.is_set():
+                free_slots = self.concurrency - len(self.running)
+                jobs = []
+                if free_slots > 0:
+                    jobs = await asyncio.to_thread(
+                        self.queue.lease, self.worker_id, free_slots
+                    )
+                for job in jobs:
+                    self.running[job.id] = asyncio.create_task(self.run_job(job))
+                if not jobs:
+                    await self.wait(self.poll_interval)
+        finally:
+            # Running jobs are finished, queued jobs are left for other workers
+            await asyncio.gather(*self.running.values(), return_exceptions=True)
+            renew_task.cancel()
+            await close_page_fetcher()
+            await close_chain_registry()
+            logger.info("Worker %s stopped", self.worker_id)
+
+    async def run_job(self, job: Job) -> None:
+        # Imported here, so starting worker processes from the web server does
+        # not load the pipeline in the server process
+        from food_co2_estimator.main import async_estimate_result
+
+        # Progress is reported from the event loop, so the events are written by
+        # a single task off the loop, in the order they were reported
+        events: asyncio.Queue[dict | None] = asyncio.Queue()
+        publisher = asyncio.create_task(self.publish_events(job.id, events))
+
+        logger.info(
+            "Worker %s: Running job %s (%s)", self.worker_id, job.id, job.input_data
+        )
+        try:
+            try:
+                # Jobs are only queued for urls without a fresh cached result
+                result = await async_estimate_result(
+                    job.input_data,
+                    verbose=True,
+                    force_refresh=True,
+                    progress=events.put_nowait,
+                )
+            finally:
+                events.put_nowait(None)
+                await publisher
+            await asyncio.to_thread(
+                self.queue.complete, job.id, result.model_dump_json()
+            )
+        except StageError as e:
+            await asyncio.to_thread(self.queue.fail, job.id, e.message)
+        except Exception:
+            logger.exception("Worker %s: Job %s failed", self.worker_id, job.id)
+            await asyncio.to_thread(self.queue.fail, job.id)
+        finally:
+            del self.running[job.id]
+            # The web server reads the metrics of the workers from their files
+            await asyncio.to_thread(dump_metrics)
+
+    async def publish_events(
+        self, job_id: str, events: asyncio.Queue[dict | None]
+    ) -> None:
+        while (event := await events.get()) is not None:
+            await asyncio.to_thread(self.queue.publish, job_id, event)
+
+    async def renew_leases(self) -> None:
+        while True:
+            await asyncio.sleep(self.queue.lease_seconds / 3)
+            if self.running:
+                await asyncio.to_thread(
+                    self.queue.renew, self.worker_id, list(self.running)
+                )
+
+    async def wait(self, seconds: float) -> None:
+        try:
+            await asyncio.wait_for(self.stopping.wait(), seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    def stop(self) -> None:
+        self.stopping.set()
+
+
+async def run_worker(worker_id: str, concurrency: int = JOB_WORKER_CONCURRENCY):
+    worker = JobWorker(get_job_queue(), worker_id, concurrency)
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, worker.stop)
+    await worker.run()
+
+
+def worker_process(concurrency: int) -> None:
+    logging.basicConfig(level=logging.INFO)
+    worker_id = f"{socket.gethostname()}-{os.getpid()}"
+    asyncio.run(run_worker(worker_id, concurrency))
+
+
+def start_worker_process(concurrency: int, number: int) -> BaseProcess:
+    # Spawned rather than forked, so workers do not inherit the web server state
+    context = multiprocessing.get_context("spawn")
+    process = context.Process(
+        target=worker_process,
+        args=(concurrency,),
+        name=f"job-worker-{number}",
+        daemon=True,
+    )
+    process.start()
+    return process
+
+
+def start_workers(
+    number_of_workers: int = JOB_WORKERS,
+    concurrency: int = JOB_WORKER_CONCURRENCY,
+) -> list[BaseProcess]:
+    # Metrics are counted from zero by the new workers
+    clear_dumped_metrics()
+    return [
+        start_worker_process(concurrency, number) for number in range(number_of_workers)
+    ]
+
+
+def stop_workers(processes: list[BaseProcess], timeout: float = JOB_LEASE_SECONDS):
+    for process in processes:
+        process.terminate()
+    for process in processes:
+        process.join(timeout)
+
+
+class WorkerSupervisor:
+    """
+    Starts the worker processes and restarts the ones that die, e.g. when they
+    run out of memory, from a thread of the process that started them. The
+    jobs of a dead worker are leased again when their lease expires.
+    """
+
+    def __init__(
+        self,
+        number_of_workers: int = JOB_WORKERS,
+        concurrency: int = JOB_WORKER_CONCURRENCY,
+        interval: float = JOB_SUPERVISOR_INTERVAL_SECONDS,
+    ):
+        self.number_of_workers = number_of_workers
+        self.concurrency = concurrency
+        self.interval = interval
+        self.processes: list[BaseProcess] = []
+        self.stopping = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        self.processes = start_workers(self.number_of_workers, self.concurrency)
+        self._thread = threading.Thread(
+            target=self.watch, name="job-worker-supervisor", daemon=True
+        )
+        self._thread.start()
+
+    def watch(self) -> None:
+        while not self.stopping.wait(self.interval):
+            for number, process in enumerate(self.processes):
+                if process.is_alive() or self.stopping.is_set():
+                    continue
+                logger.warning(
+                    "Job worker %s exited with code %s, restarting it",
+                    process.name,
+                    process.exitcode,
+                )
+                self.processes[number] = start_worker_process(self.concurrency, number)
+
+    def wait(self) -> None:
+        """Block until the supervisor is stopped."""
+        while not self.stopping.wait(self.interval):
+            pass
+
+    def stop(self, timeout: float = JOB_LEASE_SECONDS) -> None:
+        self.stopping.set()
+        if self._thread is not None:
+            self._thread.join()
+        stop_workers(self.processes, timeout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run CO2 estimation job workers.")
+    parser.add_argument("--workers", type=int, default=JOB_WORKERS)
+    parser.add_argument("--concurrency", type=int, default=JOB_WORKER_CONCURRENCY)
+    args = parser.parse_args()
+
+    supervisor = WorkerSupervisor(args.workers, args.concurrency)
+    supervisor.start()
+    try:
+        supervisor.wait()
+    except KeyboardInterrupt:
+        supervisor.stop()
+
+
+if __name__ == "__main__":
+    main()
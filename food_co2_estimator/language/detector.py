@@ -1,9 +1,23 @@
+import logging
+import threading
+from collections import Counter
+from dataclasses import dataclass
 from enum import Enum
 
-from langdetect import detect
-
+from food_co2_estimator.language.glossary import TOKEN_PATTERN, get_glossary
+from food_co2_estimator.language.variables import (
+    LANGUAGE_DETECTION_SEED,
+    LANGUAGE_SAMPLE_CHARACTERS,
+    LANGUAGE_VOTE_MIN_CONFIDENCE,
+    LANGUAGE_VOTE_MIN_WORDS,
+)
 from food_co2_estimator.pydantic_models.recipe_extractor import EnrichedRecipe
 
+logger = logging.getLogger(__name__)
+
+_english_vocabulary: frozenset[str] | None = None
+_english_vocabulary_lock = threading.Lock()
+
 
 class Languages(Enum):
     English = "en"
@@ -15,14 +29,118 @@ class Languages(Enum):
 ALLOWED_LANGUAGE_MISTAKES = [Languages.Norwegian.value, Languages.Swedish.value]
 
 
-def detect_language(recipe: EnrichedRecipe) -> Languages | None:
-    language = (
-        detect(recipe.instructions)
-        if recipe.instructions is not None
-        else detect(", ".join(recipe.get_ingredients_orig_name_list()))
-    )
-    if language in ALLOWED_LANGUAGE_MISTAKES:  # Swedish and Norwegian is easy mistakes
+@dataclass
+class LanguageDetection:
+    language: Languages
+    # Share of the votes, or the probability given by langdetect
+    confidence: float
+    method: str
+
+
+def get_english_vocabulary() -> frozenset[str]:
+    """The English words of the glossary."""
+    global _english_vocabulary
+    if _english_vocabulary is None:
+        with _english_vocabulary_lock:
+            if _english_vocabulary is None:
+                _english_vocabulary = frozenset(
+                    word
+                    for translation in get_glossary().terms.values()
+                    for word in TOKEN_PATTERN.findall(translation)
+                    if word.isalpha()
+                )
+    return _english_vocabulary
+
+
+def get_sample(text: str) -> str:
+    return text[:LANGUAGE_SAMPLE_CHARACTERS]
+
+
+def vote_language(text: str) -> LanguageDetection | None:
+    """
+    Let each word vote for Danish or English, by whether the glossary knows
+    it as a Danish or an English word. Words known in both languages do not
+    vote. Returns None when too few words vote or they disagree.
+    """
+    glossary = get_glossary()
+    english_vocabulary = get_english_vocabulary()
+    votes: Counter[Languages] = Counter()
+    for word in TOKEN_PATTERN.findall(get_sample(text).lower()):
+        if not word.isalpha():
+            continue
+        is_danish = glossary.translate_word(word) is not None
+        is_english = word in english_vocabulary
+        if is_danish != is_english:
+            votes[Languages.Danish if is_danish else Languages.English] += 1
+
+    total = sum(votes.values())
+    if total < LANGUAGE_VOTE_MIN_WORDS:
+        return None
+    language, count = votes.most_common(1)[0]
+    confidence = count / total
+    if confidence < LANGUAGE_VOTE_MIN_CONFIDENCE:
+        return None
+    return LanguageDetection(language, confidence, "vocabulary")
+
+
+def to_language(code: str) -> Languages | None:
+    if code in ALLOWED_LANGUAGE_MISTAKES:  # Swedish and Norwegian is easy mistakes
         return Languages.Danish
+    if code in [lang.value for lang in Languages]:
+        return Languages(code)
+    return None
+
+
+def load_langdetect() -> None:
+    # langdetect is only needed when the vocabulary vote is inconclusive, so
+    # it is imported and its profiles are loaded on first use
+    from langdetect import DetectorFactory
+    from langdetect.detector_factory import init_factory
+
+    # Makes langdetect return the same language for the same text on every run
+    DetectorFactory.seed = LANGUAGE_DETECTION_SEED
+    init_factory()
+
+
+def detect_with_langdetect(text: str) -> LanguageDetection | None:
+    from langdetect import LangDetectException, detect_langs
+
+    load_langdetect()
+    try:
+        results = detect_langs(get_sample(text))
+    except LangDetectException:
+        return None
+    language = to_language(results[0].lang)
+    if language is None:
+        return None
+    confidence = sum(
+        result.prob for result in results if to_language(result.lang) == language
+    )
+    return LanguageDetection(language, confidence, "langdetect")
+
+
+def detect_language(recipe: EnrichedRecipe) -> LanguageDetection | None:
+    """
+    Detect the language from the ingredients, and fall back to langdetect
+    on the instructions when the ingredients are inconclusive.
+    """
+    ingredients = ", ".join(recipe.get_ingredients_orig_name_list())
+    detection = vote_language(ingredients)
+    if detection is None:
+        detection = detect_with_langdetect(
+            recipe.instructions if recipe.instructions is not None else ingredients
+        )
+    if detection is not None:
+        logger.info(
+            "Detected %s with confidence %.2f by %s",
+            detection.language.value,
+            detection.confidence,
+            detection.method,
+        )
+    return detection
+
 
-    if language in [lang.value for lang in Languages]:
-        return Languages(language)
+def warm_up_language_detector() -> None:
+    """Load the vocabulary and langdetect profiles before the first recipe."""
+    get_english_vocabulary()
+    load_langdetect()
@@ -0,0 +1,96 @@
+import json
+import re
+
+from food_co2_estimator.data.glossary.variables import GLOSSARY_PATH
+
+TOKEN_PATTERN = re.compile(r"\d+(?:[.,/]\d+)?|[½¼¾⅓⅔]|\w+|[^\w\s]")
+# Plural and definite endings, longest first, e.g. 'tomaterne' and 'æblet'
+INFLECTION_SUFFIXES = ("erne", "ene", "ne", "er", "en", "et", "e", "r")
+# Compounds may join their parts with an 's' or 'e', e.g. 'oksebouillon'
+LINKING_LETTERS = ("s", "e")
+MIN_PART_LENGTH = 3
+MAX_PHRASE_WORDS = 3
+
+_glossary: "Glossary | None" = None
+
+
+class Glossary:
+    """
+    Translates ingredient lines word by word with a fixed glossary. A line is
+    only translated when every word in it is known, so lines with unknown
+    words can be left to a translation provider.
+    """
+
+    def __init__(self, terms: dict[str, str]):
+        self.terms = terms
+
+    def translate_line(self, line: str) -> str | None:
+        tokens = TOKEN_PATTERN.findall(line.lower())
+        translated = []
+        index = 0
+        while index < len(tokens):
+            phrase_length, translation = self._translate_phrase(tokens, index)
+            if translation is None:
+                return None
+            translated.append(translation)
+            index += phrase_length
+        return join_tokens(translated)
+
+    def _translate_phrase(
+        self, tokens: list[str], index: int
+    ) -> tuple[int, str | None]:
+        token = tokens[index]
+        if not token[0].isalpha():
+            # Numbers and punctuation are kept as they are
+            return 1, token
+        for length in range(MAX_PHRASE_WORDS, 1, -1):
+            words = tokens[index : index + length]
+            if len(words) == length and all(word.isalpha() for word in words):
+                translation = self.terms.get(" ".join(words))
+                if translation is not None:
+                    return length, translation
+        return 1, self.translate_word(token)
+
+    def translate_word(self, word: str) -> str | None:
+        return self._translate_inflected(word) or self._translate_compound(word)
+
+    def _translate_inflected(self, word: str) -> str | None:
+        if word in self.terms:
+            return self.terms[word]
+        for suffix in INFLECTION_SUFFIXES:
+            stem = word.removesuffix(suffix)
+            if stem != word and len(stem) >= MIN_PART_LENGTH and stem in self.terms:
+                return self.terms[stem]
+        return None
+
+    def _translate_compound(self, word: str) -> str | None:
+        # The longest known last part is the food, the first part describes it
+        for split in range(MIN_PART_LENGTH, len(word) - MIN_PART_LENGTH + 1):
+            head = self._translate_inflected(word[split:])
+            if head is None:
+                continue
+            modifier = word[:split]
+            candidates = [modifier] + [
+                modifier.removesuffix(letter)
+                for letter in LINKING_LETTERS
+                if modifier.endswith(letter) and len(modifier) > MIN_PART_LENGTH
+            ]
+            for candidate in candidates:
+                translation = self.translate_word(candidate)
+                if translation is not None:
+                    return f"{translation} {head}"
+        return None
+
+
+def join_tokens(tokens: list[str]) -> str:
+    text = " ".join(tokens)
+    text = re.sub(r"\s+([,.;:!?)%])", r"\1", text)
+    return re.sub(r"([(])\s+", r"\1", text)
+
+
+def get_glossary() -> Glossary:
+    global _glossary
+    if _glossary is None:
+        with open(GLOSSARY_PATH, encoding="utf-8") as file:
+            _glossary = Glossary(json.load(file))
+    return _glossary
@@ -0,0 +1,330 @@
+import logging
+import os
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import date
+from enum import Enum
+from typing import Protocol
+
+import numpy as np
+from deep_translator import GoogleTranslator
+from translate import Translator
+
+from food_co2_estimator.language.detector import Languages
+from food_co2_estimator.language.variables import (
+    MY_MAIL,
+    MYMEMORY_DAILY_CHARACTERS,
+    MYMEMORY_QUOTA_MESSAGE,
+    TRANSLATION_BREAKER_COOLDOWN_SECONDS,
+    TRANSLATION_BREAKER_ERROR_RATE,
+    TRANSLATION_BREAKER_MIN_REQUESTS,
+    TRANSLATION_BREAKER_WINDOW,
+    TRANSLATION_HEDGE_DEFAULT_SECONDS,
+    TRANSLATION_HEDGE_MIN_SAMPLES,
+    TRANSLATION_HEDGE_PERCENTILE,
+    TRANSLATION_LATENCY_WINDOW,
+    TRANSLATION_MAX_HEDGE_WORKERS,
+)
+from food_co2_estimator.metrics.pipeline import TRANSLATION_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+_provider_manager: "TranslationProviderManager | None" = None
+_provider_manager_lock = threading.Lock()
+
+
+class Translatable(Protocol):
+    def translate(self, text: str) -> str: ...
+
+
+class TranslationProviders(Enum):
+    Google = "google"
+    MyMemory = "mymemory"
+    Microsft = "microsoft"
+    DeepL = "deepl"
+    Libre = "libre"
+
+
+class TranslationError(Exception):
+    """Raised when no provider returns a usable translation."""
+
+
+class QuotaExceededError(TranslationError):
+    """Raised when a provider answers that its quota is used up."""
+
+
+@dataclass
+class TranslationProvider:
+    name: str
+    create: Callable[[Languages, Languages], Translatable]
+    # Characters a day, or None if the provider has no known quota
+    daily_quota: int | None = None
+
+
+@dataclass
+class ProviderHealth:
+    latencies: deque[float] = field(
+        default_factory=lambda: deque(maxlen=TRANSLATION_LATENCY_WINDOW)
+    )
+    outcomes: deque[bool] = field(
+        default_factory=lambda: deque(maxlen=TRANSLATION_BREAKER_WINDOW)
+    )
+    opened_at: float | None = None
+    trial_in_flight: bool = False
+    quota_used: int = 0
+    quota_day: date = field(default_factory=date.today)
+
+    @property
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return self.outcomes.count(False) / len(self.outcomes)
+
+
+def create_google_translator(from_lang: Languages, to_lang: Languages) -> Translatable:
+    return GoogleTranslator(source=from_lang.value, target=to_lang.value)
+
+
+def create_mymemory_translator(
+    from_lang: Languages, to_lang: Languages
+) -> Translatable:
+    return Translator(
+        from_lang=from_lang.value,
+        to_lang=to_lang.value,
+        provider=TranslationProviders.MyMemory.value,
+        email=MY_MAIL,
+    )
+
+
+DEFAULT_PROVIDERS = [
+    TranslationProvider(TranslationProviders.Google.value, create_google_translator),
+    TranslationProvider(
+        TranslationProviders.MyMemory.value,
+        create_mymemory_translator,
+        daily_quota=MYMEMORY_DAILY_CHARACTERS,
+    ),
+]
+
+
+class TranslationProviderManager:
+    """
+    Sends translations to the healthiest provider and tracks the latency,
+    error rate and remaining daily quota of each provider.
+
+    A provider whose recent requests mostly failed has its circuit opened and
+    is skipped until a cooldown has passed, after which one trial request is
+    let through. When a request takes longer than the provider's usual
+    (90th percentile) latency, the next provider is asked as well, and the
+    first usable translation is returned.
+    """
+
+    def __init__(
+        self,
+        providers: list[TranslationProvider],
+        max_workers: int = TRANSLATION_MAX_HEDGE_WORKERS,
+    ):
+        if not providers:
+            raise ValueError("No translation providers provided")
+        self.providers = providers
+        self.health = {provider.name: ProviderHealth() for provider in providers}
+        self._translators: dict[tuple[str, Languages, Languages], Translatable] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="translation"
+        )
+
+    def translate(
+        self,
+        text: str,
+        from_lang: Languages,
+        to_lang: Languages = Languages.English,
+        is_valid: Callable[[str], bool] = lambda translation: True,
+    ) -> str:
+        """
+        Translate the text, treating translations for which `is_valid` is
+        false as failures. Raises TranslationError if no provider succeeds.
+        """
+        candidates = self.available_providers(len(text))
+        if not candidates:
+            raise TranslationError("No translation provider is available")
+
+        pending: dict[Future, TranslationProvider] = {}
+
+        def start_next() -> TranslationProvider:
+            provider = candidates.pop(0)
+            future = self._executor.submit(
+                self._call, provider, text, from_lang, to_lang, is_valid
+            )
+            pending[future] = provider
+            return provider
+
+        try:
+            return self._translate_hedged(candidates, start_next, pending)
+        finally:
+            self._release_trials(candidates)
+
+    def _translate_hedged(
+        self,
+        candidates: list[TranslationProvider],
+        start_next: Callable[[], TranslationProvider],
+        pending: dict[Future, TranslationProvider],
+    ) -> str:
+        errors: list[str] = []
+        last_started = start_next()
+        while pending:
+            timeout = self.hedge_delay(last_started.name) if candidates else None
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                logger.info(
+                    "Translation by %s is slow, also asking %s",
+                    last_started.name,
+                    candidates[0].name,
+                )
+                last_started = start_next()
+                continue
+
+            for future in done:
+                provider = pending.pop(future)
+                try:
+                    return future.result()
+                except Exception as e:
+                    errors.append(f"{provider.name}: {e}")
+            if not pending and candidates:
+                last_started = start_next()
+
+        raise TranslationError(
+            f"All translation providers failed ({'; '.join(errors)})"
+        )
+
+    def available_providers(self, characters: int) -> list[TranslationProvider]:
+        """Providers with a closed circuit, or due a trial, and enough quota."""
+        now = time.monotonic()
+        available = []
+        with self._lock:
+            for provider in self.providers:
+                health = self.health[provider.name]
+                if health.quota_day != date.today():
+                    health.quota_day, health.quota_used = date.today(), 0
+                if (
+                    provider.daily_quota is not None
+                    and health.quota_used + characters > provider.daily_quota
+                ):
+                    continue
+                if health.opened_at is not None:
+                    cooling_down = (
+                        now - health.opened_at < TRANSLATION_BREAKER_COOLDOWN_SECONDS
+                    )
+                    if cooling_down or health.trial_in_flight:
+                        continue
+                    health.trial_in_flight = True
+                available.append(provider)
+        return available
+
+    def _release_trials(self, providers: list[TranslationProvider]) -> None:
+        # Providers due a trial that were not asked get their trial next time
+        with self._lock:
+            for provider in providers:
+                self.health[provider.name].trial_in_flight = False
+
+    def hedge_delay(self, name: str) -> float:
+        latencies = self.health[name].latencies
+        if len(latencies) < TRANSLATION_HEDGE_MIN_SAMPLES:
+            return TRANSLATION_HEDGE_DEFAULT_SECONDS
+        return float(np.percentile(latencies, TRANSLATION_HEDGE_PERCENTILE))
+
+    def _call(
+        self,
+        provider: TranslationProvider,
+        text: str,
+        from_lang: Languages,
+        to_lang: Languages,
+        is_valid: Callable[[str], bool],
+    ) -> str:
+        start_time = time.perf_counter()
+        try:
+            translation = self._get_translator(provider, from_lang, to_lang).translate(
+                text
+            )
+            if MYMEMORY_QUOTA_MESSAGE in translation:
+                raise QuotaExceededError(translation)
+            if not is_valid(translation):
+                raise TranslationError("Translation does not match the input")
+        except Exception as e:
+            self._record(provider, text, time.perf_counter() - start_time, e)
+            raise
+        self._record(provider, text, time.perf_counter() - start_time)
+        return translation
+
+    def _get_translator(
+        self, provider: TranslationProvider, from_lang: Languages, to_lang: Languages
+    ) -> Translatable:
+        key = (provider.name, from_lang, to_lang)
+        with self._lock:
+            if key not in self._translators:
+                self._translators[key] = provider.create(from_lang, to_lang)
+            return self._translators[key]
+
+    def _record(
+        self,
+        provider: TranslationProvider,
+        text: str,
+        seconds: float,
+        error: Exception | None = None,
+    ) -> None:
+        TRANSLATION_REQUESTS.inc(
+            provider=provider.name, result="failure" if error else "success"
+        )
+        with self._lock:
+            health = self.health[provider.name]
+            health.quota_used += len(text)
+            health.trial_in_flight = False
+            if error is None:
+                if health.opened_at is not None:
+                    # The trial succeeded, so the old failures are forgotten
+                    logger.info(
+                        "Closing circuit of translation provider %s", provider.name
+                    )
+                    health.outcomes.clear()
+                    health.opened_at = None
+                health.latencies.append(seconds)
+                health.outcomes.append(True)
+                return
+
+            logger.warning("Translation by %s failed: %s", provider.name, error)
+            health.outcomes.append(False)
+            if isinstance(error, QuotaExceededError) and provider.daily_quota:
+                health.quota_used = provider.daily_quota
+            if health.opened_at is not None or (
+                len(health.outcomes) >= TRANSLATION_BREAKER_MIN_REQUESTS
+                and health.error_rate >= TRANSLATION_BREAKER_ERROR_RATE
+            ):
+                if health.opened_at is None:
+                    logger.warning(
+                        "Opening circuit of translation provider %s, error rate %.0f%%",
+                        provider.name,
+                        health.error_rate * 100,
+                    )
+                health.opened_at = time.monotonic()
+
+
+def get_translation_provider_manager() -> TranslationProviderManager:
+    global _provider_manager
+    if _provider_manager is None:
+        with _provider_manager_lock:
+            if _provider_manager is None:
+                _provider_manager = TranslationProviderManager(DEFAULT_PROVIDERS)
+    return _provider_manager
+
+
+def _reset_after_fork() -> None:
+    # The threads of the executor do not survive a fork
+    global _provider_manager, _provider_manager_lock
+    _provider_manager = None
+    _provider_manager_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
@@ -1,78 +1,28 @@
 import logging
-import os
 from copy import deepcopy
-from enum import Enum
-from typing import List, Protocol, TypedDict
-
-from deep_translator import GoogleTranslator
-from translate import Translator
-
+from typing import TypedDict
+
+from food_co2_estimator.cache.embedding_cache import normalize_text
+from food_co2_estimator.cache.sqlite_cache import SQLiteCache
+from food_co2_estimator.cache.variables import (
+    TRANSLATION_MEMORY_MAX_ENTRIES,
+    TRANSLATION_MEMORY_PATH,
+)
 from food_co2_estimator.language.detector import Languages
+from food_co2_estimator.language.glossary import get_glossary
+from food_co2_estimator.language.providers import (
+    TranslationError,
+    get_translation_provider_manager,
+)
+from food_co2_estimator.language.variables import TRANSLATION_GLOSSARY_ENABLED
+from food_co2_estimator.metrics.pipeline import OPERATION_DURATION
 from food_co2_estimator.pydantic_models.recipe_extractor import EnrichedRecipe
 
-# Global cache to keep track of the translator index
-_translation_cache = {"index": 0}
-
-
-class Translatable(Protocol):
-    def translate(self, text: str) -> str: ...
-
-
-class TranslationProviders(Enum):
-    MyMemory = "mymemory"
-    Microsft = "microsoft"
-    DeepL = "deepl"
-    Libre = "libre"
-
-
 SPLIT_STRING = "; "
-N_RETRIES = 2
-INSTRUCTIONS_DELIMITER = "----"
-
 
-class MyTranslator:
-    def __init__(
-        self,
-        translators: List[Translatable],
-    ):
-        if not translators:
-            raise ValueError("No translators provided")
-        self.translators = translators
-        self.current_translator = self.translators[0]  # Default to the first translator
-
-    @classmethod
-    def default(
-        cls,
-        from_lang: Languages = Languages.Danish,
-        to_lang: Languages = Languages.English,
-    ) -> "MyTranslator":
-        return cls(
-            translators=cls.create_translators(from_lang=from_lang, to_lang=to_lang)
-        )
+logger = logging.getLogger(__name__)
 
-    @staticmethod
-    def create_translators(
-        from_lang: Languages = Languages.Danish,
-        to_lang: Languages = Languages.English,
-    ) -> List[Translatable]:
-        return [
-            GoogleTranslator(
-                source=from_lang.value,
-                target=to_lang.value,
-            ),
-            Translator(
-                from_lang=from_lang.value,
-                to_lang=to_lang.value,
-                provider=TranslationProviders.MyMemory.value,
-                email=os.getenv("MY_MAIL", None),
-            ),
-        ]
-
-    def translate(self, text: str) -> str:
-        return self.current_translator.translate(text)
-
-    def switch_translator(self, index: int):
-        self.current_translator = self.translators[index % len(self.translators)]
+_translation_memory: SQLiteCache | None = None
 
 
 class TranslateDict(TypedDict):
@@ -80,55 +30,134 @@ class TranslateDict(TypedDict):
     language: str
 
 
-def extract_translated_recipe(translation: str, recipe: EnrichedRecipe):
-    if recipe.instructions is not None:
-        ingredients_str, instructions = translation.split(INSTRUCTIONS_DELIMITER)
-    else:
-        ingredients_str = translation
-        instructions = None
-
-    ingredients = ingredients_str.split(SPLIT_STRING)
-    recipe = deepcopy(recipe)
-    recipe.update_with_translations(ingredients, instructions)
-    return recipe
-
-
-def _translate_if_not_english(recipe: EnrichedRecipe, language: str):
-    if language == "en":
-        recipe.update_with_translations(
-            translated_ingredients=recipe.get_ingredients_orig_name_list(),
-            instructions=recipe.instructions,
+def get_translation_memory() -> SQLiteCache:
+    global _translation_memory
+    if _translation_memory is None:
+        _translation_memory = SQLiteCache(
+            path=TRANSLATION_MEMORY_PATH,
+            table="translations",
+            max_entries=TRANSLATION_MEMORY_MAX_ENTRIES,
         )
-        return recipe
+    return _translation_memory
 
-    inputs_str = SPLIT_STRING.join(
-        [ingredient.original_name for ingredient in recipe.ingredients]
-    )
-    if recipe.instructions is not None:
-        inputs_str += INSTRUCTIONS_DELIMITER + recipe.instructions
-    my_translator = MyTranslator.default()
 
-    # Retrieve the current index from the global cache
-    index = _translation_cache.get("index", 0)
-    my_translator.switch_translator(index)
+def get_translation_memory_key(
+    text: str, from_lang: Languages, to_lang: Languages
+) -> str:
+    return f"{from_lang.value}|{to_lang.value}|{normalize_text(text)}"
+
 
-    for tries in range(N_RETRIES):
-        translation = my_translator.translate(inputs_str)
-        translated_recipe = extract_translated_recipe(translation, recipe)
+def translate_texts(texts: list[str], from_lang: Languages) -> list[str] | None:
+    """
+    Translate the texts in one provider call. Translations that do not split
+    into as many texts count as failures, so another provider is asked.
+    Returns None if no provider succeeds.
+    """
 
-        if len(recipe.ingredients) == len(translated_recipe.ingredients):
-            return translated_recipe
+    def is_valid(translation: str) -> bool:
+        return len(translation.split(SPLIT_STRING)) == len(texts)
 
-        logging.warning(
-            f"Translation failed. Trying other provider. Retry {tries + 1}/{N_RETRIES}"
+    try:
+        translation = get_translation_provider_manager().translate(
+            SPLIT_STRING.join(texts), from_lang=from_lang, is_valid=is_valid
         )
-        # Update the index and switch the translator
-        index = (index + 1) % len(my_translator.translators)
-        _translation_cache["index"] = index
-        my_translator.switch_translator(index)
+    except TranslationError as e:
+        logger.warning("Unable to translate ingredients: %s", e)
+        return None
+    return [text.strip() for text in translation.split(SPLIT_STRING)]
+
+
+def translate_with_glossary(
+    ingredients: list[str], from_lang: Languages, to_lang: Languages
+) -> dict[str, str]:
+    """Translations of the ingredients whose words are all in the glossary."""
+    if not (
+        TRANSLATION_GLOSSARY_ENABLED
+        and from_lang == Languages.Danish
+        and to_lang == Languages.English
+    ):
+        return {}
+
+    glossary = get_glossary()
+    translations = {}
+    for ingredient in ingredients:
+        translation = glossary.translate_line(ingredient)
+        if translation is not None:
+            translations[ingredient] = translation
+    logger.info(
+        "Glossary: %s of %s ingredients translated offline",
+        len(translations),
+        len(ingredients),
+    )
+    return translations
+
+
+def translate_ingredients(
+    ingredients: list[str],
+    from_lang: Languages,
+    to_lang: Languages = Languages.English,
+) -> list[str]:
+    """
+    Translate ingredients with the glossary, and the rest through the
+    translation memory. Only ingredients not translated before are sent to
+    the provider, in a single call. Ingredients that cannot be translated
+    are returned untranslated.
+    """
+    glossary_translations = translate_with_glossary(ingredients, from_lang, to_lang)
+    remaining = [
+        ingredient
+        for ingredient in ingredients
+        if ingredient not in glossary_translations
+    ]
+
+    memory = get_translation_memory()
+    keys = [
+        get_translation_memory_key(ingredient, from_lang, to_lang)
+        for ingredient in remaining
+    ]
+    translations = {key: entry.value for key, entry in memory.get_many(keys).items()}
+
+    unseen = {
+        key: ingredient
+        for key, ingredient in zip(keys, remaining)
+        if key not in translations
+    }
+    logger.info(
+        "Translation memory: %s of %s ingredients translated before",
+        len(remaining) - len(unseen),
+        len(remaining),
+    )
+    if unseen:
+        translated_texts = translate_texts(list(unseen.values()), from_lang)
+        if translated_texts is not None:
+            new_translations = dict(zip(unseen.keys(), translated_texts))
+            memory.set_many(new_translations)
+            translations.update(new_translations)
+
+    all_translations = glossary_translations | {
+        ingredient: translations.get(key, ingredient)
+        for key, ingredient in zip(keys, remaining)
+    }
+    return [all_translations[ingredient] for ingredient in ingredients]
+
+
+def _translate_if_not_english(recipe: EnrichedRecipe, language: Languages | str):
+    language = Languages(language)
+    ingredients = recipe.get_ingredients_orig_name_list()
+    if language == Languages.English:
+        translated_ingredients = ingredients
+    else:
+        translated_ingredients = translate_ingredients(ingredients, from_lang=language)
 
-    return translated_recipe
+    # Only the ingredients are used after translation, so the instructions
+    # are kept in the original language
+    recipe = deepcopy(recipe)
+    recipe.update_with_translations(translated_ingredients, recipe.instructions)
+    return recipe
 
 
 def translate_if_not_english(input: TranslateDict):
-    return _translate_if_not_english(recipe=input["recipe"], language=input["language"])
+    with OPERATION_DURATION.time(operation="translation"):
+        return _translate_if_not_english(
+            recipe=input["recipe"], language=input["language"]
+        )
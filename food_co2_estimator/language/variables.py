@@ -0,0 +1,41 @@
+import os
+
+# Danish ingredients whose words are all in the glossary are translated
+# offline, and only the rest is sent to a provider
+TRANSLATION_GLOSSARY_ENABLED = (
+    os.getenv("TRANSLATION_GLOSSARY_ENABLED", "true").lower() == "true"
+)
+
+# A request is hedged with the next provider when it takes longer than this
+# percentile of the provider's recent latencies
+TRANSLATION_HEDGE_PERCENTILE = 90
+# Until a provider has this many latencies, the default hedge delay is used
+TRANSLATION_HEDGE_MIN_SAMPLES = 10
+TRANSLATION_HEDGE_DEFAULT_SECONDS = float(
+    os.getenv("TRANSLATION_HEDGE_DEFAULT_SECONDS", 3.0)
+)
+TRANSLATION_LATENCY_WINDOW = 100
+
+# The circuit of a provider opens when at least half of its recent requests
+# failed, and one trial request is let through after the cooldown
+TRANSLATION_BREAKER_WINDOW = 20
+TRANSLATION_BREAKER_MIN_REQUESTS = 5
+TRANSLATION_BREAKER_ERROR_RATE = 0.5
+TRANSLATION_BREAKER_COOLDOWN_SECONDS = float(
+    os.getenv("TRANSLATION_BREAKER_COOLDOWN_SECONDS", 60)
+)
+
+# MyMemory allows 5000 characters a day, or 50000 with an email address
+MY_MAIL = os.getenv("MY_MAIL", None)
+MYMEMORY_DAILY_CHARACTERS = 50_000 if MY_MAIL else 5_000
+MYMEMORY_QUOTA_MESSAGE = "MYMEMORY WARNING"
+
+TRANSLATION_MAX_HEDGE_WORKERS = 8
+
+# Language detection reads at most this many characters of a recipe
+LANGUAGE_SAMPLE_CHARACTERS = int(os.getenv("LANGUAGE_SAMPLE_CHARACTERS", 1000))
+LANGUAGE_DETECTION_SEED = 0
+# The ingredient vocabulary decides the language when enough words vote and
+# most of them agree, otherwise langdetect is asked
+LANGUAGE_VOTE_MIN_WORDS = 3
+LANGUAGE_VOTE_MIN_CONFIDENCE = 0.75
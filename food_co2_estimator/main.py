@@ -3,28 +3,64 @@ import functools
 import inspect
 import logging
 import re
+import time
+from typing import TYPE_CHECKING
 
-from food_co2_estimator.chains.rag_co2_estimator import rag_co2_emission_chain
-from food_co2_estimator.chains.recipe_extractor import get_recipe_extractor_chain
-from food_co2_estimator.chains.search_co2_estimator import get_search_co2_emission_chain
-from food_co2_estimator.chains.translator import get_translation_chain
-from food_co2_estimator.chains.weight_estimator import get_weight_estimator_chain
+from food_co2_estimator.cache.result_cache import (
+    canonicalize_url,
+    get_result_cache,
+    get_result_cache_key,
+)
+from food_co2_estimator.cache.variables import RESULT_CACHE_ENABLED
+from food_co2_estimator.chains.registry import (
+    Chains,
+    get_chain,
+    get_run_config,
+)
+from food_co2_estimator.ingredients.ids import format_ingredients, request_by_id
+from food_co2_estimator.ingredients.weights import estimate_weights_locally
+from food_co2_estimator.jobs.queue import QueueFullError, get_job_queue, hash_input
 from food_co2_estimator.language.detector import Languages, detect_language
-from food_co2_estimator.pydantic_models.co2_estimator import CO2Emissions
+from food_co2_estimator.metrics.pipeline import (
+    ESTIMATIONS,
+    STAGE_DURATION,
+    STAGE_ERRORS,
+)
+from food_co2_estimator.pydantic_models.co2_estimator import CO2Emissions, CO2perKg
+from food_co2_estimator.pydantic_models.estimation_result import EstimationResult
 from food_co2_estimator.pydantic_models.recipe_extractor import (
     EnrichedIngredient,
     EnrichedRecipe,
     ExtractedRecipe,
 )
-from food_co2_estimator.pydantic_models.search_co2_estimator import CO2SearchResults
-from food_co2_estimator.pydantic_models.weight_estimator import WeightEstimates
-from food_co2_estimator.url.url2markdown import get_markdown_from_url
-from food_co2_estimator.utils import generate_output
+from food_co2_estimator.pydantic_models.search_co2_estimator import (
+    CO2SearchResult,
+    CO2SearchResults,
+)
+from food_co2_estimator.pydantic_models.weight_estimator import (
+    WeightEstimate,
+    WeightEstimates,
+)
+from food_co2_estimator.retrievers.lexical_retriever import (
+    batch_lexical_emission_retriever,
+)
+from food_co2_estimator.url.pruning import estimate_tokens, prune_recipe_markdown
+from food_co2_estimator.utils import OutputFormat, render_output
+from food_co2_estimator.utils.progress import ProgressCallback, get_stage_event
+from food_co2_estimator.utils.single_flight import SingleFlight
+from food_co2_estimator.utils.stage_scheduler import StageError, StageScheduler
+
+if TYPE_CHECKING:
+    from food_co2_estimator.url.url2markdown import WebPage
 
 NUMBER_PERSONS_REGEX = r".*\?antal=(\d+)"
+NEGLIGEBLE_THRESHOLD = 0.01
 
 logger = logging.getLogger(__name__)
 
+_fetch_flight = SingleFlight(name="fetch")
+_extract_flight = SingleFlight(name="extract")
+
 
 def log_with_url(func):
     """
@@ -32,7 +68,8 @@ def log_with_url(func):
       1) If kwargs['url'] is present, use that.
       2) Else if kwargs['recipe'] is an EnrichedRecipe with a .url field, use that.
       3) Else use "NO_URL_FOUND".
-    Logs 'Calling function...' before and 'Finished function...' after.
+    Logs 'Calling function...' before and 'Finished function...' with the
+    duration after.
     """
 
     def _get_url(args, kwargs: dict[str, str]):
@@ -53,16 +90,28 @@ def log_with_url(func):
         extracted_url = _get_url(args, kwargs)
 
         logger.info("URL=%s: Calling function: %s", extracted_url, func.__name__)
+        start_time = time.perf_counter()
         result = func(*args, **kwargs)
-        logger.info("URL=%s: Finished function: %s", extracted_url, func.__name__)
+        logger.info(
+            "URL=%s: Finished function: %s in %.2fs",
+            extracted_url,
+            func.__name__,
+            time.perf_counter() - start_time,
+        )
         return result
 
     @functools.wraps(func)
     async def async_wrapper(*args, **kwargs):
         extracted_url = _get_url(args, kwargs)
         logger.info("URL=%s: Calling function: %s", extracted_url, func.__name__)
+        start_time = time.perf_counter()
         result = await func(*args, **kwargs)
-        logger.info("URL=%s: Finished function: %s", extracted_url, func.__name__)
+        logger.info(
+            "URL=%s: Finished function: %s in %.2fs",
+            extracted_url,
+            func.__name__,
+            time.perf_counter() - start_time,
+        )
         return result
 
     # Return the async or sync wrapper depending on the original function
@@ -73,22 +122,38 @@ def log_with_url(func):
 
 
 @log_with_url
-async def get_co2_emissions(
-    verbose: bool,
-    negligeble_threshold: float,
-    recipe: EnrichedRecipe,
-) -> CO2Emissions:
-    emission_chain = rag_co2_emission_chain(verbose)
+async def get_co2_emissions(verbose: bool, recipe: EnrichedRecipe) -> CO2Emissions:
+    # All ingredients are looked up, so this can run before the weights are
+    # known. Negligible ingredients are discarded afterwards.
+    ingredients = recipe.get_ingredients_en_name_by_id()
+
+    # Exact name matches in the emission database are answered locally
+    lexical_emissions, rag_ingredients = batch_lexical_emission_retriever(ingredients)
+    logger.info(
+        "URL=%s: Found %s of %s emissions by exact name match",
+        recipe.url,
+        len(lexical_emissions),
+        len(ingredients),
+    )
+    if not rag_ingredients:
+        return CO2Emissions(emissions=lexical_emissions)
 
-    ingredients_input = [
-        item.en_name
-        for item in recipe.ingredients
-        if weight_above_negligeble_threshold(item, negligeble_threshold)
-    ]
+    emission_chain = get_chain(Chains.RagCO2Estimator)
+
+    async def request_emissions(ingredients: dict[int, str]) -> list[CO2perKg]:
+        parsed_rag_emissions: CO2Emissions = await emission_chain.ainvoke(
+            ingredients, config=get_run_config(verbose)
+        )
+        return parsed_rag_emissions.emissions
 
-    parsed_rag_emissions: CO2Emissions = await emission_chain.ainvoke(ingredients_input)
+    rag_emissions = await request_by_id(request_emissions, rag_ingredients)
+    return CO2Emissions(emissions=lexical_emissions + rag_emissions)
 
-    return parsed_rag_emissions
+
+def discard_negligeble_emissions(recipe: EnrichedRecipe, negligeble_threshold: float):
+    for item in recipe.ingredients:
+        if not weight_above_negligeble_threshold(item, negligeble_threshold):
+            item.co2_per_kg_db = None
 
 
 def weight_above_negligeble_threshold(
@@ -102,9 +167,23 @@ def weight_above_negligeble_threshold(
 
 
 @log_with_url
-async def extract_recipe(text: str, url: str, verbose: bool) -> ExtractedRecipe:
-    recipe_extractor_chain = get_recipe_extractor_chain(verbose=verbose)
-    recipe: ExtractedRecipe = await recipe_extractor_chain.ainvoke({"input": text})
+async def extract_recipe(page: "WebPage", url: str, verbose: bool) -> ExtractedRecipe:
+    if page.structured_recipe is not None:
+        # Recipes described by schema.org data do not need the extractor LLM
+        logger.info("URL=%s: Using structured recipe data from page", url)
+        recipe = page.structured_recipe.model_copy()
+    else:
+        text = prune_recipe_markdown(page.markdown or "")
+        logger.info(
+            "URL=%s: Pruned page from ~%s to ~%s tokens",
+            url,
+            estimate_tokens(page.markdown or ""),
+            estimate_tokens(text),
+        )
+        recipe_extractor_chain = get_chain(Chains.RecipeExtractor)
+        recipe = await recipe_extractor_chain.ainvoke(
+            {"input": text}, config=get_run_config(verbose)
+        )
 
     # If number is provided in url, then use that instead of llm estimate
     persons = extract_person_from_url(url)
@@ -123,12 +202,28 @@ def extract_person_from_url(url) -> int | None:
 async def get_weight_estimates(
     verbose: bool, recipe: EnrichedRecipe
 ) -> WeightEstimates:
-    weight_estimator_chain = get_weight_estimator_chain(verbose=verbose)
-    weight_output: WeightEstimates = await weight_estimator_chain.ainvoke(
-        {"input": recipe.get_ingredients_en_name_list()}
-    )  # type: ignore
+    ingredients = recipe.get_ingredients_en_name_by_id()
+    # Ingredients stated with a weight or volume are calculated without the LLM
+    local_estimates, llm_ingredients = estimate_weights_locally(ingredients)
+    logger.info(
+        "URL=%s: Calculated %s of %s weights without LLM",
+        recipe.url,
+        len(local_estimates),
+        len(ingredients),
+    )
+    if not llm_ingredients:
+        return WeightEstimates(weight_estimates=local_estimates)
 
-    return weight_output
+    weight_estimator_chain = get_chain(Chains.WeightEstimator)
+
+    async def request_weights(ingredients: dict[int, str]) -> list[WeightEstimate]:
+        weight_output: WeightEstimates = await weight_estimator_chain.ainvoke(
+            {"input": format_ingredients(ingredients)}, config=get_run_config(verbose)
+        )  # type: ignore
+        return weight_output.weight_estimates
+
+    llm_estimates = await request_by_id(request_weights, llm_ingredients)
+    return WeightEstimates(weight_estimates=local_estimates + llm_estimates)
 
 
 @log_with_url
@@ -137,20 +232,27 @@ async def get_co2_search_emissions(
     recipe: EnrichedRecipe,
     negligeble_threshold: float,
 ) -> CO2SearchResults:
-    co2_search_input_items = [
-        item.en_name
+    co2_search_input_items = {
+        item.id: item.en_name
         for item in recipe.ingredients
         if co2_per_kg_not_found(item)
         and weight_above_negligeble_threshold(item, negligeble_threshold)
         and item.en_name is not None
-    ]
+    }
     if not co2_search_input_items:
         return CO2SearchResults(search_results=[])
-    search_chain = get_search_co2_emission_chain(verbose=verbose)
-    search_results: CO2SearchResults = await search_chain.ainvoke(
-        co2_search_input_items
-    )  # type: ignore
-    return search_results
+    search_chain = get_chain(Chains.SearchCO2Estimator)
+
+    async def request_search_results(
+        ingredients: dict[int, str],
+    ) -> list[CO2SearchResult]:
+        search_results: CO2SearchResults = await search_chain.ainvoke(
+            ingredients, config=get_run_config(verbose)
+        )  # type: ignore
+        return search_results.search_results
+
+    search_results = await request_by_id(request_search_results, co2_search_input_items)
+    return CO2SearchResults(search_results=search_results)
 
 
 def co2_per_kg_not_found(item: EnrichedIngredient):
@@ -161,94 +263,239 @@ def log_expeption_message(url: str, message: str):
     logging.exception(f"URL={url}: {message}")
 
 
-async def async_estimator(
+def get_cached_result(
+    url: str, negligeble_threshold: float = NEGLIGEBLE_THRESHOLD
+) -> EstimationResult | None:
+    """
+    Return a cached result for the url if there is one. Stale results are
+    still returned, but queue a job refreshing the cache.
+    """
+    if not RESULT_CACHE_ENABLED:
+        return None
+
+    cache_key = get_result_cache_key(url, negligeble_threshold)
+    cached_result = get_result_cache().get(cache_key)
+    if cached_result is None:
+        return None
+
+    logger.info("URL=%s: Returning cached result", url)
+    if cached_result.is_stale:
+        revalidate_in_background(url, negligeble_threshold)
+    return EstimationResult.model_validate_json(cached_result.value)
+
+
+def revalidate_in_background(url: str, negligeble_threshold: float):
+    # Jobs are estimated with the default threshold, so results for other
+    # thresholds are recomputed once they expire instead
+    if negligeble_threshold != NEGLIGEBLE_THRESHOLD:
+        return
+
+    # The refresh is queued for the workers under the id of the job for the url,
+    # so it joins a refresh or estimation of the same recipe that is in flight
+    logger.info("URL=%s: Refreshing stale cached result", url)
+    try:
+        get_job_queue().submit(hash_input(url), url)
+    except QueueFullError:
+        logger.warning("URL=%s: Job queue is full, serving stale result", url)
+
+
+def observe_stage_metrics(scheduler: StageScheduler) -> None:
+    for stage, duration in scheduler.timings.items():
+        STAGE_DURATION.observe(duration, stage=stage)
+    for stage in scheduler.failed:
+        STAGE_ERRORS.inc(stage=stage)
+
+
+async def async_estimate_result(
     url: str,
     verbose: bool = False,
-    negligeble_threshold: float = 0.01,
+    negligeble_threshold: float = NEGLIGEBLE_THRESHOLD,
     logging_level=logging.INFO,
-):
+    force_refresh: bool = False,
+    progress: ProgressCallback | None = None,
+) -> EstimationResult:
+    """
+    Estimate the emission of the recipe at the url. Raises StageError with a
+    message for the user when the recipe cannot be estimated.
+    """
     logging.basicConfig(level=logging_level)
-    text = get_markdown_from_url(url)
-    if text is None:
-        return "Unable to extraxt text from provided URL"
-
-    # Extract ingredients from text
-    recipe = await extract_recipe(text=text, url=url, verbose=verbose)
-    if len(recipe.ingredients) == 0:
-        no_recipe_message = "I can't find a recipe in the provided URL."
-        log_expeption_message(url, no_recipe_message)
-        return no_recipe_message
-
-    # Detect language in ingredients
-    enriched_recipe = EnrichedRecipe.from_extracted_recipe(url, recipe)
-    language = detect_language(enriched_recipe)
-    if language is None:
-        language_expection = f"Language is not recognized as {', '.join([lang.value for lang in Languages])}"
-        log_expeption_message(url, language_expection)
-        return language_expection
-
-    translator = get_translation_chain()
-    try:
-        enriched_recipe: EnrichedRecipe = await translator.ainvoke(
-            {"recipe": enriched_recipe, "language": language}
-        )
-    except Exception as e:
-        translation_expection = "Something went wrong in translating recipies."
-        log_expeption_message(url, str(e))
-        log_expeption_message(url, translation_expection)
-        return translation_expection
+    if not force_refresh:
+        cached_result = get_cached_result(url, negligeble_threshold)
+        if cached_result is not None:
+            ESTIMATIONS.inc(status="cached")
+            return cached_result
+
+    def report_stage(stage: str, result) -> None:
+        event = get_stage_event(stage, result)
+        if progress is not None and event is not None:
+            progress(event)
+
+    scheduler = StageScheduler(
+        name=f"URL={url}",
+        on_stage_complete=report_stage if progress is not None else None,
+    )
 
-    try:
-        # Estimate weights using weight estimator
-        parsed_weight_output = await get_weight_estimates(
-            verbose,
-            enriched_recipe,
+    # Each stage is named after its result, which is passed to the stages
+    # depending on it as a keyword argument of the same name
+    async def fetch() -> "WebPage":
+        # Imported on first use, as parsing pages loads bs4 and markdownify
+        from food_co2_estimator.url.url2markdown import aget_page_from_url
+
+        # Pipelines for the same recipe running at once share the fetch and
+        # the extraction
+        page = await _fetch_flight.do(
+            canonicalize_url(url),
+            lambda: aget_page_from_url(url),
+        )
+        if page is None or (page.markdown is None and page.structured_recipe is None):
+            raise StageError("Unable to extraxt text from provided URL")
+        return page
+
+    async def extract(page: "WebPage") -> EnrichedRecipe:
+        recipe = await _extract_flight.do(
+            (canonicalize_url(url), page.markdown),
+            lambda: extract_recipe(page=page, url=url, verbose=verbose),
         )
-        enriched_recipe.update_with_weight_estimates(parsed_weight_output)
-    except Exception as e:
-        weight_est_exception = (
-            "Something went wrong in estimating weights of ingredients."
+        if len(recipe.ingredients) == 0:
+            raise StageError("I can't find a recipe in the provided URL.")
+        return EnrichedRecipe.from_extracted_recipe(url, recipe)
+
+    async def detect(recipe: EnrichedRecipe) -> Languages:
+        detection = detect_language(recipe)
+        if detection is None:
+            raise StageError(
+                f"Language is not recognized as {', '.join([lang.value for lang in Languages])}"
+            )
+        return detection.language
+
+    async def translate(recipe: EnrichedRecipe, language: Languages) -> EnrichedRecipe:
+        translator = get_chain(Chains.Translator)
+        return await translator.ainvoke({"recipe": recipe, "language": language})
+
+    async def estimate_weights(translated_recipe: EnrichedRecipe) -> WeightEstimates:
+        return await get_weight_estimates(verbose, translated_recipe)
+
+    async def estimate_db_emissions(
+        translated_recipe: EnrichedRecipe,
+    ) -> CO2Emissions:
+        return await get_co2_emissions(verbose, translated_recipe)
+
+    async def enrich(
+        translated_recipe: EnrichedRecipe,
+        weights: WeightEstimates,
+        db_emissions: CO2Emissions,
+    ) -> EnrichedRecipe:
+        translated_recipe.update_with_weight_estimates(weights)
+        translated_recipe.update_with_co2_per_kg_db(db_emissions)
+        discard_negligeble_emissions(translated_recipe, negligeble_threshold)
+        return translated_recipe
+
+    async def search(enriched_recipe: EnrichedRecipe) -> CO2SearchResults:
+        search_results = await get_co2_search_emissions(
+            verbose, enriched_recipe, negligeble_threshold
+        )
+        enriched_recipe.update_with_co2_per_kg_search(search_results)
+        return search_results
+
+    async def summarize(
+        enriched_recipe: EnrichedRecipe,
+        language: Languages,
+        search_results: CO2SearchResults | None,
+    ) -> EstimationResult:
+        return EstimationResult.from_enriched_recipe(
+            enriched_recipe, language, negligeble_threshold
         )
-        log_expeption_message(url, str(e))
-        log_expeption_message(url, weight_est_exception)
-        return weight_est_exception
+
+    scheduler.add_stage("page", fetch)
+    scheduler.add_stage("recipe", extract, depends_on=["page"])
+    scheduler.add_stage("language", detect, depends_on=["recipe"])
+    scheduler.add_stage(
+        "translated_recipe",
+        translate,
+        depends_on=["recipe", "language"],
+        error_message="Something went wrong in translating recipies.",
+    )
+    # Weights and emissions only depend on the translated recipe, so the two
+    # LLM calls run concurrently
+    scheduler.add_stage(
+        "weights",
+        estimate_weights,
+        depends_on=["translated_recipe"],
+        error_message="Something went wrong in estimating weights of ingredients.",
+    )
+    scheduler.add_stage(
+        "db_emissions",
+        estimate_db_emissions,
+        depends_on=["translated_recipe"],
+        error_message="Something went wrong in estimating kg CO2e per kg for the ingredients",
+    )
+    scheduler.add_stage(
+        "enriched_recipe",
+        enrich,
+        depends_on=["translated_recipe", "weights", "db_emissions"],
+    )
+    scheduler.add_stage(
+        "search_results",
+        search,
+        depends_on=["enriched_recipe"],
+        error_message="Something went wrong when searching for kg CO2e per kg",
+        required=False,
+    )
+    scheduler.add_stage(
+        "result",
+        summarize,
+        depends_on=["enriched_recipe", "language", "search_results"],
+    )
 
     try:
-        # Estimate the kg CO2e per kg for each weight ingredien
-        parsed_rag_emissions = await get_co2_emissions(
-            verbose,
-            negligeble_threshold,
-            enriched_recipe,
+        result: EstimationResult = (await scheduler.run())["result"]
+    except StageError as e:
+        if e.__cause__ is not None:
+            log_expeption_message(url, str(e.__cause__))
+        log_expeption_message(url, e.message)
+        STAGE_ERRORS.inc(stage=e.stage or "unknown")
+        ESTIMATIONS.inc(status="failed")
+        raise
+    finally:
+        logger.info("URL=%s: Stage timings: %s", url, scheduler.format_timings())
+        observe_stage_metrics(scheduler)
+
+    ESTIMATIONS.inc(status="completed")
+
+    # Only complete results are cached, so failed searches are retried next time
+    if RESULT_CACHE_ENABLED and "search_results" not in scheduler.failed:
+        get_result_cache().set(
+            get_result_cache_key(url, negligeble_threshold), result.model_dump_json()
         )
-        enriched_recipe.update_with_co2_per_kg_db(parsed_rag_emissions)
 
-    except Exception as e:
-        rag_emissions_exception = (
-            "Something went wrong in estimating kg CO2e per kg for the ingredients"
-        )
-        log_expeption_message(url, str(e))
-        log_expeption_message(url, rag_emissions_exception)
-        return rag_emissions_exception
+    return result
 
-    # Check if any ingredients needs CO2 search
+
+async def async_estimator(
+    url: str,
+    verbose: bool = False,
+    negligeble_threshold: float = NEGLIGEBLE_THRESHOLD,
+    logging_level=logging.INFO,
+    force_refresh: bool = False,
+    progress: ProgressCallback | None = None,
+    output_format: OutputFormat = OutputFormat.Text,
+) -> str:
+    """
+    Estimate the emission of the recipe at the url, rendered in the language
+    of the recipe, or the message for the user when it cannot be estimated.
+    """
     try:
-        parsed_search_results = await get_co2_search_emissions(
-            verbose, enriched_recipe, negligeble_threshold
+        result = await async_estimate_result(
+            url=url,
+            verbose=verbose,
+            negligeble_threshold=negligeble_threshold,
+            logging_level=logging_level,
+            force_refresh=force_refresh,
+            progress=progress,
         )
-        enriched_recipe.update_with_co2_per_kg_search(parsed_search_results)
-    except Exception as e:
-        search_emissions_expection = (
-            "Something went wrong when searching for kg CO2e per kg"
-        )
-        log_expeption_message(url, str(e))
-        log_expeption_message(url, search_emissions_expection)
-
-    return generate_output(
-        enriched_recipe=enriched_recipe,
-        negligeble_threshold=negligeble_threshold,
-        number_of_persons=enriched_recipe.persons,
-        language=language,
-    )
+    except StageError as e:
+        return e.message
+    return render_output(result, output_format)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,65 @@
+import time
+from typing import Any
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+from food_co2_estimator.metrics.pipeline import LLM_DURATION, LLM_ERRORS, LLM_TOKENS
+
+
+def get_token_usage(response: LLMResult) -> tuple[int, int]:
+    """Return the prompt and completion tokens of an LLM response."""
+    prompt_tokens = completion_tokens = 0
+    for generations in response.generations:
+        for generation in generations:
+            usage = getattr(
+                getattr(generation, "message", None), "usage_metadata", None
+            )
+            if usage:
+                prompt_tokens += usage.get("input_tokens", 0)
+                completion_tokens += usage.get("output_tokens", 0)
+    if prompt_tokens or completion_tokens:
+        return prompt_tokens, completion_tokens
+
+    token_usage = (response.llm_output or {}).get("token_usage") or {}
+    return token_usage.get("prompt_tokens", 0), token_usage.get("completion_tokens", 0)
+
+
+class LLMMetricsHandler(BaseCallbackHandler):
+    """Records the duration, tokens and errors of the LLM requests of a chain."""
+
+    # The handler only updates counters, so it does not need a thread of its own
+    run_inline = True
+
+    def __init__(self, chain: str, model: str):
+        self.chain = chain
+        self.model = model
+        self._start_times: dict[UUID, float] = {}
+
+    def on_llm_start(
+        self, serialized: dict[str, Any], prompts: list[str], *, run_id: UUID, **kwargs
+    ) -> None:
+        self._start_times[run_id] = time.perf_counter()
+
+    def on_chat_model_start(
+        self, serialized: dict[str, Any], messages: list, *, run_id: UUID, **kwargs
+    ) -> None:
+        self._start_times[run_id] = time.perf_counter()
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs) -> None:
+        self._observe_duration(run_id)
+        prompt_tokens, completion_tokens = get_token_usage(response)
+        LLM_TOKENS.inc(prompt_tokens, chain=self.chain, model=self.model, type="prompt")
+        LLM_TOKENS.inc(
+            completion_tokens, chain=self.chain, model=self.model, type="completion"
+        )
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs) -> None:
+        self._observe_duration(run_id)
+        LLM_ERRORS.inc(chain=self.chain)
+
+    def _observe_duration(self, run_id: UUID) -> None:
+        start_time = self._start_times.pop(run_id, None)
+        if start_time is not None:
+            LLM_DURATION.observe(time.perf_counter() - start_time, chain=self.chain)
@@ -0,0 +1,53 @@
+from food_co2_estimator.metrics.registry import Counter, Histogram
+
+STAGE_DURATION = Histogram(
+    "co2_estimator_stage_duration_seconds",
+    "Duration of the pipeline stages, e.g. page, recipe and weights.",
+    ["stage"],
+)
+STAGE_ERRORS = Counter(
+    "co2_estimator_stage_errors_total",
+    "Pipeline stages that failed.",
+    ["stage"],
+)
+OPERATION_DURATION = Histogram(
+    "co2_estimator_operation_duration_seconds",
+    "Duration of the operations within the stages, e.g. fetch, parse, "
+    "rag_retrieval, translation and web_search.",
+    ["operation"],
+)
+LLM_DURATION = Histogram(
+    "co2_estimator_llm_duration_seconds",
+    "Duration of LLM requests per chain.",
+    ["chain"],
+)
+LLM_TOKENS = Counter(
+    "co2_estimator_llm_tokens_total",
+    "Tokens used by LLM requests per chain, by type prompt or completion.",
+    ["chain", "model", "type"],
+)
+LLM_ERRORS = Counter(
+    "co2_estimator_llm_errors_total",
+    "Failed LLM requests per chain.",
+    ["chain"],
+)
+LLM_CACHE_REQUESTS = Counter(
+    "co2_estimator_llm_cache_requests_total",
+    "LLM response cache lookups per chain, by result hit or miss.",
+    ["chain", "result"],
+)
+TRANSLATION_REQUESTS = Counter(
+    "co2_estimator_translation_requests_total",
+    "Requests to translation providers, by result success or failure.",
+    ["provider", "result"],
+)
+CACHE_REQUESTS = Counter(
+    "co2_estimator_cache_requests_total",
+    "Cache lookups per cache, by result hit or miss.",
+    ["cache", "result"],
+)
+ESTIMATIONS = Counter(
+    "co2_estimator_estimations_total",
+    "Finished estimations, by status completed, cached or failed.",
+    ["status"],
+)
@@ -0,0 +1,237 @@
+import glob
+import json
+import logging
+import math
+import os
+import threading
+import time
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager
+from typing import Any
+
+from food_co2_estimator.metrics.variables import LATENCY_BUCKETS_SECONDS, METRICS_DIR
+
+logger = logging.getLogger(__name__)
+
+LabelValues = tuple[str, ...]
+
+
+class Metric:
+    """A metric with a value per combination of label values."""
+
+    type = ""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        registry: "MetricsRegistry | None" = None,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: dict[LabelValues, Any] = {}
+        self._lock = threading.Lock()
+        (REGISTRY if registry is None else registry).register(self)
+
+    def _label_values(self, labels: dict[str, Any]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f"Metric {self.name} takes labels {self.labelnames}, got {tuple(labels)}"
+            )
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            samples = [
+                [list(label_values), self._copy(value)]
+                for label_values, value in self._values.items()
+            ]
+        return {
+            "type": self.type,
+            "help": self.documentation,
+            "labelnames": list(self.labelnames),
+            "samples": samples,
+        }
+
+    @staticmethod
+    def _copy(value: Any) -> Any:
+        return value
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        label_values = self._label_values(labels)
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+
+class Histogram(Metric):
+    """
+    Counts observations per bucket. A sample is stored as the count of each
+    bucket, not cumulative, followed by the sum and count of observations.
+    """
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS_SECONDS,
+        registry: "MetricsRegistry | None" = None,
+    ):
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        super().__init__(name, documentation, labelnames, registry)
+
+    def observe(self, value: float, **labels: Any) -> None:
+        label_values = self._label_values(labels)
+        bucket = next(
+            index for index, bound in enumerate(self.buckets) if value <= bound
+        )
+        with self._lock:
+            sample = self._values.setdefault(
+                label_values, [0] * len(self.buckets) + [0.0, 0]
+            )
+            sample[bucket] += 1
+            sample[-2] += value
+            sample[-1] += 1
+
+    @contextmanager
+    def time(self, **labels: Any) -> Iterator[None]:
+        """Observe the duration of the with-block, also when it raises."""
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start_time, **labels)
+
+    def snapshot(self) -> dict[str, Any]:
+        snapshot = super().snapshot()
+        snapshot["buckets"] = [format_value(bound) for bound in self.buckets]
+        return snapshot
+
+    @staticmethod
+    def _copy(value: Any) -> Any:
+        return list(value)
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics: dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> None:
+        if metric.name in self.metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self.metrics[metric.name] = metric
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        return {name: metric.snapshot() for name, metric in self.metrics.items()}
+
+
+REGISTRY = MetricsRegistry()
+
+
+def merge_snapshots(snapshots: list[dict[str, dict[str, Any]]]) -> dict[str, Any]:
+    """Add up the samples of snapshots from several processes."""
+    merged: dict[str, dict[str, Any]] = {}
+    for snapshot in snapshots:
+        for name, metric in snapshot.items():
+            target = merged.setdefault(name, {**metric, "samples": {}})
+            for label_values, value in metric["samples"]:
+                key = tuple(label_values)
+                current = target["samples"].get(key)
+                if current is None:
+                    target["samples"][key] = value
+                elif isinstance(value, list):
+                    target["samples"][key] = [a + b for a, b in zip(current, value)]
+                else:
+                    target["samples"][key] = current + value
+    return merged
+
+
+def format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf"
+    return repr(float(value))
+
+
+def escape_label_value(value: str) -> str:
+    return value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def format_labels(labels: list[tuple[str, str]]) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(f'{name}="{escape_label_value(value)}"' for name, value in labels)
+    return "{" + pairs + "}"
+
+
+def render_snapshot(snapshot: dict[str, dict[str, Any]]) -> str:
+    """Render merged metrics in the Prometheus text exposition format."""
+    lines = []
+    for name, metric in sorted(snapshot.items()):
+        lines.append(f"# HELP {name} {metric['help']}")
+        lines.append(f"# TYPE {name} {metric['type']}")
+        for label_values, value in sorted(metric["samples"].items()):
+            labels = list(zip(metric["labelnames"], label_values))
+            if metric["type"] != "histogram":
+                lines.append(f"{name}{format_labels(labels)} {format_value(value)}")
+                continue
+
+            cumulative = 0
+            for bound, count in zip(metric["buckets"], value):
+                cumulative += count
+                bucket_labels = format_labels(labels + [("le", bound)])
+                lines.append(f"{name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{name}_sum{format_labels(labels)} {format_value(value[-2])}")
+            lines.append(f"{name}_count{format_labels(labels)} {value[-1]}")
+    return "\n".join(lines) + "\n"
+
+
+def get_metrics_path(pid: int | None = None) -> str:
+    return f"{METRICS_DIR}/{os.getpid() if pid is None else pid}.json"
+
+
+def dump_metrics(registry: MetricsRegistry = REGISTRY) -> None:
+    """Write the metrics of this process to its file in METRICS_DIR."""
+    os.makedirs(METRICS_DIR, exist_ok=True)
+    path = get_metrics_path()
+    # Written to a temporary file first, so readers never see a partial file
+    temporary_path = f"{path}.tmp"
+    with open(temporary_path, "w", encoding="utf-8") as file:
+        json.dump(registry.snapshot(), file)
+    os.replace(temporary_path, path)
+
+
+def load_dumped_metrics() -> list[dict[str, dict[str, Any]]]:
+    snapshots = []
+    for path in glob.glob(f"{METRICS_DIR}/*.json"):
+        try:
+            with open(path, encoding="utf-8") as file:
+                snapshots.append(json.load(file))
+        except (OSError, json.JSONDecodeError):
+            logger.warning("Unable to read metrics file %s", path)
+    return snapshots
+
+
+def render_metrics(registry: MetricsRegistry = REGISTRY) -> str:
+    """
+    Render the metrics of all processes. The metrics of this process are
+    written to its file first, so every process renders the same totals.
+    """
+    dump_metrics(registry)
+    return render_snapshot(merge_snapshots(load_dumped_metrics()))
+
+
+def clear_dumped_metrics() -> None:
+    """Remove metric files of earlier runs, e.g. before starting workers."""
+    for path in glob.glob(f"{METRICS_DIR}/*.json"):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,10 @@
+import os
+
+from food_co2_estimator.cache.variables import CACHE_DIR
+
+# Every process writes its metrics to a file here, so /metrics can add up the
+# metrics of the web and job worker processes
+METRICS_DIR = os.getenv("METRICS_DIR", f"{CACHE_DIR}/metrics")
+
+# Upper bounds of the latency histogram buckets
+LATENCY_BUCKETS_SECONDS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 40, 80, 160)
@@ -82,6 +82,9 @@ Follow these rules to find the best match and extrapolate logically:
 9. **No Match If Unsuitable:** If none of the provided options fit or rule 1 is violated, output “none.”
 
 All the above rules aim to ensure the best estimate of CO2 emission per kg for an ingredient.
+
+Each ingredient is given on its own line after its id in square brackets, e.g. "[3] 2 dl cream".
+Give one result per ingredient, with the id as "ingredient_id" and the ingredient without the id as "ingredient".
 """
 
 
@@ -33,7 +33,8 @@ Follow these instructions carefully:
      {{
        "search_results": [
          {{
-           "ingredient": "The first ingredient in the input list",
+           "ingredient_id": The id in square brackets before the first ingredient in the input list,
+           "ingredient": "The first ingredient in the input list, without the id",
            "explanation": "A detailed, step-by-step reasoning of how the final search result was chosen",
            "unit": "kg CO2e per kg" if a numeric result is found, otherwise null,
            "result": numeric value if found, else null
@@ -43,7 +44,8 @@ Follow these instructions carefully:
      }}
 
    - For each ingredient, you must fill one CO2SearchResult object.
-   - "ingredient" must be exactly the original ingredient string from the input list.
+   - "ingredient_id" must be the id in square brackets before the ingredient in the input list.
+   - "ingredient" must be exactly the original ingredient string from the input list, without the id.
    - "explanation" should describe the reasoning for the chosen value or for why no value could be found.
    - "unit" should be "kg CO2e per kg" only if a numeric "result" is provided, otherwise null.
    - "result" should be a single numeric value or null. Do not provide ranges.
@@ -61,7 +63,8 @@ provide me with the emission per ingredient
 Search results:
 {search_results}
 
-Ingredient list: {ingredients}
+Ingredient list:
+{ingredients}
 """
 
 SEARCH_CO2_EMISSION_PROMPT = ChatPromptTemplate.from_messages(
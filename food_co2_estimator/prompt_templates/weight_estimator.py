@@ -39,85 +39,98 @@ The weights of bunches are estimated as the highest possible weight.
 """
 
 EN_INPUT_EXAMPLE = """
-1 can chopped tomatoes
-200 g pasta
-500 ml water
-250 grams minced meat
-0.5 cauliflower
-1 tsp. sugar
-1 organic lemon
-3 teaspoons salt
-2 tbsp. spices
-pepper
-2 large potatoes
-1 bunch asparagus
-1 duck, ca. 2 kg
+[0] 1 can chopped tomatoes
+[1] 200 g pasta
+[2] 500 ml water
+[3] 250 grams minced meat
+[4] 0.5 cauliflower
+[5] 1 tsp. sugar
+[6] 1 organic lemon
+[7] 3 teaspoons salt
+[8] 2 tbsp. spices
+[9] pepper
+[10] 2 large potatoes
+[11] 1 bunch asparagus
+[12] 1 duck, ca. 2 kg
 """
 
 # Constructing the example using Pydantic models
 ANSWER_EXAMPLE_OBJ = WeightEstimates(
     weight_estimates=[
         WeightEstimate(
+            ingredient_id=0,
             ingredient="1 can chopped tomatoes",
             weight_calculation="1 can = 400 g = 0.4 kg",
             weight_in_kg=0.4,
         ),
         WeightEstimate(
+            ingredient_id=1,
             ingredient="200 g pasta",
             weight_calculation="200 g = 0.2 kg",
             weight_in_kg=0.2,
         ),
         WeightEstimate(
+            ingredient_id=2,
             ingredient="500 ml water",
             weight_calculation="500 ml = 0.5 kg",
             weight_in_kg=0.5,
         ),
         WeightEstimate(
+            ingredient_id=3,
             ingredient="250 grams minced meat",
             weight_calculation="250 g = 0.25 kg",
             weight_in_kg=0.25,
         ),
         WeightEstimate(
+            ingredient_id=4,
             ingredient="0.5 cauliflower",
             weight_calculation="1 cauliflower = 500 g (estimated by LLM model) = 0.5 kg",
             weight_in_kg=0.5,
         ),
         WeightEstimate(
+            ingredient_id=5,
             ingredient="1 tsp. sugar",
             weight_calculation="1 teaspoon = 5 g = 0.005 kg",
             weight_in_kg=0.005,
         ),
         WeightEstimate(
+            ingredient_id=6,
             ingredient="1 organic lemon",
             weight_calculation="1 lemon = 85 g = 0.085 kg",
             weight_in_kg=0.085,
         ),
         WeightEstimate(
+            ingredient_id=7,
             ingredient="3 teaspoons salt",
             weight_calculation="1 tsp. = 5 g, 3 * 5 g = 15 g = 0.015 kg",
             weight_in_kg=0.015,
         ),
         WeightEstimate(
+            ingredient_id=8,
             ingredient="2 tbsp. spices",
             weight_calculation="1 tbsp. = 15 g, 2 * 15 g = 30 g = 0.030 kg",
             weight_in_kg=0.03,
         ),
         WeightEstimate(
+            ingredient_id=9,
             ingredient="pepper",
             weight_calculation="amount of pepper not specified",
             weight_in_kg=None,
         ),
         WeightEstimate(
+            ingredient_id=10,
             ingredient="2 large potatoes",
             weight_calculation="1 large potato = 300 g, 2 * 300 g = 600 g = 0.6 kg",
             weight_in_kg=0.6,
         ),
         WeightEstimate(
+            ingredient_id=11,
             ingredient="1 bunch asparagus",
             weight_calculation="1 bunch asparagus = 500 g = 0.500 kg",
             weight_in_kg=0.5,
         ),
         WeightEstimate(
+            ingredient_id=12,
             ingredient="1 duck, ca. 2 kg",
             weight_calculation="1 duck, ca. 2 kg = 2.0 kg",
             weight_in_kg=2.0,
@@ -138,7 +151,8 @@ If an ingredient is not found in the list of general weights, try to give your b
 of the weight in kilogram/kg of the ingredient and say (estimated by LLM model).
 Your estimate must always be a python float. Therefore, you must not provide any intervals.
 
-Input is given after "Ingredients:"
+Input is given after "Ingredients:", one ingredient per line after its id in square brackets.
+Give one estimate per ingredient, with the id as "ingredient_id" and the ingredient without the id as "ingredient".
 """
 
 WEIGHT_EST_EXAMPLE_HUMAN_PROMPT = """Ingredients:
@@ -1,10 +1,13 @@
 from typing import List, Optional
 
-from langchain.output_parsers import PydanticOutputParser
 from pydantic import BaseModel, Field
 
 
 class CO2perKg(BaseModel):
+    ingredient_id: Optional[int] = Field(
+        description="Id in square brackets before the ingredient in the input",
+        default=None,
+    )
     ingredient: str = Field(description="Name of ingredient")
     comment: str = Field(
         description="Comment about result. For instance what closest result is."
@@ -17,6 +20,3 @@ class CO2perKg(BaseModel):
 
 class CO2Emissions(BaseModel):
     emissions: List[CO2perKg]
-
-
-co2_output_parser = PydanticOutputParser(pydantic_object=CO2Emissions)
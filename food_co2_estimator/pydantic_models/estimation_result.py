@@ -0,0 +1,124 @@
+from enum import Enum
+
+from pydantic import BaseModel
+
+from food_co2_estimator.language.detector import Languages
+from food_co2_estimator.pydantic_models.recipe_extractor import (
+    EnrichedIngredient,
+    EnrichedRecipe,
+)
+
+
+class IngredientStatus(Enum):
+    Estimated = "estimated"
+    NoWeight = "no_weight"
+    Negligible = "negligible"
+    NoEmission = "no_emission"
+
+
+class EmissionSource(Enum):
+    Database = "database"
+    Search = "search"
+
+
+class IngredientEmission(BaseModel):
+    id: int
+    name: str
+    en_name: str | None = None
+    status: IngredientStatus
+    weight_in_kg: float | None = None
+    co2_per_kg: float | None = None
+    source: EmissionSource | None = None
+    co2_kg: float | None = None
+    weight_calculation: str | None = None
+    db_comment: str | None = None
+    search_explanation: str | None = None
+
+    @classmethod
+    def from_enriched_ingredient(
+        cls, ingredient: EnrichedIngredient, negligeble_threshold: float
+    ) -> "IngredientEmission":
+        weight_estimate = ingredient.weight_estimate
+        co2_data = ingredient.co2_per_kg_db
+        search_result = ingredient.co2_per_kg_search
+        weight_in_kg = weight_estimate.weight_in_kg if weight_estimate else None
+
+        co2_per_kg = None
+        source = None
+        if co2_data is not None and co2_data.co2_per_kg is not None:
+            co2_per_kg, source = co2_data.co2_per_kg, EmissionSource.Database
+        elif search_result is not None and search_result.result is not None:
+            co2_per_kg, source = search_result.result, EmissionSource.Search
+
+        co2_kg = None
+        if weight_in_kg is None:
+            status = IngredientStatus.NoWeight
+        elif weight_in_kg <= negligeble_threshold:
+            status = IngredientStatus.Negligible
+        elif co2_per_kg is None:
+            status = IngredientStatus.NoEmission
+        else:
+            status = IngredientStatus.Estimated
+            # Rounded as shown, so the total is the sum of the shown emissions
+            co2_kg = round(weight_in_kg * co2_per_kg, 2)
+
+        return cls(
+            id=ingredient.id,
+            name=ingredient.original_name,
+            en_name=ingredient.en_name,
+            status=status,
+            weight_in_kg=weight_in_kg,
+            co2_per_kg=co2_per_kg,
+            source=source,
+            co2_kg=co2_kg,
+            weight_calculation=(
+                weight_estimate.weight_calculation if weight_estimate else None
+            ),
+            db_comment=co2_data.comment if co2_data else None,
+            search_explanation=search_result.explanation if search_result else None,
+        )
+
+
+class EstimationResult(BaseModel):
+    """
+    The estimated emission of a recipe, with the weight, emission factor and
+    source of each ingredient. Computed once per estimation and cached, and
+    rendered as text, HTML or JSON on request.
+    """
+
+    url: str
+    language: Languages
+    persons: int | None = None
+    negligeble_threshold: float
+    total_co2_kg: float
+    co2_per_person_kg: float | None = None
+    ingredients: list[IngredientEmission]
+
+    @classmethod
+    def from_enriched_recipe(
+        cls,
+        enriched_recipe: EnrichedRecipe,
+        language: Languages,
+        negligeble_threshold: float,
+    ) -> "EstimationResult":
+        ingredients = [
+            IngredientEmission.from_enriched_ingredient(
+                ingredient, negligeble_threshold
+            )
+            for ingredient in enriched_recipe.ingredients
+        ]
+        total_co2_kg = sum(
+            ingredient.co2_kg
+            for ingredient in ingredients
+            if ingredient.co2_kg is not None
+        )
+        persons = enriched_recipe.persons
+        return cls(
+            url=enriched_recipe.url,
+            language=language,
+            persons=persons,
+            negligeble_threshold=negligeble_threshold,
+            total_co2_kg=total_co2_kg,
+            co2_per_person_kg=total_co2_kg / persons if persons else None,
+            ingredients=ingredients,
+        )
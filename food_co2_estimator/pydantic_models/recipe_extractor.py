@@ -1,4 +1,6 @@
-from typing import List
+from collections import defaultdict
+from collections.abc import Iterator, Sequence
+from typing import List, TypeVar
 
 from pydantic import BaseModel, Field
 
@@ -12,6 +14,10 @@ from food_co2_estimator.pydantic_models.weight_estimator import (
     WeightEstimates,
 )
 
+IngredientResult = TypeVar(
+    "IngredientResult", WeightEstimate, CO2perKg, CO2SearchResult
+)
+
 
 class ExtractedRecipe(BaseModel):
     """Class containing recipe information"""
@@ -28,6 +34,7 @@ class ExtractedRecipe(BaseModel):
 
 
 class EnrichedIngredient(BaseModel):
+    id: int
     original_name: str
     en_name: str | None = None
     weight_estimate: WeightEstimate | None = None
@@ -41,16 +48,13 @@ class EnrichedIngredient(BaseModel):
         self.en_name = english_name
 
     def set_weight_estimate(self, weight_estimate: WeightEstimate):
-        if self.en_name == weight_estimate.ingredient:
-            self.weight_estimate = weight_estimate
+        self.weight_estimate = weight_estimate
 
     def set_co2_per_kg_db(self, co2_per_kg: CO2perKg):
-        if self.en_name == co2_per_kg.ingredient:
-            self.co2_per_kg_db = co2_per_kg
+        self.co2_per_kg_db = co2_per_kg
 
     def set_co2_per_kg_search(self, co2_per_kg_search: CO2SearchResult):
-        if self.en_name == co2_per_kg_search.ingredient:
-            self.co2_per_kg_search = co2_per_kg_search
+        self.co2_per_kg_search = co2_per_kg_search
 
 
 class EnrichedRecipe(ExtractedRecipe):
@@ -63,6 +67,13 @@ class EnrichedRecipe(ExtractedRecipe):
     def get_ingredients_orig_name_list(self) -> list[str]:
         return [ingredient.original_name for ingredient in self.ingredients]
 
+    def get_ingredients_en_name_by_id(self) -> dict[int, str]:
+        return {
+            ingredient.id: ingredient.en_name
+            for ingredient in self.ingredients
+            if ingredient.en_name is not None
+        }
+
     @classmethod
     def from_extracted_recipe(
         cls,
@@ -72,21 +83,35 @@ class EnrichedRecipe(ExtractedRecipe):
         return cls(
             url=url,
             ingredients=[
-                EnrichedIngredient(original_name=ingredient)
-                for ingredient in extracted_recipe.ingredients
+                EnrichedIngredient(id=ingredient_id, original_name=ingredient)
+                for ingredient_id, ingredient in enumerate(extracted_recipe.ingredients)
             ],
             persons=extracted_recipe.persons,
             instructions=extracted_recipe.instructions,
         )
 
-    def get_match_objects(
-        self, obj: WeightEstimate | CO2perKg | CO2SearchResult
-    ) -> list[EnrichedIngredient]:
-        matched_ingredients = []
+    def get_matches(
+        self, results: Sequence[IngredientResult]
+    ) -> Iterator[tuple[EnrichedIngredient, IngredientResult]]:
+        """
+        Pairs each result with its ingredient by ingredient id. Results without
+        an id fall back to matching the English name, and results for unknown
+        ids are dropped.
+        """
+        ingredients_by_id = {
+            ingredient.id: ingredient for ingredient in self.ingredients
+        }
+        ingredients_by_name: dict[str, list[EnrichedIngredient]] = defaultdict(list)
         for ingredient in self.ingredients:
-            if ingredient.en_name == obj.ingredient:
-                matched_ingredients.append(ingredient)
-        return matched_ingredients
+            if ingredient.en_name is not None:
+                ingredients_by_name[ingredient.en_name].append(ingredient)
+
+        for result in results:
+            if result.ingredient_id is None:
+                for ingredient in ingredients_by_name.get(result.ingredient, []):
+                    yield ingredient, result
+            elif result.ingredient_id in ingredients_by_id:
+                yield ingredients_by_id[result.ingredient_id], result
 
     def update_with_translations(
         self, translated_ingredients: list[str], instructions: str | None
@@ -102,19 +127,15 @@ class EnrichedRecipe(ExtractedRecipe):
             ingredient.set_english_name(translation)
 
     def update_with_weight_estimates(self, weight_estimates: WeightEstimates):
-        for weight_estimate in weight_estimates.weight_estimates:
-            ingredients = self.get_match_objects(weight_estimate)
-            for ingredient in ingredients:
-                ingredient.set_weight_estimate(weight_estimate)
+        for ingredient, weight_estimate in self.get_matches(
+            weight_estimates.weight_estimates
+        ):
+            ingredient.set_weight_estimate(weight_estimate)
 
     def update_with_co2_per_kg_db(self, co2_emissions: CO2Emissions):
-        for co2_per_kg in co2_emissions.emissions:
-            ingredients = self.get_match_objects(co2_per_kg)
-            for ingredient in ingredients:
-                ingredient.set_co2_per_kg_db(co2_per_kg)
+        for ingredient, co2_per_kg in self.get_matches(co2_emissions.emissions):
+            ingredient.set_co2_per_kg_db(co2_per_kg)
 
     def update_with_co2_per_kg_search(self, co2_emissions: CO2SearchResults):
-        for co2_per_kg in co2_emissions.search_results:
-            ingredients = self.get_match_objects(co2_per_kg)
-            for ingredient in ingredients:
-                ingredient.set_co2_per_kg_search(co2_per_kg)
+        for ingredient, co2_per_kg in self.get_matches(co2_emissions.search_results):
+            ingredient.set_co2_per_kg_search(co2_per_kg)
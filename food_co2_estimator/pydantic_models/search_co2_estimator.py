@@ -1,11 +1,14 @@
 from typing import Optional
 
-from langchain.output_parsers import PydanticOutputParser
 from pydantic import BaseModel, Field
 
 
 # Not able to incorporate at the moment
 class CO2SearchResult(BaseModel):
+    ingredient_id: Optional[int] = Field(
+        description="Id in square brackets before the ingredient in the input",
+        default=None,
+    )
     ingredient: str = Field(
         "The original input string with amounts etc. provided in 'Input:'"
     )
@@ -21,6 +24,3 @@ class CO2SearchResult(BaseModel):
 
 class CO2SearchResults(BaseModel):
     search_results: list[CO2SearchResult]
-
-
-search_co2_output_parser = PydanticOutputParser(pydantic_object=CO2SearchResult)
@@ -1,10 +1,13 @@
 from typing import List, Optional
 
-from langchain.output_parsers import PydanticOutputParser
 from pydantic import BaseModel, Field
 
 
 class WeightEstimate(BaseModel):
+    ingredient_id: Optional[int] = Field(
+        description="Id in square brackets before the ingredient in the input",
+        default=None,
+    )
     ingredient: str = Field(description="Ingredient as called in ingredient list")
     weight_calculation: str = Field(
         description="Description of how weights are estimated"
@@ -18,6 +21,3 @@ class WeightEstimates(BaseModel):
     weight_estimates: List[WeightEstimate] = Field(
         description="List of 'WeightEstimate' per ingredient."
     )
-
-
-weight_output_parser = PydanticOutputParser(pydantic_object=WeightEstimates)
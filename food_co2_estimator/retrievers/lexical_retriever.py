@@ -0,0 +1,230 @@
+import logging
+import os
+import re
+import sqlite3
+import threading
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from food_co2_estimator.data.vector_store import get_vector_store
+from food_co2_estimator.data.vector_store.variables import (
+    DANISH_NAME_COLUMN,
+    EMISSION_COLUMN,
+    EMISSION_DECIMALS,
+)
+from food_co2_estimator.ingredients.parser import clean_ingredient_list
+from food_co2_estimator.pydantic_models.co2_estimator import CO2perKg
+
+if TYPE_CHECKING:
+    from langchain_chroma import Chroma
+
+logger = logging.getLogger(__name__)
+
+# Words in database names that do not distinguish one food from another
+NEUTRAL_NAME_TOKENS = {
+    "raw",
+    "ripe",
+    "origin",
+    "unknown",
+    "average",
+    "values",
+    "rå",
+    "uspec",
+}
+
+# Preparation words in ingredient names that do not change the food
+PREPARATION_TOKENS = {
+    "chopped",
+    "finely",
+    "coarsely",
+    "diced",
+    "sliced",
+    "grated",
+    "peeled",
+    "crushed",
+    "fresh",
+}
+
+EMISSION_FTS_TABLE_NAME = "emission_fts"
+
+_lexical_index: "LexicalIndex | None" = None
+_lexical_index_lock = threading.Lock()
+
+
+@dataclass
+class LexicalMatch:
+    name: str
+    danish_name: str
+    co2_per_kg: float
+
+
+@dataclass
+class LexicalIndex:
+    conn: sqlite3.Connection
+    # The vector store the foods were loaded from
+    vector_store: "Chroma"
+
+
+def get_emission_rows(vector_store: "Chroma") -> list[tuple[str, str, float]]:
+    """
+    The English name, Danish name and emission factor of each food in the
+    vector store, rounded like the factors given to the RAG chain, so a food
+    has the same factor whether it is matched by name or by vector search.
+    """
+    data = vector_store.get(include=["metadatas", "documents"])
+    rows = []
+    for name, metadata in zip(data["documents"], data["metadatas"]):
+        metadata = metadata or {}
+        if name is None or metadata.get(EMISSION_COLUMN) is None:
+            continue
+        rows.append(
+            (
+                name,
+                str(metadata.get(DANISH_NAME_COLUMN) or ""),
+                round(float(metadata[EMISSION_COLUMN]), EMISSION_DECIMALS),
+            )
+        )
+    return rows
+
+
+def create_fts_table(
+    conn: sqlite3.Connection, rows: list[tuple[str, str, float]]
+) -> None:
+    """Create a full text index over the English and Danish food names."""
+    conn.execute(
+        f"CREATE VIRTUAL TABLE {EMISSION_FTS_TABLE_NAME} USING fts5("
+        "Name, Navn, Total_kg_CO2_eq_kg UNINDEXED, "
+        "tokenize = 'unicode61 remove_diacritics 2')"
+    )
+    conn.executemany(
+        f"INSERT INTO {EMISSION_FTS_TABLE_NAME} (Name, Navn, Total_kg_CO2_eq_kg) "
+        "VALUES (?, ?, ?)",
+        rows,
+    )
+    conn.commit()
+
+
+def load_lexical_index(vector_store: "Chroma") -> LexicalIndex:
+    conn = sqlite3.connect(":memory:", check_same_thread=False)
+    rows = get_emission_rows(vector_store)
+    create_fts_table(conn, rows)
+    logger.info("Loaded %s foods into lexical emission index", len(rows))
+    return LexicalIndex(conn=conn, vector_store=vector_store)
+
+
+def get_lexical_index() -> sqlite3.Connection:
+    """
+    Return an in-memory full text index over the foods of the vector store,
+    loaded on first use and loaded again when the vector store is reloaded.
+    The index is small, so queries are answered in microseconds.
+    """
+    global _lexical_index
+    vector_store = get_vector_store()
+    index = _lexical_index
+    if index is not None and index.vector_store is vector_store:
+        return index.conn
+
+    with _lexical_index_lock:
+        index = _lexical_index
+        if index is None or index.vector_store is not vector_store:
+            index = load_lexical_index(vector_store)
+            _lexical_index = index
+    return index.conn
+
+
+def singularize(token: str) -> str:
+    if token.endswith("oes") or token.endswith("shes") or token.endswith("ches"):
+        return token[:-2]
+    if token.endswith("ies") and len(token) > 4:
+        return token[:-3] + "y"
+    if token.endswith("s") and not token.endswith("ss") and len(token) > 3:
+        return token[:-1]
+    return token
+
+
+def tokenize(text: str) -> list[str]:
+    return re.findall(r"\w+", text.lower())
+
+
+def get_name_tokens(name: str) -> frozenset[str]:
+    return frozenset(
+        singularize(token)
+        for token in tokenize(name)
+        if token not in NEUTRAL_NAME_TOKENS
+    )
+
+
+def get_query_tokens(ingredient: str) -> frozenset[str]:
+    return get_name_tokens(ingredient) - PREPARATION_TOKENS
+
+
+def lexical_emission_lookup(ingredient: str) -> LexicalMatch | None:
+    """
+    Find the emission of an ingredient that matches a food name in the database
+    exactly, ignoring plurals, word order, preparation and neutral words such
+    as "raw". Returns None if there is no such high-confidence match.
+    """
+    query_tokens = get_query_tokens(ingredient)
+    if not query_tokens:
+        return None
+
+    # Prefix queries on the singular forms also find the plural forms
+    fts_query = " OR ".join(
+        f'"{singularize(token)}"*' for token in tokenize(ingredient)
+    )
+    lexical_index = get_lexical_index()
+    with _lexical_index_lock:
+        candidates = lexical_index.execute(
+            f"SELECT Name, Navn, Total_kg_CO2_eq_kg "
+            f"FROM {EMISSION_FTS_TABLE_NAME} "
+            f"WHERE {EMISSION_FTS_TABLE_NAME} MATCH ? ORDER BY rank LIMIT 20",
+            (fts_query,),
+        ).fetchall()
+
+    matches = [
+        LexicalMatch(name=name, danish_name=danish_name, co2_per_kg=co2_per_kg)
+        for name, danish_name, co2_per_kg in candidates
+        if query_tokens in (get_name_tokens(name), get_name_tokens(danish_name))
+    ]
+    if not matches:
+        return None
+    # Same tie-breaker as the RAG prompt: choose the highest emission factor
+    return max(matches, key=lambda match: match.co2_per_kg)
+
+
+def batch_lexical_emission_retriever(
+    ingredients: dict[int, str],
+) -> tuple[list[CO2perKg], dict[int, str]]:
+    """
+    Returns the emissions of ingredients found by exact name matches in the
+    database and the ingredients by id that still need vector search.
+    """
+    emissions = []
+    remaining_ingredients = {}
+    cleaned_ingredients = clean_ingredient_list(list(ingredients.values()))
+    for (ingredient_id, ingredient), cleaned_ingredient in zip(
+        ingredients.items(), cleaned_ingredients
+    ):
+        match = lexical_emission_lookup(cleaned_ingredient)
+        if match is None:
+            remaining_ingredients[ingredient_id] = ingredient
+            continue
+        emissions.append(
+            CO2perKg(
+                ingredient_id=ingredient_id,
+                ingredient=ingredient,
+                comment=f"Exact match in database: {match.name}",
+                unit="kg CO2e / kg",
+                co2_per_kg=match.co2_per_kg,
+            )
+        )
+    return emissions, remaining_ingredients
+
+
+def _reset_after_fork() -> None:
+    global _lexical_index, _lexical_index_lock
+    _lexical_index = None
+    _lexical_index_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
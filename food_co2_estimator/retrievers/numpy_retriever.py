@@ -0,0 +1,205 @@
+import logging
+import os
+import threading
+from typing import Any, TypeGuard
+
+import numpy as np
+from langchain_chroma import Chroma
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.retrievers import BaseRetriever
+from langchain_core.runnables import RunnableConfig
+
+from food_co2_estimator.data.vector_store import get_vector_store
+
+logger = logging.getLogger(__name__)
+
+# Same default as VectorStoreRetriever, so both backends return the same documents
+DEFAULT_K = 4
+# Rows of the quantized matrix converted to float32 at once when queried
+DEQUANTIZE_BLOCK_ROWS = 256
+
+_emission_index: "NumpyEmissionIndex | None" = None
+_emission_index_lock = threading.Lock()
+
+
+class NumpyEmissionIndex:
+    """
+    Brute-force similarity index holding all catalogue embeddings in one
+    contiguous float32 matrix, or an int8 matrix with a scale per row when
+    quantized. A batch of queries is answered with a single matrix product.
+    """
+
+    def __init__(
+        self,
+        documents: list[Document],
+        embeddings: np.ndarray,
+        distance: str = "l2",
+        quantize: bool = False,
+        vector_store: Chroma | None = None,
+    ):
+        if distance not in ("l2", "cosine", "ip"):
+            raise ValueError(f"Unsupported distance: {distance}")
+        self.documents = documents
+        # The vector store the embeddings were loaded from, if any
+        self.vector_store = vector_store
+        self.distance = distance
+        self.quantize = quantize
+
+        matrix = np.ascontiguousarray(embeddings, dtype=np.float32)
+        self.squared_norms = np.einsum("ij,ij->i", matrix, matrix)
+        if distance == "cosine":
+            matrix = matrix / np.sqrt(self.squared_norms)[:, None]
+
+        if quantize:
+            self.scales = np.abs(matrix).max(axis=1) / 127
+            self.scales[self.scales == 0] = 1
+            self.matrix = np.round(matrix / self.scales[:, None]).astype(np.int8)
+        else:
+            self.scales = None
+            self.matrix = matrix
+
+    @classmethod
+    def from_vector_store(
+        cls, vector_store: Chroma, quantize: bool = False
+    ) -> "NumpyEmissionIndex":
+        data = vector_store.get(include=["embeddings", "metadatas", "documents"])
+        documents = [
+            Document(id=id, page_content=page_content, metadata=metadata or {})
+            for id, page_content, metadata in zip(
+                data["ids"], data["documents"], data["metadatas"]
+            )
+        ]
+        collection_metadata = vector_store._collection.metadata or {}
+        return cls(
+            documents=documents,
+            embeddings=np.asarray(data["embeddings"], dtype=np.float32),
+            distance=collection_metadata.get("hnsw:space", "l2"),
+            quantize=quantize,
+            vector_store=vector_store,
+        )
+
+    def similarities(self, queries: np.ndarray) -> np.ndarray:
+        """Return a (queries x documents) matrix where higher is more similar."""
+        queries = np.asarray(queries, dtype=np.float32)
+        if self.distance == "cosine":
+            queries = queries / np.linalg.norm(queries, axis=1, keepdims=True)
+
+        if self.scales is None:
+            products = queries @ self.matrix.T
+        else:
+            products = self.quantized_products(queries, self.scales)
+
+        if self.distance == "l2":
+            # |q - x|^2 = |q|^2 - 2 q.x + |x|^2, where |q|^2 does not affect ranking
+            return 2 * products - self.squared_norms
+        return products
+
+    def quantized_products(self, queries: np.ndarray, scales: np.ndarray) -> np.ndarray:
+        # The int8 matrix is converted a block of rows at a time, so a query
+        # never holds a float32 copy of the whole matrix
+        products = np.empty((len(queries), len(self.matrix)), dtype=np.float32)
+        for start in range(0, len(self.matrix), DEQUANTIZE_BLOCK_ROWS):
+            end = start + DEQUANTIZE_BLOCK_ROWS
+            block = self.matrix[start:end].astype(np.float32)
+            products[:, start:end] = (queries @ block.T) * scales[start:end]
+        return products
+
+    def search(self, queries: np.ndarray, k: int = DEFAULT_K) -> list[list[Document]]:
+        if not self.documents:
+            return [[] for _ in queries]
+
+        similarities = self.similarities(queries)
+        k = min(k, len(self.documents))
+        top_k = np.argpartition(-similarities, k - 1, axis=1)[:, :k]
+        results = []
+        for row, candidates in zip(similarities, top_k):
+            ranked = candidates[np.argsort(-row[candidates])]
+            results.append([self.documents[index] for index in ranked])
+        return results
+
+
+class NumpyEmissionRetriever(BaseRetriever):
+    index: Any
+    embeddings: Embeddings
+    k: int = DEFAULT_K
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> list[Document]:
+        return self.search([query])[0]
+
+    def search(self, queries: list[str]) -> list[list[Document]]:
+        if not queries:
+            return []
+        query_embeddings = np.asarray(self.embeddings.embed_documents(queries))
+        return self.index.search(query_embeddings, k=self.k)
+
+    def batch(  # type: ignore[override]
+        self,
+        inputs: list[str],
+        config: RunnableConfig | list[RunnableConfig] | None = None,
+        **kwargs: Any,
+    ) -> list[list[Document]]:
+        # One embedding request and one matrix product for the whole batch
+        return self.search(inputs)
+
+
+def is_index_current(
+    index: NumpyEmissionIndex | None, vector_store: Chroma, quantize: bool
+) -> TypeGuard[NumpyEmissionIndex]:
+    return (
+        index is not None
+        and index.quantize == quantize
+        and index.vector_store is vector_store
+    )
+
+
+def get_emission_index(quantize: bool = False) -> NumpyEmissionIndex:
+    """
+    Return the process-wide index, loaded from the vector store on first use
+    and loaded again when the vector store is reloaded.
+    """
+    global _emission_index
+    vector_store = get_vector_store()
+    index = _emission_index
+    if is_index_current(index, vector_store, quantize):
+        return index
+
+    with _emission_index_lock:
+        index = _emission_index
+        if not is_index_current(index, vector_store, quantize):
+            index = NumpyEmissionIndex.from_vector_store(
+                vector_store, quantize=quantize
+            )
+            _emission_index = index
+            logger.info(
+                "Loaded %s embeddings into numpy emission index",
+                len(index.documents),
+            )
+    return index
+
+
+def get_numpy_emission_retriever(
+    quantize: bool = False, **kwargs
+) -> NumpyEmissionRetriever:
+    # Like VectorStoreRetriever, k is read from search_kwargs
+    k = kwargs.get("search_kwargs", {}).get("k", DEFAULT_K)
+    embeddings = get_vector_store().embeddings
+    if embeddings is None:
+        raise ValueError("The vector store has no embedding function")
+    return NumpyEmissionRetriever(
+        index=get_emission_index(quantize=quantize),
+        embeddings=embeddings,
+        k=k,
+    )
+
+
+def _reset_after_fork() -> None:
+    global _emission_index, _emission_index_lock
+    _emission_index = None
+    _emission_index_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
@@ -2,7 +2,8 @@ import asyncio
 
 from langchain_community.utilities import GoogleSerperAPIWrapper
 
-from food_co2_estimator.retrievers.emission_retriever import clean_ingredient_list
+from food_co2_estimator.ingredients.parser import clean_ingredient_list
+from food_co2_estimator.metrics.pipeline import OPERATION_DURATION
 
 
 async def batch_co2_search_retriever(ingredients: list[str]):
@@ -12,5 +13,6 @@ async def batch_co2_search_retriever(ingredients: list[str]):
         f"{ingredient} emission kg CO2 per kg" for ingredient in cleaned_ingredients
     ]
     search_tasks = [search_tool.arun(query) for query in search_queries]
-    search_results = await asyncio.gather(*search_tasks)
+    with OPERATION_DURATION.time(operation="web_search"):
+        search_results = await asyncio.gather(*search_tasks)
     return dict(zip(ingredients, search_results))
@@ -0,0 +1,149 @@
+import asyncio
+import json
+import logging
+import weakref
+from urllib.parse import urlsplit
+
+import httpx
+
+from food_co2_estimator.cache.sqlite_cache import SQLiteCache
+from food_co2_estimator.cache.variables import PAGE_CACHE_MAX_ENTRIES, PAGE_CACHE_PATH
+from food_co2_estimator.url import HEADERS
+from food_co2_estimator.url.variables import (
+    FETCH_CONNECT_TIMEOUT_SECONDS,
+    FETCH_MAX_BODY_BYTES,
+    FETCH_MAX_CONNECTIONS,
+    FETCH_MAX_CONNECTIONS_PER_HOST,
+    FETCH_READ_TIMEOUT_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+# One fetcher per event loop, as its client and semaphores belong to the loop
+_page_fetchers: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, "PageFetcher"] = (
+    weakref.WeakKeyDictionary()
+)
+_page_cache: SQLiteCache | None = None
+
+
+class PageTooLargeError(Exception):
+    """Raised when a page is larger than the maximum body size."""
+
+
+def get_page_cache() -> SQLiteCache:
+    global _page_cache
+    if _page_cache is None:
+        _page_cache = SQLiteCache(
+            path=PAGE_CACHE_PATH,
+            table="pages",
+            max_entries=PAGE_CACHE_MAX_ENTRIES,
+        )
+    return _page_cache
+
+
+def get_validators(entry: dict) -> dict[str, str]:
+    headers = {}
+    if entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+
+class PageFetcher:
+    """
+    Fetches pages with a pooled keep-alive client, with timeouts, a maximum
+    body size and a limit on concurrent requests per host. Pages served with
+    an ETag or Last-Modified header are stored, so a later fetch of an
+    unchanged page is answered by a 304 and the stored page.
+    """
+
+    def __init__(
+        self,
+        cache: SQLiteCache | None = None,
+        max_body_bytes: int = FETCH_MAX_BODY_BYTES,
+        max_connections_per_host: int = FETCH_MAX_CONNECTIONS_PER_HOST,
+    ):
+        self.cache = get_page_cache() if cache is None else cache
+        self.max_body_bytes = max_body_bytes
+        self.max_connections_per_host = max_connections_per_host
+        self.client = httpx.AsyncClient(
+            headers=HEADERS,
+            timeout=httpx.Timeout(
+                FETCH_READ_TIMEOUT_SECONDS, connect=FETCH_CONNECT_TIMEOUT_SECONDS
+            ),
+            limits=httpx.Limits(max_connections=FETCH_MAX_CONNECTIONS),
+            follow_redirects=True,
+        )
+        self._host_semaphores: dict[str, asyncio.Semaphore] = {}
+
+    def _host_semaphore(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc.lower()
+        if host not in self._host_semaphores:
+            self._host_semaphores[host] = asyncio.Semaphore(
+                self.max_connections_per_host
+            )
+        return self._host_semaphores[host]
+
+    async def fetch(self, url: str) -> str:
+        cached = await asyncio.to_thread(self.cache.get, url)
+        entry = json.loads(cached.value) if cached is not None else {}
+
+        async with self._host_semaphore(url):
+            async with self.client.stream(
+                "GET", url, headers=get_validators(entry)
+            ) as response:
+                if response.status_code == 304 and cached is not None:
+                    logger.info("URL=%s: Page not modified, using stored page", url)
+                    await asyncio.to_thread(self.cache.set, url, cached.value)
+                    return entry["text"]
+
+                response.raise_for_status()
+                text = await self._read_text(response)
+
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if etag or last_modified:
+            value = json.dumps(
+                {"etag": etag, "last_modified": last_modified, "text": text}
+            )
+            await asyncio.to_thread(self.cache.set, url, value)
+        return text
+
+    async def _read_text(self, response: httpx.Response) -> str:
+        content_length = int(response.headers.get("Content-Length") or 0)
+        if content_length > self.max_body_bytes:
+            raise PageTooLargeError(f"Page is {content_length} bytes")
+
+        # The body is decompressed while reading, so the limit is on the page size
+        body = bytearray()
+        async for chunk in response.aiter_bytes():
+            body.extend(chunk)
+            if len(body) > self.max_body_bytes:
+                raise PageTooLargeError(
+                    f"Page is more than {self.max_body_bytes} bytes"
+                )
+        return bytes(body).decode(response.encoding or "utf-8", errors="replace")
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+
+def get_page_fetcher() -> PageFetcher:
+    loop = asyncio.get_running_loop()
+    fetcher = _page_fetchers.get(loop)
+    if fetcher is None:
+        fetcher = PageFetcher()
+        _page_fetchers[loop] = fetcher
+    return fetcher
+
+
+async def close_page_fetcher() -> None:
+    """Close the fetcher of the running event loop, e.g. before the loop ends."""
+    fetcher = _page_fetchers.pop(asyncio.get_running_loop(), None)
+    if fetcher is not None:
+        await fetcher.aclose()
+
+
+async def fetch_page_content(url: str) -> str:
+    return await get_page_fetcher().fetch(url)
@@ -0,0 +1,144 @@
+import re
+
+from food_co2_estimator.ingredients.parser import parse_ingredient
+from food_co2_estimator.url.variables import (
+    CHARACTERS_PER_TOKEN,
+    INGREDIENT_HEADING_MAX_LENGTH,
+    INGREDIENT_HEADING_REGEX,
+    PRUNING_CONTEXT_BLOCKS,
+    PRUNING_TOKEN_BUDGET,
+    SERVINGS_REGEX,
+)
+
+# Markdown list markers and emphasis around a line
+LINE_DECORATION_REGEX = r"^[\s>*\-+#_]*(?:\d+\.\s+)?|[\s*_#]*$"
+# A heading lends its score to the block after it, as lists often follow it
+HEADING_SCORE = 3.0
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARACTERS_PER_TOKEN
+
+
+def split_blocks(markdown: str) -> list[str]:
+    return [block for block in re.split(r"\n\s*\n", markdown) if block.strip()]
+
+
+def is_ingredient_heading(line: str) -> bool:
+    return len(line) <= INGREDIENT_HEADING_MAX_LENGTH and bool(
+        re.search(INGREDIENT_HEADING_REGEX, line, re.IGNORECASE)
+    )
+
+
+def is_servings_block(block: str) -> bool:
+    return len(block) <= INGREDIENT_HEADING_MAX_LENGTH and bool(
+        re.search(SERVINGS_REGEX, block, re.IGNORECASE)
+    )
+
+
+def score_line(line: str) -> float:
+    """Score how much a line looks like an ingredient, e.g. '2 dl fløde'."""
+    line = re.sub(LINE_DECORATION_REGEX, "", line)
+    if not line:
+        return 0.0
+    parsed_ingredient = parse_ingredient(line)
+    if parsed_ingredient.unit is not None:
+        return 1.0
+    if parsed_ingredient.quantity is not None:
+        # Quantities without units, e.g. '2 æg', but also years and steps
+        return 0.5
+    return 0.0
+
+
+def score_block(block: str) -> float:
+    """
+    Score a block by the number of ingredient-like lines, weighted by their
+    share of the block, so long stories with a few numbers score low.
+    """
+    lines = [line for line in block.splitlines() if line.strip()]
+    scores = [score_line(line) for line in lines]
+    total = sum(scores)
+    return total * total / len(lines) if lines else 0.0
+
+
+def score_blocks(blocks: list[str]) -> list[float]:
+    scores = [score_block(block) for block in blocks]
+    for index, block in enumerate(blocks):
+        cleaned_lines = [
+            re.sub(LINE_DECORATION_REGEX, "", line) for line in block.splitlines()
+        ]
+        if any(is_ingredient_heading(line) for line in cleaned_lines):
+            scores[index] += HEADING_SCORE
+            if index + 1 < len(blocks):
+                scores[index + 1] += HEADING_SCORE
+    return scores
+
+
+def find_ingredient_region(scores: list[float]) -> tuple[int, int, int]:
+    """
+    Return the best block and the first and last block of the region around
+    it. The region grows over scoring blocks, bridging single blocks without
+    ingredients, e.g. a sub-heading like 'Til dressingen'.
+    """
+    best = max(range(len(scores)), key=lambda index: scores[index])
+    start = end = best
+    while start > 0 and (
+        scores[start - 1] > 0 or (start > 1 and scores[start - 2] > 0)
+    ):
+        start -= 1
+    while end < len(scores) - 1 and (
+        scores[end + 1] > 0 or (end < len(scores) - 2 and scores[end + 2] > 0)
+    ):
+        end += 1
+    return best, start, end
+
+
+def prune_recipe_markdown(
+    markdown: str,
+    token_budget: int = PRUNING_TOKEN_BUDGET,
+    context_blocks: int = PRUNING_CONTEXT_BLOCKS,
+) -> str:
+    """
+    Keep the ingredient region of a page and a few blocks around it, within
+    the token budget. Pages within the budget, or without anything that looks
+    like ingredients, are returned unchanged.
+    """
+    if estimate_tokens(markdown) <= token_budget:
+        return markdown
+
+    blocks = split_blocks(markdown)
+    scores = score_blocks(blocks)
+    if not blocks or max(scores) <= 0:
+        return markdown
+
+    best, start, end = find_ingredient_region(scores)
+    first = max(start - context_blocks, 0)
+    last = min(end + context_blocks, len(blocks) - 1)
+
+    # Blocks are added from the best block outwards, region before context, so
+    # the kept blocks are contiguous
+    candidates = sorted(
+        range(first, last + 1),
+        key=lambda index: (not start <= index <= end, abs(index - best)),
+    )
+    kept: set[int] = set()
+    used_tokens = 0
+    for index in candidates:
+        block_tokens = estimate_tokens(blocks[index])
+        if kept and used_tokens + block_tokens > token_budget:
+            break
+        kept.add(index)
+        used_tokens += block_tokens
+
+    # The number of persons is often stated near the title, far from the list
+    for index, block in enumerate(blocks):
+        block_tokens = estimate_tokens(block)
+        if (
+            index not in kept
+            and is_servings_block(block)
+            and used_tokens + block_tokens <= token_budget
+        ):
+            kept.add(index)
+            used_tokens += block_tokens
+
+    return "\n\n".join(blocks[index] for index in sorted(kept))
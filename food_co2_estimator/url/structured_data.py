@@ -0,0 +1,144 @@
+import html
+import json
+import re
+from typing import Any
+
+from bs4 import BeautifulSoup, Tag
+
+from food_co2_estimator.pydantic_models.recipe_extractor import ExtractedRecipe
+
+SCHEMA_RECIPE_TYPE = "Recipe"
+MICRODATA_RECIPE_REGEX = r"schema\.org/Recipe$"
+
+
+def clean_text(text: Any) -> str:
+    """Unescape HTML entities, drop inline tags and collapse whitespace."""
+    text = html.unescape(str(text))
+    text = re.sub(r"<[^>]+>", " ", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def is_recipe_type(value: Any) -> bool:
+    types = value if isinstance(value, list) else [value]
+    return any(
+        isinstance(item, str) and item.split("/")[-1] == SCHEMA_RECIPE_TYPE
+        for item in types
+    )
+
+
+def find_recipe_object(data: Any) -> dict | None:
+    """Find the first Recipe object in JSON-LD, including nested @graph lists."""
+    if isinstance(data, list):
+        for item in data:
+            recipe = find_recipe_object(item)
+            if recipe is not None:
+                return recipe
+    elif isinstance(data, dict):
+        if is_recipe_type(data.get("@type")):
+            return data
+        for key in ("@graph", "mainEntity", "mainEntityOfPage"):
+            recipe = find_recipe_object(data.get(key))
+            if recipe is not None:
+                return recipe
+
+
+def find_json_ld_recipe(soup: BeautifulSoup) -> dict | None:
+    for script in soup.find_all("script", attrs={"type": "application/ld+json"}):
+        try:
+            # Control characters in strings are common in the wild
+            data = json.loads(script.get_text(), strict=False)
+        except json.JSONDecodeError:
+            continue
+        recipe = find_recipe_object(data)
+        if recipe is not None:
+            return recipe
+
+
+def get_microdata_props(element: Tag) -> list[str]:
+    """The property names of an element, as itemprop may hold several."""
+    itemprop = element.get("itemprop")
+    values = itemprop if isinstance(itemprop, list) else [itemprop or ""]
+    return [prop for value in values for prop in value.split()]
+
+
+def get_microdata_value(element: Tag) -> str:
+    content = element.get("content")
+    if isinstance(content, list):
+        content = " ".join(content)
+    return content or element.get_text(" ", strip=True)
+
+
+def find_microdata_recipe(soup: BeautifulSoup) -> dict | None:
+    scope = soup.find(attrs={"itemtype": re.compile(MICRODATA_RECIPE_REGEX)})
+    if not isinstance(scope, Tag):
+        return None
+
+    recipe: dict[str, list[str]] = {}
+    for element in scope.find_all(attrs={"itemprop": True}):
+        if not isinstance(element, Tag):
+            continue
+        for prop in get_microdata_props(element):
+            recipe.setdefault(prop, []).append(get_microdata_value(element))
+    return recipe
+
+
+def parse_ingredients(recipe: dict) -> list[str]:
+    # "ingredients" is the deprecated name of recipeIngredient
+    ingredients = recipe.get("recipeIngredient") or recipe.get("ingredients") or []
+    if isinstance(ingredients, str):
+        ingredients = [ingredients]
+    return [clean_text(item) for item in ingredients if clean_text(item)]
+
+
+def parse_yield(value: Any) -> int | None:
+    values = value if isinstance(value, list) else [value]
+    for item in values:
+        if isinstance(item, (int, float)) and item > 0:
+            return int(item)
+        match = re.search(r"\d+", str(item or ""))
+        if match and int(match.group()) > 0:
+            return int(match.group())
+
+
+def parse_instruction_steps(value: Any) -> list[str]:
+    """Flatten text, HowToStep and HowToSection instructions into steps."""
+    if isinstance(value, str):
+        return [clean_text(value)]
+    if isinstance(value, list):
+        return [step for item in value for step in parse_instruction_steps(item)]
+    if isinstance(value, dict):
+        if "itemListElement" in value:
+            return parse_instruction_steps(value["itemListElement"])
+        return parse_instruction_steps(value.get("text") or value.get("name") or "")
+    return []
+
+
+def parse_instructions(value: Any) -> str | None:
+    steps = [step for step in parse_instruction_steps(value) if step]
+    return "\n".join(steps) if steps else None
+
+
+def parse_structured_recipe(recipe: dict) -> ExtractedRecipe | None:
+    ingredients = parse_ingredients(recipe)
+    if not ingredients:
+        return None
+    return ExtractedRecipe(
+        ingredients=ingredients,
+        persons=parse_yield(recipe.get("recipeYield") or recipe.get("yield")),
+        instructions=parse_instructions(recipe.get("recipeInstructions")),
+    )
+
+
+def extract_structured_recipe(soup: BeautifulSoup) -> ExtractedRecipe | None:
+    """
+    Return the recipe described by schema.org JSON-LD or microdata in the
+    page, or None if the page has no Recipe with ingredients. Must be called
+    before script tags are removed from the soup.
+    """
+    for find_recipe in (find_json_ld_recipe, find_microdata_recipe):
+        recipe = find_recipe(soup)
+        if recipe is None:
+            continue
+        extracted_recipe = parse_structured_recipe(recipe)
+        if extracted_recipe is not None:
+            return extracted_recipe
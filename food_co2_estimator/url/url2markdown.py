@@ -1,24 +1,26 @@
+import asyncio
 import re
+from dataclasses import dataclass
 
-import requests
 import validators
 from bs4 import BeautifulSoup
 from markdownify import markdownify as md
 
+from food_co2_estimator.metrics.pipeline import OPERATION_DURATION
+from food_co2_estimator.pydantic_models.recipe_extractor import ExtractedRecipe
 from food_co2_estimator.url import (
     COMMENT_SELECTORS,
-    HEADERS,
     TAGS_TO_DECOMPOSE,
     WIDGET_SELECTORS_TO_REMOVE,
 )
+from food_co2_estimator.url.fetcher import fetch_page_content
+from food_co2_estimator.url.structured_data import extract_structured_recipe
 
 
-def fetch_page_content(url: str, headers: dict) -> str | None:
-    """Fetch the page content as text using requests."""
-    if validators.url(url):
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()  # Raises HTTPError if the response was unsuccessful
-        return response.text
+@dataclass
+class WebPage:
+    markdown: str | None = None
+    structured_recipe: ExtractedRecipe | None = None
 
 
 def parse_html(html_content: str, parser: str = "html.parser") -> BeautifulSoup:
@@ -74,31 +76,45 @@ def convert_body_to_markdown(soup: BeautifulSoup) -> str | None:
     return markdown_text
 
 
-def get_markdown_from_url(url: str) -> str | None:
+async def aget_page_from_url(url: str) -> WebPage | None:
     """
-    Given a URL, fetch its HTML, remove unwanted elements,
-    and return the content of <body> as Markdown. Returns an
-    empty string if there is no <body> content.
+    Given a URL, fetch its HTML and return the recipe described by its
+    structured data, or else the content of <body> as Markdown. Returns None
+    if the input is not a URL.
     """
-    # 1. Fetch the page content
-    html_text = fetch_page_content(url, HEADERS)
-    if html_text is None:
+    if not validators.url(url):
         return
 
-    # 2. Parse HTML
+    with OPERATION_DURATION.time(operation="fetch"):
+        html_text = await fetch_page_content(url)
+    # Parsing is CPU bound, so it does not run on the event loop
+    with OPERATION_DURATION.time(operation="parse"):
+        return await asyncio.to_thread(convert_html_to_page, html_text)
+
+
+def convert_html_to_page(html_text: str) -> WebPage:
     soup = parse_html(html_text)
 
-    # 3. Remove unwanted tags
+    # Structured data lives in script tags, so it is read before they are removed
+    structured_recipe = extract_structured_recipe(soup)
+    if structured_recipe is not None:
+        return WebPage(structured_recipe=structured_recipe)
+
+    return WebPage(markdown=convert_soup_to_markdown(soup))
+
+
+def convert_soup_to_markdown(soup: BeautifulSoup) -> str | None:
+    # 1. Remove unwanted tags
     remove_unwanted_tags(soup, TAGS_TO_DECOMPOSE)
 
-    # 4. Remove widgets (e.g., Instagram feed)
+    # 2. Remove widgets (e.g., Instagram feed)
     remove_widgets(soup, WIDGET_SELECTORS_TO_REMOVE)
 
-    # 5. Remove comment containers
+    # 3. Remove comment containers
     remove_comment_containers(soup, COMMENT_SELECTORS)
 
-    # 6. Remove all <a> tags
+    # 4. Remove all <a> tags
     remove_all_anchor_tags(soup)
 
-    # 7. Convert the body to Markdown
+    # 5. Convert the body to Markdown
     return convert_body_to_markdown(soup)
@@ -0,0 +1,23 @@
+import os
+
+# Pages above this size are pruned to the ingredient region before extraction.
+# Tokens are estimated as characters / 4.
+PRUNING_TOKEN_BUDGET = int(os.getenv("PRUNING_TOKEN_BUDGET", 2_000))
+# Blocks kept around the ingredient region, e.g. the title and servings
+PRUNING_CONTEXT_BLOCKS = 2
+CHARACTERS_PER_TOKEN = 4
+
+# Headings that introduce an ingredient list, matched in short lines only
+INGREDIENT_HEADING_REGEX = (
+    r"\b(ingrediens\w*|ingredients?|du skal bruge|you will need|shopping list)\b"
+)
+INGREDIENT_HEADING_MAX_LENGTH = 40
+# Short lines stating the servings are kept, wherever they are on the page
+SERVINGS_REGEX = r"\b(personer|portioner|pers\.|servings?|serves|portions?)\b"
+
+# Limits for fetching recipe pages
+FETCH_CONNECT_TIMEOUT_SECONDS = 5
+FETCH_READ_TIMEOUT_SECONDS = 15
+FETCH_MAX_BODY_BYTES = 5 * 1024 * 1024
+FETCH_MAX_CONNECTIONS = 100
+FETCH_MAX_CONNECTIONS_PER_HOST = 4
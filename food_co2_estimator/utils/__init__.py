@@ -1,3 +1,3 @@
-from food_co2_estimator.utils.output_generator import generate_output
+from food_co2_estimator.utils.output_generator import OutputFormat, render_output
 
-__all__ = ["generate_output"]
+__all__ = ["OutputFormat", "render_output"]
@@ -1,26 +1,34 @@
-import os
 from typing import Any
 
+import httpx
 from langchain_core.runnables import Runnable
 from langchain_openai import ChatOpenAI
 from pydantic import BaseModel
 
-DEFAULT_MODEL = "gpt-4o-mini"
-
-
-def get_model_name_from_env() -> str:
-    return os.getenv("GPT_MODEL", DEFAULT_MODEL)
+from food_co2_estimator.cache.llm_cache import LLMResponseCache
+from food_co2_estimator.cache.variables import LLM_CACHE_ENABLED
+from food_co2_estimator.chains.variables import get_model_name_from_env
+from food_co2_estimator.metrics.llm_callback import LLMMetricsHandler
 
 
 def get_model(
     pydantic_model: type[BaseModel] | None = None,
     model_name: str | None = None,
     verbose: bool = False,
+    chain_name: str | None = None,
+    http_async_client: httpx.AsyncClient | None = None,
 ) -> ChatOpenAI | Runnable[Any, Any]:
+    model_name = get_model_name_from_env() if model_name is None else model_name
+    if chain_name is None:
+        chain_name = pydantic_model.__name__ if pydantic_model is not None else "chat"
     base_llm = ChatOpenAI(
-        model=get_model_name_from_env() if model_name is None else model_name,
+        model=model_name,
         temperature=0,
         verbose=verbose,
+        http_async_client=http_async_client,
+        callbacks=[LLMMetricsHandler(chain=chain_name, model=model_name)],
+        # Temperature is 0, so identical prompts can share their answers
+        cache=LLMResponseCache(chain_name) if LLM_CACHE_ENABLED else None,
     )
     if pydantic_model is None:
         return base_llm
@@ -1,5 +1,13 @@
+import html
+from enum import Enum
+
 from food_co2_estimator.language.detector import Languages
-from food_co2_estimator.pydantic_models.recipe_extractor import EnrichedRecipe
+from food_co2_estimator.pydantic_models.estimation_result import (
+    EmissionSource,
+    EstimationResult,
+    IngredientEmission,
+    IngredientStatus,
+)
 
 # Avg. dinner emission per person method:
 # 1. Get Food emission per person per year here: https://concito.dk/udgivelser/danmarks-globale-forbrugsudledninger which is 1.97 ton / per capita
@@ -12,126 +20,219 @@ from food_co2_estimator.pydantic_models.recipe_extractor import EnrichedRecipe
 MIN_DINNER_EMISSION_PER_CAPITA = 1.3
 MAX_DINNER_EMISSION_PER_CAPITA = 2.2
 
-
-def generate_output(
-    enriched_recipe: EnrichedRecipe,
-    negligeble_threshold: float,
-    number_of_persons: int | None,
-    language: Languages = Languages.English,
-) -> str:
-    translations = {
-        Languages.English: {
-            "unable": "unable to estimate weight",
-            "negligible": "weight on {} kg is negligible",
-            "not_found": "CO2e per kg not found",
-            "total": "Total CO2 emission",
-            "persons": "Estimated number of persons",
-            "emission_pr_person": "Emission pr. person",
-            "avg_meal_emission_pr_person": "Avg. Danish dinner emission pr person",
-            "method": "The calculation method per ingredient is",
-            "legends": "Legends",
-            "db": "(DB) - Data from SQL Database (https://denstoreklimadatabase.dk)",
-            "search": "(Search) - Data obtained from search",
-            "comments": "Comments",
-            "for": "For",
-        },
-        Languages.Danish: {
-            "unable": "kan ikke skønne vægt",
-            "negligible": "vægt på {} kg er negligerbar",
-            "not_found": "CO2e per kg ikke fundet",
-            "total": "Samlet CO2-udslip",
-            "persons": "Estimeret antal personer",
-            "emission_pr_person": "Emission pr. person",
-            "avg_meal_emission_pr_person": "Gennemsnitligt aftensmad udledning pr. person",
-            "method": "Beregningsmetoden pr. ingrediens er",
-            "legends": "Forklaring",
-            "db": "(DB) - Data fra SQL Database (https://denstoreklimadatabase.dk)",
-            "search": "(Søgning) - Data opnået fra søgning",
-            "comments": "Kommentarer",
-            "for": "For",
-        },
+SEPARATOR = "----------------------------------------"
+
+TRANSLATIONS = {
+    Languages.English: {
+        "unable": "unable to estimate weight",
+        "negligible": "weight on {} kg is negligible",
+        "not_found": "CO2e per kg not found",
+        "total": "Total CO2 emission",
+        "persons": "Estimated number of persons",
+        "emission_pr_person": "Emission pr. person",
+        "avg_meal_emission_pr_person": "Avg. Danish dinner emission pr person",
+        "method": "The calculation method per ingredient is",
+        "legends": "Legends",
+        "db": "(DB) - Data from SQL Database (https://denstoreklimadatabase.dk)",
+        "search": "(Search) - Data obtained from search",
+        "comments": "Comments",
+        "for": "For",
+        "title": "CO2 emission of recipe",
+        "ingredient": "Ingredient",
+        "weight": "Weight",
+        "source": "Source",
+        "emission": "Emission",
+    },
+    Languages.Danish: {
+        "unable": "kan ikke skønne vægt",
+        "negligible": "vægt på {} kg er negligerbar",
+        "not_found": "CO2e per kg ikke fundet",
+        "total": "Samlet CO2-udslip",
+        "persons": "Estimeret antal personer",
+        "emission_pr_person": "Emission pr. person",
+        "avg_meal_emission_pr_person": "Gennemsnitligt aftensmad udledning pr. person",
+        "method": "Beregningsmetoden pr. ingrediens er",
+        "legends": "Forklaring",
+        "db": "(DB) - Data fra SQL Database (https://denstoreklimadatabase.dk)",
+        "search": "(Søgning) - Data opnået fra søgning",
+        "comments": "Kommentarer",
+        "for": "For",
+        "title": "CO2-udslip for opskrift",
+        "ingredient": "Ingrediens",
+        "weight": "Vægt",
+        "source": "Kilde",
+        "emission": "Udslip",
+    },
+}
+
+SOURCE_LABELS = {EmissionSource.Database: "DB", EmissionSource.Search: "Search"}
+
+
+class OutputFormat(Enum):
+    Text = "text"
+    Html = "html"
+    Json = "json"
+
+
+MEDIA_TYPES = {
+    OutputFormat.Text: "text/plain",
+    OutputFormat.Html: "text/html",
+    OutputFormat.Json: "application/json",
+}
+
+
+def get_translations(language: Languages) -> dict[str, str]:
+    return TRANSLATIONS.get(language, TRANSLATIONS[Languages.English])
+
+
+def get_comments(ingredient: IngredientEmission) -> dict[str, str | None]:
+    return {
+        "Weight": ingredient.weight_calculation,
+        "DB": ingredient.db_comment,
+        "Search": ingredient.search_explanation,
     }
 
-    trans = translations.get(language, translations[Languages.English])
 
-    ingredients_output = []
-    total_co2 = 0
-    all_comments = []
+def get_source_label(ingredient: IngredientEmission) -> str:
+    return "" if ingredient.source is None else SOURCE_LABELS[ingredient.source]
+
 
-    for ingredient in enriched_recipe.ingredients:
-        weight_estimate = ingredient.weight_estimate
-        co2_data = ingredient.co2_per_kg_db
-        search_result = ingredient.co2_per_kg_search
+def get_status_text(ingredient: IngredientEmission, trans: dict[str, str]) -> str:
+    """Text shown instead of the calculation for ingredients without one."""
+    if ingredient.status == IngredientStatus.NoWeight:
+        return trans["unable"]
+    if ingredient.status == IngredientStatus.Negligible:
+        return trans["negligible"].format(round(ingredient.weight_in_kg or 0, 3))
+    return trans["not_found"]
+
+
+def get_calculation_text(ingredient: IngredientEmission) -> str:
+    return (
+        f"{round(ingredient.weight_in_kg or 0, 2)} kg * "
+        f"{round(ingredient.co2_per_kg or 0, 2)} kg CO2e / kg "
+        f"({get_source_label(ingredient)}) = "
+        f"{round(ingredient.co2_kg or 0, 2)} kg CO2e"
+    )
 
-        comments = {
-            "Weight": weight_estimate.weight_calculation if weight_estimate else None,
-            "DB": co2_data.comment if co2_data else None,
-            "Search": search_result.explanation if search_result else None,
-        }
 
-        all_comments.append(
-            {"ingredient": ingredient.original_name, "comments": comments}
+def get_summary_lines(result: EstimationResult, trans: dict[str, str]) -> list[str]:
+    lines = [f"{trans['total']}: {round(result.total_co2_kg, 1)} kg CO2e"]
+    if result.persons is not None:
+        lines.append(f"{trans['persons']}: {result.persons}")
+    if result.co2_per_person_kg is not None:
+        lines.append(
+            f"{trans['emission_pr_person']}: "
+            f"{round(result.co2_per_person_kg, 1)} kg CO2e / pr. person"
         )
+    lines.append(
+        f"{trans['avg_meal_emission_pr_person']}: {MIN_DINNER_EMISSION_PER_CAPITA} - "
+        f"{MAX_DINNER_EMISSION_PER_CAPITA} kg CO2e / pr. person"
+    )
+    return lines
 
-        if weight_estimate is None or weight_estimate.weight_in_kg is None:
-            ingredients_output.append(f"{ingredient.original_name}: {trans['unable']}")
-            continue
 
-        if weight_estimate.weight_in_kg <= negligeble_threshold:
-            ingredients_output.append(
-                f"{ingredient.original_name}: {trans['negligible'].format(round(weight_estimate.weight_in_kg,3))}"
-            )
-            continue
+def render_text(result: EstimationResult, language: Languages | None = None) -> str:
+    trans = get_translations(result.language if language is None else language)
 
-        if co2_data and co2_data.co2_per_kg:
-            co2_value = round(co2_data.co2_per_kg * weight_estimate.weight_in_kg, 2)
-            ingredients_output.append(
-                f"{ingredient.original_name}: {round(weight_estimate.weight_in_kg, 2)} kg * {round(co2_data.co2_per_kg, 2)} kg CO2e / kg (DB) = {co2_value} kg CO2e"
-            )
-            total_co2 += co2_value
+    lines = [SEPARATOR, *get_summary_lines(result, trans), SEPARATOR]
+    lines.append(f"{trans['method']}: X kg * Y kg CO2e / kg = Z kg CO2e")
+    for ingredient in result.ingredients:
+        text = (
+            get_calculation_text(ingredient)
+            if ingredient.status == IngredientStatus.Estimated
+            else get_status_text(ingredient, trans)
+        )
+        lines.append(f"{ingredient.name}: {text}")
+    lines.append(SEPARATOR)
 
-        elif search_result and search_result.result:
-            co2_value = round(search_result.result * weight_estimate.weight_in_kg, 2)
-            ingredients_output.append(
-                f"{ingredient.original_name}: {round(weight_estimate.weight_in_kg, 2)} kg * {round(search_result.result, 2)} kg CO2e / kg (Search) = {co2_value} kg CO2e"
-            )
-            total_co2 += co2_value
+    lines += ["", f"{trans['legends']}:", trans["db"], trans["search"]]
 
-        else:
-            ingredients_output.append(
-                f"{ingredient.original_name}: {trans['not_found']}"
+    lines += ["", f"{trans['comments']}:"]
+    for ingredient in result.ingredients:
+        lines.append(f"{trans['for']} {ingredient.name}:")
+        for key, value in get_comments(ingredient).items():
+            if value:
+                lines.append(f"- {key}: {value}")
+
+    return "\n".join(lines)
+
+
+def render_html(result: EstimationResult, language: Languages | None = None) -> str:
+    language = result.language if language is None else language
+    if language not in TRANSLATIONS:
+        language = Languages.English
+    trans = get_translations(language)
+    escape = html.escape
+
+    rows = []
+    for ingredient in result.ingredients:
+        name = f"<td>{escape(ingredient.name)}</td>"
+        if ingredient.status == IngredientStatus.Estimated:
+            rows.append(
+                f"<tr>{name}"
+                f"<td>{round(ingredient.weight_in_kg or 0, 2)} kg</td>"
+                f"<td>{round(ingredient.co2_per_kg or 0, 2)} kg CO2e / kg</td>"
+                f"<td>{get_source_label(ingredient)}</td>"
+                f"<td>{round(ingredient.co2_kg or 0, 2)} kg CO2e</td></tr>"
             )
-    if number_of_persons is not None:
-        number_of_persons_text = f"\n{trans['persons']}: {number_of_persons}"
-        emission_per_person_text = f"\n{trans['emission_pr_person']}: {round(total_co2/number_of_persons,1)} kg CO2e / pr. person"
-    else:
-        number_of_persons_text = ""
-        emission_per_person_text = ""
-
-    output = (
-        "----------------------------------------"
-        f"\n{trans['total']}: {round(total_co2,1)} kg CO2e"
-        f"{number_of_persons_text}"
-        f"{emission_per_person_text}"
-        f"\n{trans['avg_meal_emission_pr_person']}: {MIN_DINNER_EMISSION_PER_CAPITA} - {MAX_DINNER_EMISSION_PER_CAPITA} kg CO2e / pr. person"
-        "\n----------------------------------------"
-        f"\n{trans['method']}: X kg * Y kg CO2e / kg = Z kg CO2e"
+        else:
+            status_text = escape(get_status_text(ingredient, trans))
+            rows.append(f'<tr>{name}<td colspan="4">{status_text}</td></tr>')
+
+    comments = []
+    for ingredient in result.ingredients:
+        items = "".join(
+            f"<li>{key}: {escape(value)}</li>"
+            for key, value in get_comments(ingredient).items()
+            if value
+        )
+        comments.append(
+            f"<dt>{trans['for']} {escape(ingredient.name)}</dt>"
+            f"<dd><ul>{items}</ul></dd>"
+        )
+
+    summary = "".join(
+        f"<p>{escape(line)}</p>" for line in get_summary_lines(result, trans)
     )
-    output += "\n" + "\n".join(ingredients_output)
-    output += "\n----------------------------------------"
-
-    # Legends
-    output += f"\n\n{trans['legends']}:"
-    output += f"\n{trans['db']}"
-    output += f"\n{trans['search']}"
-
-    # Append comments
-    output += f"\n\n{trans['comments']}:"
-    for comment in all_comments:
-        ingredient = comment["ingredient"]
-        output += f"\n{trans['for']} {ingredient}:"
-        for key, value in comment["comments"].items():
-            if value:
-                output += f"\n- {key}: {value}"
+    header = "".join(
+        f"<th>{column}</th>"
+        for column in (
+            trans["ingredient"],
+            trans["weight"],
+            "kg CO2e / kg",
+            trans["source"],
+            trans["emission"],
+        )
+    )
+    return (
+        f'<!DOCTYPE html><html lang="{language.value}"><head><meta charset="utf-8">'
+        f"<title>{trans['title']}</title></head><body>"
+        f"<h1>{trans['title']}</h1>"
+        f'<p><a href="{escape(result.url)}">{escape(result.url)}</a></p>'
+        f"{summary}"
+        f"<table><tr>{header}</tr>{''.join(rows)}</table>"
+        f"<h2>{trans['legends']}</h2><p>{escape(trans['db'])}</p>"
+        f"<p>{escape(trans['search'])}</p>"
+        f"<h2>{trans['comments']}</h2><dl>{''.join(comments)}</dl>"
+        "</body></html>"
+    )
+
 
-    return output
+def render_json(result: EstimationResult) -> str:
+    return result.model_dump_json()
+
+
+def render_output(
+    result: EstimationResult,
+    output_format: OutputFormat = OutputFormat.Text,
+    language: Languages | None = None,
+) -> str:
+    """
+    Render an estimation result, as text or HTML in the given language or the
+    language of the recipe, or as JSON.
+    """
+    if output_format == OutputFormat.Json:
+        return render_json(result)
+    if output_format == OutputFormat.Html:
+        return render_html(result, language)
+    return render_text(result, language)
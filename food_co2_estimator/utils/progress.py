@@ -0,0 +1,103 @@
+from collections.abc import Callable
+from typing import TYPE_CHECKING, Any
+
+from food_co2_estimator.language.detector import Languages
+from food_co2_estimator.pydantic_models.co2_estimator import CO2Emissions
+from food_co2_estimator.pydantic_models.estimation_result import EstimationResult
+from food_co2_estimator.pydantic_models.recipe_extractor import EnrichedRecipe
+from food_co2_estimator.pydantic_models.search_co2_estimator import CO2SearchResults
+from food_co2_estimator.pydantic_models.weight_estimator import WeightEstimates
+
+if TYPE_CHECKING:
+    from food_co2_estimator.url.url2markdown import WebPage
+
+ProgressCallback = Callable[[dict[str, Any]], None]
+
+
+def fetched_event(page: "WebPage") -> dict[str, Any]:
+    return {"event": "fetched", "structured_data": page.structured_recipe is not None}
+
+
+def extracted_event(recipe: EnrichedRecipe) -> dict[str, Any]:
+    return {
+        "event": "extracted",
+        "ingredients": [
+            {"id": ingredient.id, "name": ingredient.original_name}
+            for ingredient in recipe.ingredients
+        ],
+        "persons": recipe.persons,
+    }
+
+
+def language_event(language: Languages) -> dict[str, Any]:
+    return {"event": "language", "language": language.value}
+
+
+def translated_event(recipe: EnrichedRecipe) -> dict[str, Any]:
+    return {
+        "event": "translated",
+        "ingredients": [
+            {
+                "id": ingredient.id,
+                "name": ingredient.original_name,
+                "en_name": ingredient.en_name,
+            }
+            for ingredient in recipe.ingredients
+        ],
+    }
+
+
+def weights_event(weights: WeightEstimates) -> dict[str, Any]:
+    return {
+        "event": "weights",
+        "weights": {
+            estimate.ingredient_id: estimate.weight_in_kg
+            for estimate in weights.weight_estimates
+            if estimate.ingredient_id is not None
+        },
+    }
+
+
+def db_emissions_event(emissions: CO2Emissions) -> dict[str, Any]:
+    return {
+        "event": "db_emissions",
+        "emissions": {
+            emission.ingredient_id: emission.co2_per_kg
+            for emission in emissions.emissions
+            if emission.ingredient_id is not None
+        },
+    }
+
+
+def search_event(search_results: CO2SearchResults | None) -> dict[str, Any]:
+    results = [] if search_results is None else search_results.search_results
+    return {
+        "event": "search",
+        "emissions": {
+            result.ingredient_id: result.result
+            for result in results
+            if result.ingredient_id is not None
+        },
+    }
+
+
+def rendered_event(result: EstimationResult) -> dict[str, Any]:
+    return {"event": "rendered", "total_co2_kg": result.total_co2_kg}
+
+
+# Pipeline stages reported to the client, keyed by stage name
+STAGE_EVENTS: dict[str, Callable[[Any], dict[str, Any]]] = {
+    "page": fetched_event,
+    "recipe": extracted_event,
+    "language": language_event,
+    "translated_recipe": translated_event,
+    "weights": weights_event,
+    "db_emissions": db_emissions_event,
+    "search_results": search_event,
+    "result": rendered_event,
+}
+
+
+def get_stage_event(stage: str, result: Any) -> dict[str, Any] | None:
+    event_func = STAGE_EVENTS.get(stage)
+    return None if event_func is None else event_func(result)
@@ -0,0 +1,37 @@
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key into one call. Callers that
+    arrive while a call is in flight await its result instead of starting
+    their own. Calls are only shared by callers on the same event loop.
+    """
+
+    def __init__(self, name: str = ""):
+        self.name = name
+        self._calls: dict[tuple[int, Hashable], asyncio.Future] = {}
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        call_key = (id(asyncio.get_running_loop()), key)
+        call = self._calls.get(call_key)
+        if call is None:
+            call = asyncio.ensure_future(func())
+            self._calls[call_key] = call
+            call.add_done_callback(lambda _: self._forget(call_key, call))
+        else:
+            logger.info("%s: Joining call in flight for %s", self.name, key)
+        # A caller being cancelled must not cancel the call for the others
+        return await asyncio.shield(call)
+
+    def _forget(self, call_key: tuple[int, Hashable], call: asyncio.Future) -> None:
+        if self._calls.get(call_key) is call:
+            del self._calls[call_key]
+
+    def __len__(self) -> int:
+        return len(self._calls)
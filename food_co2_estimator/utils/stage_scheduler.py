@@ -0,0 +1,127 @@
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+class StageError(Exception):
+    """Raised when a required stage fails. `message` is shown to the user."""
+
+    def __init__(self, message: str, stage: str | None = None):
+        super().__init__(message)
+        self.message = message
+        self.stage = stage
+
+
+@dataclass
+class Stage:
+    name: str
+    func: Callable[..., Awaitable[Any]]
+    depends_on: list[str] = field(default_factory=list)
+    error_message: str | None = None
+    required: bool = True
+
+
+class StageScheduler:
+    """
+    Runs async stages as soon as the stages they depend on have finished, so
+    independent stages run concurrently. Each stage function is called with
+    the results of its dependencies as keyword arguments named after them.
+
+    A failing required stage cancels the remaining stages and raises a
+    StageError with the stage's error message. A failing optional stage is
+    logged, recorded in `failed` and passes None to the stages depending on it.
+
+    `on_stage_complete` is called with the name and result of every finished
+    stage, e.g. to report progress.
+    """
+
+    def __init__(
+        self,
+        name: str = "",
+        on_stage_complete: Callable[[str, Any], None] | None = None,
+    ):
+        self.name = name
+        self.on_stage_complete = on_stage_complete
+        self.stages: dict[str, Stage] = {}
+        self.timings: dict[str, float] = {}
+        self.failed: set[str] = set()
+
+    def add_stage(
+        self,
+        name: str,
+        func: Callable[..., Awaitable[Any]],
+        depends_on: list[str] | None = None,
+        error_message: str | None = None,
+        required: bool = True,
+    ) -> None:
+        depends_on = depends_on or []
+        if name in self.stages:
+            raise ValueError(f"Stage {name} is already added")
+        # Dependencies must be added first, which also rules out cycles
+        missing = [
+            dependency for dependency in depends_on if dependency not in self.stages
+        ]
+        if missing:
+            raise ValueError(f"Stage {name} depends on unknown stages: {missing}")
+        self.stages[name] = Stage(name, func, depends_on, error_message, required)
+
+    async def run(self) -> dict[str, Any]:
+        tasks: dict[str, asyncio.Task] = {}
+        for stage in self.stages.values():
+            tasks[stage.name] = asyncio.create_task(self._run_stage(stage, tasks))
+
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            raise
+        return {name: task.result() for name, task in tasks.items()}
+
+    async def _run_stage(self, stage: Stage, tasks: dict[str, asyncio.Task]) -> Any:
+        dependencies = {name: await tasks[name] for name in stage.depends_on}
+
+        start_time = time.perf_counter()
+        try:
+            result = await stage.func(**dependencies)
+        except StageError as e:
+            e.stage = e.stage or stage.name
+            raise
+        except Exception as e:
+            if not stage.required:
+                logger.exception(
+                    "%s: %s",
+                    self.name,
+                    stage.error_message or f"Optional stage {stage.name} failed",
+                )
+                self.failed.add(stage.name)
+                result = None
+            elif stage.error_message is None:
+                raise
+            else:
+                raise StageError(stage.error_message, stage.name) from e
+        finally:
+            self.timings[stage.name] = time.perf_counter() - start_time
+
+        self._notify(stage.name, result)
+        return result
+
+    def _notify(self, name: str, result: Any) -> None:
+        if self.on_stage_complete is None:
+            return
+        try:
+            self.on_stage_complete(name, result)
+        except Exception:
+            # Progress reporting must never break the pipeline
+            logger.exception("%s: Unable to report stage %s", self.name, name)
+
+    def format_timings(self) -> str:
+        return ", ".join(
+            f"{name}={duration:.2f}s" for name, duration in self.timings.items()
+        )
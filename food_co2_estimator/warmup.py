@@ -0,0 +1,36 @@
+"""
+Loading of everything the pipeline imports or opens on its first recipe.
+
+The heavy dependencies of the stages (langchain, the OpenAI client, chroma,
+the translators, langdetect and the HTML parsers) are imported on first use,
+so the web server and workers start fast. Workers call `warm_up_pipeline`
+when they start, unless `WARM_UP_ON_START` is false, so the first recipe they
+take does not pay for the imports.
+"""
+
+import asyncio
+import logging
+import time
+
+from food_co2_estimator.chains.registry import warm_up_chains
+from food_co2_estimator.language.detector import warm_up_language_detector
+
+logger = logging.getLogger(__name__)
+
+
+def load_stage_dependencies() -> None:
+    from food_co2_estimator.data.vector_store import get_vector_store
+    from food_co2_estimator.retrievers.lexical_retriever import get_lexical_index
+    from food_co2_estimator.url import url2markdown  # noqa: F401
+
+    get_vector_store()
+    get_lexical_index()
+
+
+async def warm_up_pipeline() -> None:
+    """Import the stage dependencies, build the chains and open the stores."""
+    start_time = time.perf_counter()
+    await asyncio.to_thread(warm_up_language_detector)
+    await asyncio.to_thread(load_stage_dependencies)
+    await warm_up_chains()
+    logger.info("Warmed up pipeline in %.2fs", time.perf_counter() - start_time)
@@ -0,0 +1,27 @@
+import os
+
+# Progress streams keep a connection open for the whole estimation, so each
+# worker serves requests from a thread pool instead of one at a time
+worker_class = "gthread"
+workers = int(os.getenv("WEB_CONCURRENCY", 2))
+threads = int(os.getenv("GUNICORN_THREADS", 32))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 300))
+
+# Estimations run in job worker processes started next to the web workers, and
+# restarted by a thread of the gunicorn master when they die. Set JOB_WORKERS=0
+# to run them separately with `python -m food_co2_estimator.jobs.worker`.
+_job_worker_supervisors = []
+
+
+def on_starting(server):
+    from food_co2_estimator.jobs.variables import JOB_WORKERS
+    from food_co2_estimator.jobs.worker import WorkerSupervisor
+
+    supervisor = WorkerSupervisor(JOB_WORKERS)
+    supervisor.start()
+    _job_worker_supervisors.append(supervisor)
+
+
+def on_exit(server):
+    for supervisor in _job_worker_supervisors:
+        supervisor.stop()